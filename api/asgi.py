@@ -0,0 +1,207 @@
+# ASGI entry point for the API.
+#
+#   pip install uvicorn a2wsgi
+#   uvicorn api.asgi:application --host 127.0.0.1 --port 5328
+#
+# Serves the same Flask app as api/index.py through a2wsgi, which runs each
+# request's handler on a thread pool while the event loop owns the sockets,
+# and only pulls the next response chunk once the client has taken the
+# previous ones, so a slow reader slows its own export down instead of
+# buffering it in memory.
+#
+# Requests are admitted in two lanes, each with a thread pool of its own:
+# exports and the change stream, which can run for minutes, and everything
+# else. A burst of long downloads or open dashboards cannot take the threads
+# short requests need, and the other way round. Health checks are answered
+# on the event loop, and shutdown lets in-flight requests finish first.
+from a2wsgi import WSGIMiddleware
+from api.db.aio import AsyncConnection, shutdown_async_db
+from api.db.backends import get_backend
+from api.db.changes import shutdown_change_feed
+from api.index import app
+from api.routes.changes import CLIENT_GONE
+from api.utils.security import shutdown_hashing
+import asyncio
+import contextvars
+import json
+import logging
+import os
+import threading
+
+# Requests handled at once in the main lane (one worker thread each until
+# the response is fully sent), and how many more may wait for a thread
+# before new arrivals are turned away with a 503
+ASGI_THREADS = int(os.getenv("ASGI_THREADS", 16))
+ASGI_MAX_PENDING = int(os.getenv("ASGI_MAX_PENDING", 512))
+# The same for exports and event streams
+ASGI_STREAM_THREADS = int(os.getenv("ASGI_STREAM_THREADS", 8))
+ASGI_STREAM_MAX_PENDING = int(os.getenv("ASGI_STREAM_MAX_PENDING", 32))
+# Seconds in-flight requests get to finish once shutdown starts
+ASGI_SHUTDOWN_TIMEOUT = float(os.getenv("ASGI_SHUTDOWN_TIMEOUT", 30))
+
+HEALTH_PATH = "/api/health"
+# Long-running responses, served from the stream lane
+STREAM_PATHS = ("/api/export/", "/api/changes/stream")
+
+logger = logging.getLogger(__name__)
+
+# The request's client-gone event, handed to the WSGI app through environ
+_client_gone = contextvars.ContextVar("client_gone", default=None)
+
+def with_client_gone(wsgi_app):
+    def wrapper(environ, start_response):
+        environ[CLIENT_GONE] = _client_gone.get()
+        return wsgi_app(environ, start_response)
+    return wrapper
+
+async def send_json(send, status, payload, headers=()):
+    content = json.dumps(payload).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(content)).encode()),
+            *headers,
+        ],
+    })
+    await send({"type": "http.response.body", "body": content})
+
+# A thread pool and the requests admitted to it
+class Lane:
+    def __init__(self, wsgi_app, threads, max_pending):
+        self.adapter = WSGIMiddleware(wsgi_app, workers=threads)
+        self.threads = threads
+        self.capacity = threads + max_pending
+        self.in_flight = 0
+        self.rejected = 0
+
+    def stats(self):
+        return {"threads": self.threads, "capacity": self.capacity, "in_flight": self.in_flight, "rejected": self.rejected}
+
+class Application:
+    def __init__(self, wsgi_app, threads=ASGI_THREADS, max_pending=ASGI_MAX_PENDING,
+                 stream_threads=ASGI_STREAM_THREADS, stream_max_pending=ASGI_STREAM_MAX_PENDING,
+                 shutdown_timeout=ASGI_SHUTDOWN_TIMEOUT):
+        wsgi_app = with_client_gone(wsgi_app)
+        self.requests = Lane(wsgi_app, threads, max_pending)
+        self.streams = Lane(wsgi_app, stream_threads, stream_max_pending)
+        self.shutdown_timeout = shutdown_timeout
+        self.in_flight = 0
+        self.draining = False
+        self.idle = asyncio.Event()
+        self.idle.set()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            if scope["path"] == HEALTH_PATH:
+                await self.health(send)
+            else:
+                await self.http(scope, receive, send)
+        elif scope["type"] == "lifespan":
+            await self.lifespan(receive, send)
+        else:
+            # No websocket routes; refuse the handshake
+            await send({"type": "websocket.close", "code": 1000})
+
+    async def http(self, scope, receive, send):
+        if self.draining:
+            await send_json(send, 503, {"error": "Server is shutting down"}, [(b"connection", b"close")])
+            return
+        lane = self.streams if scope["path"].startswith(STREAM_PATHS) else self.requests
+        if lane.in_flight >= lane.capacity:
+            lane.rejected += 1
+            await send_json(send, 503, {"error": "Server is busy, try again shortly"}, [(b"retry-after", b"1")])
+            return
+        lane.in_flight += 1
+        self.in_flight += 1
+        self.idle.clear()
+
+        # Messages are read here and handed on, so a disconnect is noticed
+        # while the handler is still streaming. Servers drop what is sent
+        # after that; the handler sees CLIENT_GONE and can stop early.
+        gone = threading.Event()
+        messages = asyncio.Queue()
+
+        async def watch():
+            while True:
+                message = await receive()
+                await messages.put(message)
+                if message["type"] == "http.disconnect":
+                    gone.set()
+                    return
+
+        async def relay_receive():
+            if gone.is_set() and messages.empty():
+                return {"type": "http.disconnect"}
+            return await messages.get()
+
+        async def relay_send(message):
+            if gone.is_set():
+                return
+            try:
+                await send(message)
+            except OSError:
+                gone.set()
+
+        watcher = asyncio.create_task(watch())
+        token = _client_gone.set(gone)
+        try:
+            await lane.adapter(scope, relay_receive, relay_send)
+        finally:
+            _client_gone.reset(token)
+            watcher.cancel()
+            lane.in_flight -= 1
+            self.in_flight -= 1
+            if self.in_flight == 0:
+                self.idle.set()
+
+    # Answered on the event loop, so saturated worker pools do not make the
+    # process look dead to a load balancer; 503 once draining
+    async def health(self, send):
+        if self.draining:
+            await send_json(send, 503, {"status": "draining", "in_flight": self.in_flight})
+            return
+        try:
+            async with AsyncConnection() as db:
+                await db.fetchone("SELECT 1")
+        except Exception as e:
+            await send_json(send, 503, {"status": "error", "error": str(e)})
+            return
+        await send_json(send, 200, {
+            "status": "ok",
+            "in_flight": self.in_flight,
+            "requests": self.requests.stats(),
+            "streams": self.streams.stats(),
+        })
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.shutdown()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    # Stop admitting requests, let in-flight ones finish (up to the
+    # timeout), then release worker threads, hashing processes and the pool
+    async def shutdown(self):
+        self.draining = True
+        # Wakes every open event stream so it ends
+        shutdown_change_feed()
+        try:
+            await asyncio.wait_for(self.idle.wait(), self.shutdown_timeout)
+            finished = True
+        except asyncio.TimeoutError:
+            finished = False
+            logger.warning("Shutting down with %d requests still in flight", self.in_flight)
+        loop = asyncio.get_running_loop()
+        for lane in (self.requests, self.streams):
+            await loop.run_in_executor(None, lambda lane=lane: lane.adapter.executor.shutdown(wait=finished, cancel_futures=True))
+        await loop.run_in_executor(None, shutdown_async_db)
+        await loop.run_in_executor(None, shutdown_hashing)
+        await loop.run_in_executor(None, get_backend().close)
+
+application = Application(app)
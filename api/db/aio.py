@@ -0,0 +1,75 @@
+from concurrent.futures import ThreadPoolExecutor
+from api.db.backends import get_backend
+import asyncio
+import os
+import threading
+
+# Threads that run database calls for async callers. Pooled connections are
+# opened with check_same_thread=False, so a connection may hop between them.
+DB_THREADS = int(os.getenv("DB_ASYNC_THREADS", 4))
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=DB_THREADS, thread_name_prefix="db-async")
+    return _executor
+
+async def run_sync(fn, *args):
+    return await asyncio.get_running_loop().run_in_executor(_get_executor(), fn, *args)
+
+def shutdown_async_db():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
+
+# A pooled connection driven from a coroutine. Every call runs on the DB
+# thread pool, so the event loop never blocks on SQLite or the pool itself.
+#
+#   async with AsyncConnection() as db:
+#       rows = await db.fetchall("SELECT ...", params)
+class AsyncConnection:
+    def __init__(self):
+        self.conn = None
+
+    async def __aenter__(self):
+        self.conn = await run_sync(get_backend().acquire)
+        return self
+
+    async def __aexit__(self, *exc):
+        conn, self.conn = self.conn, None
+        await run_sync(get_backend().release, conn)
+
+    async def execute(self, sql, params=()):
+        return await run_sync(lambda: self.conn.execute(sql, params).rowcount)
+
+    async def fetchone(self, sql, params=()):
+        return await run_sync(lambda: self.conn.execute(sql, params).fetchone())
+
+    async def fetchall(self, sql, params=()):
+        return await run_sync(lambda: self.conn.execute(sql, params).fetchall())
+
+    async def commit(self):
+        await run_sync(self.conn.commit)
+
+    async def rollback(self):
+        await run_sync(self.conn.rollback)
+
+    # Async-iterate lists of rows; the next batch is only read once the
+    # caller has finished with the previous one
+    async def stream(self, sql, params=(), batch_size=500):
+        batches = get_backend().stream(self.conn, sql, params, batch_size)
+        try:
+            while True:
+                batch = await run_sync(next, batches, None)
+                if batch is None:
+                    break
+                yield batch
+        finally:
+            await run_sync(batches.close)
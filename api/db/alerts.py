@@ -0,0 +1,206 @@
+# Warranty and licence expiry alerts (migration 0009).
+#
+# A run raises an 'expiring' alert for every item whose expiry date is within
+# ALERT_WINDOW_DAYS and an 'expired' one for every item past it. It only reads
+# the dates that entered either range since the previous run, off the
+# warranty and licence expiry indexes, plus the items queued in
+# alert_rechecks by a write; on a day with no writes a run reads nothing.
+# New alerts are then sent to the notification sinks (api.utils.notify).
+#
+# AlertScheduler runs this every ALERT_INTERVAL seconds in `python -m
+# api.worker`; the web processes do not scan on their own.
+from api.db.backends import get_backend
+from api.utils.cache import bump_table_version
+from api.utils.notify import parse_sinks
+from datetime import date, timedelta
+import os
+import threading
+
+ALERT_WINDOW_DAYS = int(os.getenv("ALERT_WINDOW_DAYS", 30))
+ALERT_INTERVAL = float(os.getenv("ALERT_INTERVAL", 300))
+# Alerts claimed and sent per sink call
+ALERT_NOTIFY_BATCH = 100
+
+# Alert kind: (table, key, name column, expiry column)
+ALERT_SOURCES = {
+    "warranty": ("hardware", "device_id", "device_name", "warranty_expiration"),
+    "licence": ("software", "software_id", "software_name", "expiration_date"),
+}
+ALERT_STATES = ("expiring", "expired")
+# Sorts before every ISO date: the scan position before the first run
+EARLIEST_DATE = "0001-01-01"
+ALERT_COLUMNS = ("alert_id", "kind", "item_id", "item_name", "expires_on", "state", "raised_on", "notified_at")
+
+# Decommissioned items are never alerted on
+ACTIVE_FILTER = "status <> 'decommissioned'"
+
+# (today, yesterday, last day of the window) as ISO dates
+def scan_bounds(today=None, window=ALERT_WINDOW_DAYS):
+    today = today or date.today()
+    today = date.fromisoformat(today) if isinstance(today, str) else today
+    return today.isoformat(), (today - timedelta(days=1)).isoformat(), (today + timedelta(days=window)).isoformat()
+
+# True when a run would read anything: rechecks are queued or a day has
+# passed since the last run. Cheap enough to call on every tick.
+def run_due(db, today=None, window=ALERT_WINDOW_DAYS):
+    today, yesterday, horizon = scan_bounds(today, window)
+    if db.execute("SELECT 1 FROM alert_rechecks LIMIT 1").fetchone():
+        return True
+    return db.execute(
+        "SELECT 1 FROM alert_scans WHERE expiring_through IS NULL OR expiring_through < ?"
+        " OR expired_through < ? LIMIT 1",
+        (horizon, yesterday),
+    ).fetchone() is not None
+
+def raise_alerts(db, kind, rows, today):
+    return db.executemany(
+        "INSERT INTO alerts (kind, item_id, item_name, expires_on, state, raised_on)"
+        " VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT DO NOTHING",
+        [
+            (kind, item_id, name, expires_on, "expired" if expires_on < today else "expiring", today)
+            for item_id, name, expires_on in rows
+        ],
+    ).rowcount
+
+# One run, inside the caller's write transaction. Returns {"raised": n,
+# "resolved": n}: new alerts, and expiring alerts closed because the item has
+# since expired (it gets an expired alert instead).
+def run_alerts(db, today=None, window=ALERT_WINDOW_DAYS):
+    today, yesterday, horizon = scan_bounds(today, window)
+    raised = 0
+    for kind, (table, key, name, expiry) in ALERT_SOURCES.items():
+        select = f"SELECT {key}, {name}, {expiry} FROM {table}"
+        expiring_through, expired_through = db.execute(
+            "SELECT expiring_through, expired_through FROM alert_scans WHERE kind = ?", (kind,)
+        ).fetchone()
+        # Dates that came within the window since the last run; the first
+        # run starts from today
+        rows = db.execute(
+            f"{select} WHERE {expiry} > ? AND {expiry} <= ? AND {ACTIVE_FILTER}",
+            (expiring_through or yesterday, horizon),
+        ).fetchall()
+        # Dates that have passed since the last run; the first run takes
+        # everything already expired
+        rows += db.execute(
+            f"{select} WHERE {expiry} > ? AND {expiry} < ? AND {ACTIVE_FILTER}",
+            (expired_through or EARLIEST_DATE, today),
+        ).fetchall()
+        # Items written since the last run whose new date was already
+        # scanned; later dates are picked up when the window reaches them
+        rows += db.execute(
+            f"{select} WHERE {key} IN (SELECT item_id FROM alert_rechecks WHERE kind = ?)"
+            f" AND {expiry} <= ? AND {ACTIVE_FILTER}",
+            (kind, max(horizon, expiring_through or EARLIEST_DATE)),
+        ).fetchall()
+        db.execute("DELETE FROM alert_rechecks WHERE kind = ?", (kind,))
+        raised += raise_alerts(db, kind, rows, today)
+        db.execute(
+            "UPDATE alert_scans SET expiring_through = ?, expired_through = ? WHERE kind = ?",
+            (max(horizon, expiring_through or EARLIEST_DATE), max(yesterday, expired_through or EARLIEST_DATE), kind),
+        )
+    resolved = db.execute(
+        "UPDATE alerts SET resolved_at = CURRENT_TIMESTAMP"
+        " WHERE state = 'expiring' AND expires_on < ? AND resolved_at IS NULL",
+        (today,),
+    ).rowcount
+    return {"raised": raised, "resolved": resolved}
+
+# Mark up to `limit` unsent alerts as sent and return the open ones, in a
+# transaction of its own so two schedulers never send the same alert
+def claim_notifications(db, limit=ALERT_NOTIFY_BATCH):
+    backend = get_backend()
+    backend.begin(db, immediate=True)
+    try:
+        rows = db.execute(
+            f"SELECT {', '.join(ALERT_COLUMNS)}, resolved_at FROM alerts"
+            " WHERE notified_at IS NULL ORDER BY alert_id LIMIT ?",
+            (limit,),
+        ).fetchall()
+        if rows:
+            db.execute(
+                f"UPDATE alerts SET notified_at = CURRENT_TIMESTAMP"
+                f" WHERE alert_id IN ({', '.join('?' for _ in rows)})",
+                [row[0] for row in rows],
+            )
+            bump_table_version(db, "alerts")
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    # notified_at is left out of what the sinks get: it is being set now
+    return [row[0] for row in rows], [dict(zip(ALERT_COLUMNS[:-1], row)) for row in rows if row[-1] is None]
+
+def release_notifications(db, alert_ids):
+    db.execute(
+        f"UPDATE alerts SET notified_at = NULL WHERE alert_id IN ({', '.join('?' for _ in alert_ids)})",
+        alert_ids,
+    )
+    bump_table_version(db, "alerts")
+    db.commit()
+
+# Send every unsent alert to `sinks`, ALERT_NOTIFY_BATCH at a time. Alerts
+# resolved before they were sent are dropped. If a sink fails, the batch is
+# put back for the next run and the error is raised, so with several sinks
+# an alert can reach one of them twice. Returns the number of alerts sent.
+def notify(db, sinks):
+    sent = 0
+    if not sinks:
+        return sent
+    while True:
+        alert_ids, alerts = claim_notifications(db)
+        try:
+            if alerts:
+                for sink in sinks:
+                    sink.send(alerts)
+        except Exception:
+            release_notifications(db, alert_ids)
+            raise
+        sent += len(alerts)
+        if len(alert_ids) < ALERT_NOTIFY_BATCH:
+            return sent
+
+# Run if due and send what was raised, on a pooled connection. Returns the
+# run's counts (None if nothing was due) and the number of alerts sent.
+def run_once(sinks=(), today=None, window=ALERT_WINDOW_DAYS):
+    backend = get_backend()
+    db = backend.acquire()
+    try:
+        result = None
+        if run_due(db, today, window):
+            backend.begin(db, immediate=True)
+            try:
+                result = run_alerts(db, today, window)
+                bump_table_version(db, "alerts")
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+        return result, notify(db, sinks)
+    finally:
+        backend.release(db)
+
+class AlertScheduler:
+    def __init__(self, interval=ALERT_INTERVAL, sinks=None):
+        self.interval = interval
+        self.sinks = parse_sinks() if sinks is None else sinks
+        self.last_error = None
+        self._stopped = threading.Event()
+
+    def stop(self):
+        self._stopped.set()
+
+    def tick(self):
+        try:
+            result = run_once(self.sinks)
+            self.last_error = None
+            return result
+        except Exception as e:
+            # Try again next tick; a locked database or an unreachable
+            # webhook is usually transient
+            self.last_error = str(e)
+            return None, 0
+
+    def run_forever(self):
+        self.tick()
+        while not self._stopped.wait(self.interval):
+            self.tick()
@@ -0,0 +1,31 @@
+import os
+import threading
+
+_backend = None
+_backend_lock = threading.Lock()
+
+# SQLite by default; DATABASE_URL=postgresql://... selects PostgreSQL
+def create_backend():
+    url = os.getenv("DATABASE_URL", "")
+    if url.startswith(("postgres://", "postgresql://")):
+        from api.db.backends.postgres import PostgresBackend
+        return PostgresBackend(url)
+    from api.db.backends.sqlite import SQLiteBackend
+    from api.db import database
+    return SQLiteBackend(database.DATABASE)
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = create_backend()
+    return _backend
+
+# Swap the process-wide backend (closing the old one), e.g. to point tools at another database
+def set_backend(backend):
+    global _backend
+    with _backend_lock:
+        if _backend is not None and _backend is not backend:
+            _backend.close()
+        _backend = backend
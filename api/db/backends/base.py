@@ -0,0 +1,65 @@
+# Interface every storage backend implements. Connections handed out by
+# acquire() behave like sqlite3 connections: execute() with "?" placeholders,
+# cursor(), commit(), rollback() and in_transaction.
+class Backend:
+    name = None
+
+    # Check a connection out for the current app context
+    def acquire(self):
+        raise NotImplementedError
+
+    def release(self, conn):
+        raise NotImplementedError
+
+    # Check out a connection for reads only (GET requests, reports). Backends
+    # without a separate read path hand out an ordinary one.
+    def acquire_reader(self):
+        return self.acquire()
+
+    def release_reader(self, conn):
+        self.release(conn)
+
+    # Wall-clock time before which every commit is visible to readers, or
+    # None if readers see each commit as soon as it is made
+    def readers_current_as_of(self):
+        return None
+
+    # [(name, declared type, notnull, default, is primary key), ...]
+    def table_info(self, conn, table):
+        raise NotImplementedError
+
+    # Start a transaction; `immediate` takes the write lock up front, for
+    # transactions that read before they write
+    def begin(self, conn, immediate=False):
+        raise NotImplementedError
+
+    # Insert one row and return the new value of `key`
+    def insert(self, conn, table, columns, values, key):
+        raise NotImplementedError
+
+    # Yield lists of rows for `sql` without materialising the whole result
+    def stream(self, conn, sql, params, batch_size):
+        raise NotImplementedError
+
+    # The planner's description of how `sql` would run, one line per step
+    def explain(self, conn, sql, params):
+        return []
+
+    # Errors raised for UNIQUE / CHECK / NOT NULL / foreign key violations
+    integrity_errors = ()
+    # Errors that mean the statement itself was rejected by the database
+    database_errors = ()
+
+    # Recreate an empty, seeded database
+    def initialize(self):
+        raise NotImplementedError
+
+    # Bring an existing database up to the current schema
+    def upgrade(self):
+        pass
+
+    def stats(self):
+        return {}
+
+    def close(self):
+        pass
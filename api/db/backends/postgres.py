@@ -0,0 +1,227 @@
+from api.db.backends.base import Backend
+import os
+import re
+import time
+import uuid
+
+try:
+    import psycopg
+    from psycopg.types.string import TextLoader
+    from psycopg_pool import ConnectionPool as PsycopgPool
+except ImportError:  # optional dependency, only needed when DATABASE_URL is postgres
+    psycopg = None
+    PsycopgPool = None
+
+POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", 2))
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 8))
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+# A streaming replica for GET requests, and how far behind the primary it
+# may be; a session that wrote more recently than that reads the primary
+READ_URL = os.getenv("DATABASE_READ_URL", "")
+READ_POOL_SIZE = int(os.getenv("DB_READ_POOL_SIZE", POOL_SIZE))
+REPLICA_LAG = float(os.getenv("DB_REPLICA_LAG", 5))
+
+SCHEMA = os.path.join(os.path.dirname(os.path.dirname(__file__)), "schema_postgres.sql")
+
+INTEGER_TYPES = ("smallint", "integer", "bigint")
+
+# String literals, quoted identifiers, dollar-quoted bodies and comments,
+# in which a "?" is just text
+QUOTED = re.compile(
+    r"""'(?:[^']|'')*'|"(?:[^"]|"")*"|(\$[A-Za-z_0-9]*\$).*?\1|--[^\n]*|/\*.*?\*/""",
+    re.DOTALL,
+)
+
+# Handlers write sqlite-style "?" placeholders; psycopg expects "%s". A "?"
+# inside quotes or a comment is left alone, and every "%" is doubled, since
+# psycopg reads "%%" as a literal "%" even inside a string (LIKE 'a%')
+def translate(sql):
+    parts = []
+    start = 0
+    for match in QUOTED.finditer(sql):
+        parts.append(sql[start:match.start()].replace("%", "%%").replace("?", "%s"))
+        parts.append(match.group().replace("%", "%%"))
+        start = match.end()
+    parts.append(sql[start:].replace("%", "%%").replace("?", "%s"))
+    return "".join(parts)
+
+class PostgresCursor:
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def execute(self, sql, params=()):
+        self._cursor.execute(translate(sql), params)
+        return self
+
+    def executemany(self, sql, seq_of_params):
+        self._cursor.executemany(translate(sql), seq_of_params)
+        return self
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchmany(self, size):
+        return self._cursor.fetchmany(size)
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    def close(self):
+        self._cursor.close()
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    # PostgreSQL has no rowid; inserts that need the key use Backend.insert
+    @property
+    def lastrowid(self):
+        return None
+
+# sqlite3-style facade over a pooled psycopg connection
+class PostgresConnection:
+    def __init__(self, conn):
+        self.raw = conn
+
+    def cursor(self):
+        return PostgresCursor(self.raw.cursor())
+
+    def execute(self, sql, params=()):
+        return self.cursor().execute(sql, params)
+
+    def executemany(self, sql, seq_of_params):
+        return self.cursor().executemany(sql, seq_of_params)
+
+    def commit(self):
+        self.raw.commit()
+
+    def rollback(self):
+        self.raw.rollback()
+
+    @property
+    def in_transaction(self):
+        return self.raw.info.transaction_status != psycopg.pq.TransactionStatus.IDLE
+
+# Read DATE and TIMESTAMP columns back as ISO strings, the same values
+# SQLite stores
+def configure_connection(conn):
+    conn.adapters.register_loader("date", TextLoader)
+    conn.adapters.register_loader("timestamp", TextLoader)
+
+class PostgresBackend(Backend):
+    name = "postgres"
+
+    def __init__(self, url):
+        if psycopg is None:
+            raise RuntimeError("DATABASE_URL points at PostgreSQL but psycopg / psycopg_pool are not installed")
+        self.url = url
+        self.integrity_errors = (psycopg.IntegrityError,)
+        self.database_errors = (psycopg.DatabaseError,)
+        self.pool = PsycopgPool(url, min_size=POOL_MIN_SIZE, max_size=POOL_SIZE, timeout=POOL_TIMEOUT,
+                                configure=configure_connection, open=True)
+        self.read_pool = None
+        if READ_URL:
+            self.read_pool = PsycopgPool(READ_URL, min_size=POOL_MIN_SIZE, max_size=READ_POOL_SIZE,
+                                         timeout=POOL_TIMEOUT, configure=configure_connection, open=True)
+
+    def acquire(self):
+        return PostgresConnection(self.pool.getconn())
+
+    def release(self, conn):
+        if conn.in_transaction:
+            conn.rollback()
+        self.pool.putconn(conn.raw)
+
+    def acquire_reader(self):
+        if self.read_pool is None:
+            return self.acquire()
+        return PostgresConnection(self.read_pool.getconn())
+
+    def release_reader(self, conn):
+        if self.read_pool is None:
+            return self.release(conn)
+        if conn.in_transaction:
+            conn.rollback()
+        self.read_pool.putconn(conn.raw)
+
+    def readers_current_as_of(self):
+        return time.time() - REPLICA_LAG if self.read_pool is not None else None
+
+    def table_info(self, conn, table):
+        rows = conn.execute(
+            "SELECT c.column_name, c.data_type, c.is_nullable = 'NO', c.column_default,"
+            " EXISTS (SELECT 1 FROM information_schema.table_constraints tc"
+            "  JOIN information_schema.key_column_usage k"
+            "   ON k.constraint_name = tc.constraint_name AND k.table_schema = tc.table_schema"
+            "  WHERE tc.constraint_type = 'PRIMARY KEY' AND tc.table_schema = c.table_schema"
+            "   AND tc.table_name = c.table_name AND k.column_name = c.column_name)"
+            " FROM information_schema.columns c"
+            " WHERE c.table_schema = current_schema() AND c.table_name = ?"
+            " ORDER BY c.ordinal_position",
+            (table,),
+        ).fetchall()
+        return [
+            (name, "INTEGER" if data_type in INTEGER_TYPES else data_type.upper(), int(notnull), default, int(pk))
+            for name, data_type, notnull, default, pk in rows
+        ]
+
+    # psycopg opens a transaction implicitly on the first statement
+    # The write lock SQLite's BEGIN IMMEDIATE takes: a transaction-long
+    # advisory lock, also taken by every write to a change-feed table
+    # (schema_postgres.sql), so checks and writes see the same state and
+    # two runs never claim the same alerts
+    def begin(self, conn, immediate=False):
+        if immediate:
+            conn.execute("SELECT pg_advisory_xact_lock(hashtext('inventory_write'))")
+
+    def insert(self, conn, table, columns, values, key):
+        placeholders = ", ".join("?" for _ in columns)
+        sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders}) RETURNING {key}"
+        return conn.execute(sql, values).fetchone()[0]
+
+    # Named (server-side) cursor: rows are fetched from the server batch by batch
+    def stream(self, conn, sql, params, batch_size):
+        cursor = conn.raw.cursor(name=f"stream_{uuid.uuid4().hex}")
+        try:
+            cursor.execute(translate(sql), params)
+            while True:
+                batch = cursor.fetchmany(batch_size)
+                if not batch:
+                    break
+                yield batch
+        finally:
+            cursor.close()
+
+    def explain(self, conn, sql, params):
+        return [row[0] for row in conn.execute(f"EXPLAIN {sql}", params).fetchall()]
+
+    # Drops and recreates every table from schema_postgres.sql
+    def initialize(self):
+        with open(SCHEMA, "r") as f:
+            script = f.read()
+        with self.pool.connection() as conn:
+            conn.execute(script)
+            conn.commit()
+
+    def stats(self):
+        stats = self.pool.get_stats()
+        return {
+            "size": POOL_SIZE,
+            "open": stats.get("pool_size", 0),
+            "idle": stats.get("pool_available", 0),
+            "checkouts": stats.get("requests_num", 0),
+            "timeouts": stats.get("requests_errors", 0),
+            "wait_total_ms": stats.get("requests_wait_ms", 0),
+        }
+
+    def close(self):
+        self.pool.close()
+        if self.read_pool is not None:
+            self.read_pool.close()
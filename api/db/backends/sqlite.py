@@ -0,0 +1,372 @@
+from api.db.backends.base import Backend
+import atexit
+import os
+import queue
+import sqlite3
+import tempfile
+import threading
+import time
+import urllib.parse
+
+# Pool sizing; every connection in the pool is opened once and reused
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 8))
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+# Where GET requests read from (api.db.database routes them):
+#   ro        read-only connections to the same file; under WAL they see every
+#             commit and never block or wait for a writer (the default)
+#   snapshot  a copy of the database taken with the backup API every
+#             DB_SNAPSHOT_INTERVAL seconds, so readers hold no locks on the
+#             live file at all; reads can be that far behind
+#   off       the same connections as writes
+READ_ROUTING = os.getenv("DB_READ_ROUTING", "ro").lower()
+READ_ROUTINGS = ("ro", "snapshot", "off")
+READ_POOL_SIZE = int(os.getenv("DB_READ_POOL_SIZE", POOL_SIZE))
+SNAPSHOT_INTERVAL = float(os.getenv("DB_SNAPSHOT_INTERVAL", 30))
+SNAPSHOT_DIR = os.getenv("DB_SNAPSHOT_DIR", tempfile.gettempdir())
+# Prepared statements each connection keeps, looked up by SQL text; large
+# enough for every statement the API issues, so none is compiled twice
+STATEMENT_CACHE_SIZE = 512
+
+# Applied to every pooled connection when it is opened. WAL lets readers run
+# alongside a writer, and synchronous=NORMAL is durable in WAL mode while
+# skipping an fsync per commit.
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA busy_timeout = 5000",
+    "PRAGMA foreign_keys = ON",
+    "PRAGMA mmap_size = 268435456",
+    "PRAGMA cache_size = -20000",
+    "PRAGMA temp_store = MEMORY",
+)
+
+# Read-only connections: no journal or sync settings to apply, and
+# query_only makes any write fail even through a writable URI
+READ_PRAGMAS = (
+    "PRAGMA busy_timeout = 5000",
+    "PRAGMA query_only = ON",
+    "PRAGMA mmap_size = 268435456",
+    "PRAGMA cache_size = -20000",
+    "PRAGMA temp_store = MEMORY",
+)
+
+# INSERT ... RETURNING needs SQLite 3.35; older builds fall back to lastrowid
+RETURNING_SUPPORTED = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+SCHEMA = os.path.join(os.path.dirname(os.path.dirname(__file__)), "schema.sql")
+
+class PoolTimeout(RuntimeError):
+    pass
+
+def read_only_uri(path, immutable=False):
+    uri = f"file:{urllib.parse.quote(os.path.abspath(path))}?mode=ro"
+    return uri + "&immutable=1" if immutable else uri
+
+# Remembers which database file (pool generation) it was opened on
+class PooledConnection(sqlite3.Connection):
+    generation = 0
+
+class ConnectionPool:
+    def __init__(self, database, size=POOL_SIZE, timeout=POOL_TIMEOUT, uri=False, pragmas=CONNECTION_PRAGMAS):
+        self.database = database
+        self.size = size
+        self.timeout = timeout
+        self.uri = uri
+        self.pragmas = pragmas
+        self.generation = 0
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._opened = 0
+        self._in_use = 0
+        self._checkouts = 0
+        self._timeouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def _connect(self):
+        with self._lock:
+            database, generation = self.database, self.generation
+        conn = sqlite3.connect(
+            database, check_same_thread=False, cached_statements=STATEMENT_CACHE_SIZE,
+            uri=self.uri, factory=PooledConnection,
+        )
+        conn.generation = generation
+        conn.row_factory = sqlite3.Row
+        for pragma in self.pragmas:
+            conn.execute(pragma)
+        with self._lock:
+            self._opened += 1
+        return conn
+
+    def _discard(self, conn):
+        conn.close()
+        with self._lock:
+            self._opened -= 1
+
+    # Point the pool at another database. Idle connections are closed now,
+    # checked-out ones when they come back.
+    def reopen(self, database):
+        with self._lock:
+            self.database = database
+            self.generation += 1
+        self.close_all()
+
+    # Check out a connection, waiting up to `timeout` seconds for a free slot
+    def acquire(self):
+        started = time.perf_counter()
+        if not self._slots.acquire(timeout=self.timeout):
+            with self._lock:
+                self._timeouts += 1
+            raise PoolTimeout(f"No database connection available after {self.timeout}s")
+        waited = time.perf_counter() - started
+        conn = None
+        try:
+            while conn is None:
+                try:
+                    conn = self._idle.get_nowait()
+                except queue.Empty:
+                    conn = self._connect()
+                else:
+                    if conn.generation != self.generation:
+                        self._discard(conn)
+                        conn = None
+        except Exception:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._in_use += 1
+            self._checkouts += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+        return conn
+
+    # Return a connection; anything left uncommitted by the request is rolled back
+    def release(self, conn):
+        try:
+            if conn.generation != self.generation:
+                self._discard(conn)
+                return
+            if conn.in_transaction:
+                conn.rollback()
+            self._idle.put(conn)
+        except sqlite3.Error:
+            self._discard(conn)
+        finally:
+            with self._lock:
+                self._in_use -= 1
+            self._slots.release()
+
+    def close_all(self):
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": self.size,
+                "open": self._opened,
+                "in_use": self._in_use,
+                "idle": self._idle.qsize(),
+                "checkouts": self._checkouts,
+                "timeouts": self._timeouts,
+                "wait_total_ms": round(self._wait_total * 1000, 3),
+                "wait_avg_ms": round(self._wait_total * 1000 / self._checkouts, 3) if self._checkouts else 0.0,
+                "wait_max_ms": round(self._wait_max * 1000, 3),
+            }
+
+# A copy of the database for readers, taken with the backup API and
+# replaced every `interval` seconds if anything was committed since. Each
+# copy is a new file opened immutable, so reading it takes no locks; the
+# previous one is unlinked at once and lives on until its last reader is
+# done with it.
+class SnapshotReplica:
+    def __init__(self, database, pool, interval=SNAPSHOT_INTERVAL, directory=SNAPSHOT_DIR):
+        self.database = database
+        self.pool = pool
+        self.interval = interval
+        self.directory = directory
+        self.path = None
+        # Wall-clock time the current copy was started; every commit made
+        # before it is in the copy
+        self.taken_at = None
+        self.refreshes = 0
+        self._copies = 0
+        self._source = None
+        self._data_version = None
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stopped = threading.Event()
+
+    # Take the first copy if there is none yet and keep refreshing it
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._run, name="db-snapshot", daemon=True)
+            self._thread.start()
+            atexit.register(self.close)
+        if self.path is None:
+            self.refresh()
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                self.refresh()
+            except sqlite3.Error:
+                # Keep the current copy; a busy or locked database is transient
+                pass
+
+    # Copy the database if anything was committed since the last copy.
+    # Returns whether a new copy was taken.
+    def refresh(self):
+        with self._lock:
+            if self._source is None:
+                self._source = sqlite3.connect(self.database, check_same_thread=False)
+                self._source.execute("PRAGMA busy_timeout = 5000")
+            # data_version changes whenever another connection commits
+            data_version = self._source.execute("PRAGMA data_version").fetchone()[0]
+            if self.path is not None and data_version == self._data_version:
+                return False
+            started = time.time()
+            self._copies += 1
+            path = os.path.join(self.directory, f"{os.path.basename(self.database)}.read-{os.getpid()}-{self._copies}")
+            target = sqlite3.connect(path)
+            try:
+                self._source.backup(target)
+                target.execute("PRAGMA journal_mode = DELETE")
+            finally:
+                target.close()
+            previous, self.path = self.path, path
+            self.taken_at, self._data_version = started, data_version
+            self.refreshes += 1
+            self.pool.reopen(read_only_uri(path, immutable=True))
+        if previous is not None:
+            remove_file(previous)
+        return True
+
+    def close(self):
+        self._stopped.set()
+        with self._lock:
+            if self._source is not None:
+                self._source.close()
+                self._source = None
+            path, self.path, self.taken_at, self._thread = self.path, None, None, None
+        self.pool.close_all()
+        if path is not None:
+            remove_file(path)
+
+    def stats(self):
+        return {
+            "refreshes": self.refreshes,
+            "age_s": round(time.time() - self.taken_at, 3) if self.taken_at else None,
+        }
+
+def remove_file(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+class SQLiteBackend(Backend):
+    name = "sqlite"
+    integrity_errors = (sqlite3.IntegrityError,)
+    database_errors = (sqlite3.DatabaseError,)
+
+    def __init__(self, database, read_routing=READ_ROUTING):
+        if read_routing not in READ_ROUTINGS:
+            raise ValueError(f"DB_READ_ROUTING must be one of: {', '.join(READ_ROUTINGS)}")
+        self.database = database
+        self.read_routing = read_routing
+        self.pool = ConnectionPool(database)
+        self.read_pool = None
+        self.replica = None
+        if read_routing == "ro":
+            self.read_pool = ConnectionPool(read_only_uri(database), READ_POOL_SIZE, uri=True, pragmas=READ_PRAGMAS)
+        elif read_routing == "snapshot":
+            self.read_pool = ConnectionPool(None, READ_POOL_SIZE, uri=True, pragmas=READ_PRAGMAS)
+            self.replica = SnapshotReplica(database, self.read_pool)
+
+    def acquire(self):
+        return self.pool.acquire()
+
+    def release(self, conn):
+        self.pool.release(conn)
+
+    def acquire_reader(self):
+        if self.read_pool is None:
+            return self.pool.acquire()
+        if self.replica is not None:
+            self.replica.start()
+        return self.read_pool.acquire()
+
+    def release_reader(self, conn):
+        (self.pool if self.read_pool is None else self.read_pool).release(conn)
+
+    def readers_current_as_of(self):
+        return self.replica.taken_at if self.replica is not None else None
+
+    def table_info(self, conn, table):
+        return [tuple(row[1:6]) for row in conn.execute(f"PRAGMA table_info({table})")]
+
+    def begin(self, conn, immediate=False):
+        conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+
+    def insert(self, conn, table, columns, values, key):
+        placeholders = ", ".join("?" for _ in columns)
+        sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})"
+        if RETURNING_SUPPORTED:
+            return conn.execute(f"{sql} RETURNING {key}", values).fetchall()[0][0]
+        return conn.execute(sql, values).lastrowid
+
+    def stream(self, conn, sql, params, batch_size):
+        cursor = conn.execute(sql, params)
+        try:
+            while True:
+                batch = cursor.fetchmany(batch_size)
+                if not batch:
+                    break
+                yield batch
+        finally:
+            cursor.close()
+
+    def explain(self, conn, sql, params):
+        return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()]
+
+    # Wipes the database file and rebuilds it from schema.sql plus migrations
+    def initialize(self):
+        from api.db.migrate import migrate
+        self.close()
+        for path in (self.database, self.database + "-wal", self.database + "-shm"):
+            if os.path.exists(path):
+                os.remove(path)
+        conn = sqlite3.connect(self.database)
+        with open(SCHEMA, "r") as f:
+            conn.executescript(f.read())
+        conn.commit()
+        conn.close()
+        migrate(self.database)
+
+    def upgrade(self):
+        from api.db.migrate import migrate
+        return migrate(self.database)
+
+    def stats(self):
+        stats = self.pool.stats()
+        if self.read_pool is not None:
+            stats["readers"] = {"routing": self.read_routing, **self.read_pool.stats()}
+            if self.replica is not None:
+                stats["readers"]["snapshot"] = self.replica.stats()
+        return stats
+
+    def close(self):
+        self.pool.close_all()
+        if self.replica is not None:
+            self.replica.close()
+        elif self.read_pool is not None:
+            self.read_pool.close_all()
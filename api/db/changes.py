@@ -0,0 +1,237 @@
+# Reading the change log (migration 0008) and fanning it out to clients.
+#
+# One ChangeFeed per process polls change_log every CHANGE_POLL_INTERVAL
+# seconds and keeps the most recent CHANGE_BUFFER changes in memory, each
+# with its row as it was when polled. Every /api/changes/stream connection
+# is served from that buffer, so the number of open dashboards does not
+# multiply database reads. Clients that resume from further back than the
+# buffer reaches are caught up from the table itself.
+from bisect import bisect_right
+from api.db.backends import get_backend
+from datetime import datetime, timedelta, timezone
+import json
+import os
+import sys
+import threading
+
+CHANGE_POLL_INTERVAL = float(os.getenv("CHANGE_POLL_INTERVAL", 0.5))
+CHANGE_BUFFER = int(os.getenv("CHANGE_BUFFER", 10000))
+# Changes read from change_log per query
+CHANGE_BATCH = 500
+# How long change_log keeps rows, in days, when pruned from the CLI
+CHANGE_RETENTION_DAYS = int(os.getenv("CHANGE_RETENTION_DAYS", 7))
+
+# Tables in the feed and their key columns
+FEED_TABLES = {
+    "departments": ("department_id",),
+    "employees": ("employee_id",),
+    "hardware": ("device_id",),
+    "computers": ("device_id",),
+    "printers": ("device_id",),
+    "devices": ("device_id",),
+    "audio_video": ("device_id",),
+    "software": ("software_id",),
+    "data": ("data_id",),
+    "inventory_assignments": ("assignment_id",),
+    "data_members": ("data_id", "employee_id"),
+}
+
+# The client asked to resume from changes that have since been pruned
+class ChangesExpired(Exception):
+    pass
+
+def parse_key(table, row_key):
+    return dict(zip(FEED_TABLES[table], (int(part) for part in str(row_key).split(","))))
+
+# Attach each change's current row (None once deleted). Rows are read with
+# one query per table and key column set, not one per change.
+def attach_rows(db, changes):
+    wanted = {}
+    for change in changes:
+        if change["op"] != "delete":
+            wanted.setdefault(change["table"], set()).add(tuple(change["key"].values()))
+    rows = {}
+    for table, keys in wanted.items():
+        key_columns = FEED_TABLES[table]
+        cursor = db.execute(
+            f"SELECT * FROM {table} WHERE ({', '.join(key_columns)}) IN"
+            f" (VALUES {', '.join('(' + ', '.join('?' for _ in key_columns) + ')' for _ in keys)})",
+            [value for key in keys for value in key],
+        )
+        columns = [column[0] for column in cursor.description]
+        for row in cursor.fetchall():
+            record = dict(zip(columns, row))
+            rows[(table, tuple(record[column] for column in key_columns))] = record
+    for change in changes:
+        change["row"] = None if change["op"] == "delete" else rows.get((change["table"], tuple(change["key"].values())))
+    return changes
+
+def latest_seq(db):
+    return db.execute("SELECT coalesce(max(seq), 0) FROM change_log").fetchone()[0]
+
+# Up to `limit` changes after `since`, oldest first, with their rows. Raises
+# ChangesExpired when changes right after `since` have already been pruned.
+def read_changes(db, since, limit=CHANGE_BATCH):
+    rows = db.execute(
+        "SELECT seq, table_name, row_key, op, changed_at FROM change_log WHERE seq > ? ORDER BY seq LIMIT ?",
+        (since, limit),
+    ).fetchall()
+    # A hole right after `since` is pruning when nothing older than the
+    # first row is left. Holes further in are rolled-back inserts: SQLite
+    # gives those seqs back, PostgreSQL sequences do not.
+    if rows and rows[0][0] > since + 1 and db.execute(
+        "SELECT min(seq) FROM change_log"
+    ).fetchone()[0] == rows[0][0]:
+        raise ChangesExpired(f"Changes after {since} are no longer available")
+    changes = [
+        {"seq": seq, "table": table, "key": parse_key(table, row_key), "op": op, "changed_at": changed_at}
+        for seq, table, row_key, op, changed_at in rows
+    ]
+    return attach_rows(db, changes)
+
+# Delete changes older than `days`, always keeping the newest so a resuming
+# client can still tell whether it missed anything
+def prune_changes(db, days=CHANGE_RETENTION_DAYS):
+    # changed_at is UTC "YYYY-MM-DD HH:MM:SS" on every backend
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=days)).strftime("%Y-%m-%d %H:%M:%S")
+    return db.execute(
+        "DELETE FROM change_log WHERE changed_at < ? AND seq < (SELECT max(seq) FROM change_log)",
+        (cutoff,),
+    ).rowcount
+
+def event_bytes(event, data, event_id=None):
+    lines = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{lines}event: {event}\ndata: {json.dumps(data, default=str)}\n\n".encode()
+
+def change_event(change):
+    return event_bytes("change", change, change["seq"])
+
+class ChangeFeed:
+    def __init__(self, interval=CHANGE_POLL_INTERVAL, buffer=CHANGE_BUFFER):
+        self.interval = interval
+        self.buffer = buffer
+        # Every change with seq > floor is in _events, as (table, SSE event
+        # bytes) in seq order; serialised once however many clients read it
+        self.floor = 0
+        self.head = 0
+        self._seqs = []
+        self._events = []
+        self._condition = threading.Condition()
+        self._thread = None
+        self._stopped = threading.Event()
+
+    def start(self):
+        with self._condition:
+            if self._thread is not None:
+                return
+            db = get_backend().acquire()
+            try:
+                self.floor = self.head = latest_seq(db)
+            finally:
+                get_backend().release(db)
+            self._thread = threading.Thread(target=self._run, name="change-feed", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self.wake()
+
+    @property
+    def stopped(self):
+        return self._stopped.is_set()
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                self.poll()
+            except Exception:
+                # Keep polling; a locked or restarting database is transient
+                pass
+
+    def poll(self):
+        backend = get_backend()
+        db = backend.acquire()
+        try:
+            # At most a buffer's worth per poll; a bulk import's remaining
+            # changes are picked up by the following polls
+            changes = []
+            since = self.head
+            while len(changes) < self.buffer:
+                batch = read_changes(db, since)
+                changes.extend(batch)
+                if len(batch) < CHANGE_BATCH:
+                    break
+                since = batch[-1]["seq"]
+        except ChangesExpired:
+            # Pruned past what we had seen: start over from the newest change
+            changes = []
+            with self._condition:
+                self._seqs, self._events = [], []
+                self.floor = self.head = latest_seq(db)
+        finally:
+            backend.release(db)
+        if changes:
+            with self._condition:
+                self._seqs.extend(change["seq"] for change in changes)
+                self._events.extend((change["table"], change_event(change)) for change in changes)
+                self.head = changes[-1]["seq"]
+                if len(self._seqs) > 2 * self.buffer:
+                    drop = len(self._seqs) - self.buffer
+                    self.floor = self._seqs[drop - 1]
+                    del self._seqs[:drop], self._events[:drop]
+            self.wake()
+
+    def wake(self):
+        with self._condition:
+            self._condition.notify_all()
+
+    # (SSE bytes for the changes after `since` in `tables` (all if None),
+    # seq to resume from). Served from memory when the buffer reaches back
+    # far enough; otherwise one batch is read from change_log.
+    def events_after(self, since, tables=None):
+        with self._condition:
+            if since >= self.floor:
+                events = self._events[bisect_right(self._seqs, since):]
+                return b"".join(data for table, data in events if tables is None or table in tables), max(since, self.head)
+        backend = get_backend()
+        db = backend.acquire()
+        try:
+            changes = read_changes(db, since)
+        finally:
+            backend.release(db)
+        last = changes[-1]["seq"] if changes else since
+        return b"".join(change_event(change) for change in changes if tables is None or change["table"] in tables), last
+
+    # Block until there is a change after `since`, the feed stops or
+    # `timeout` passes; True unless it timed out
+    def wait(self, since, timeout):
+        with self._condition:
+            return self._condition.wait_for(lambda: self.head > since or self.stopped, timeout)
+
+_feed = None
+_feed_lock = threading.Lock()
+
+# The process-wide feed, polling from its first use on
+def get_change_feed():
+    global _feed
+    with _feed_lock:
+        if _feed is None:
+            _feed = ChangeFeed()
+    _feed.start()
+    return _feed
+
+def shutdown_change_feed():
+    with _feed_lock:
+        if _feed is not None:
+            _feed.stop()
+
+if __name__ == "__main__":
+    if "--prune" in sys.argv[1:]:
+        backend = get_backend()
+        conn = backend.acquire()
+        try:
+            removed = prune_changes(conn)
+            conn.commit()
+        finally:
+            backend.release(conn)
+        print(f"Pruned {removed} changes older than {CHANGE_RETENTION_DAYS} days")
@@ -1,26 +1,83 @@
-import sqlite3
-from flask import g
+from flask import g, has_request_context, request, session
+from api.db.backends import get_backend
+from api.db.instrument import QueryStats, TimedConnection
+import os
+import time
 
-DATABASE = "api/db/inventory.db"  # Adjust the path if your DB file lives elsewhere
+# Absolute so the API works from any working directory; DATABASE_PATH overrides it
+DATABASE = os.getenv("DATABASE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "inventory.db"))
 
+# Table metadata per table, read once from the backend and reused
+_table_info = {}
+
+# Recreate the database from its schema and bring it up to date.
+# This wipes all data; use `python -m api.db.migrate` to upgrade in place.
 def initialize_db():
-    conn = sqlite3.connect(DATABASE)
-    with open("api/db/schema.sql", "r") as f:
-        conn.executescript(f.read())
-    conn.commit()
-    conn.close()
+    get_backend().initialize()
+    _table_info.clear()
+
+READ_METHODS = ("GET", "HEAD")
+# "X-Read-Consistency: primary" sends a read to the primary connections
+READ_CONSISTENCY_HEADER = "X-Read-Consistency"
 
+# Whether this request reads from the backend's read-only connections: GET
+# and HEAD do, unless the client asks for the primary or the session wrote
+# something readers may not see yet (read-your-writes)
+def use_reader():
+    if not has_request_context() or request.method not in READ_METHODS:
+        return False
+    if request.headers.get(READ_CONSISTENCY_HEADER, "").lower() == "primary":
+        return False
+    current_as_of = get_backend().readers_current_as_of()
+    return current_as_of is None or session.get("wrote_at", 0) < current_as_of
+
+# Pooled connection for the current app context: a read-only one for reads
+# (see use_reader), else a primary one. Its queries are timed into
+# g.query_stats, which the metrics middleware reads when the request ends.
 def get_db():
     if "db" not in g:
-        g.db = sqlite3.connect(DATABASE)
-        g.db.row_factory = sqlite3.Row
+        if "query_stats" not in g:
+            g.query_stats = QueryStats()
+        g.db_reader = use_reader()
+        backend = get_backend()
+        g.db = TimedConnection(backend.acquire_reader() if g.db_reader else backend.acquire(), g.query_stats)
     return g.db
 
 def close_db(e=None):
     db = g.pop("db", None)
     if db is not None:
-        db.close()
+        if g.pop("db_reader", False):
+            get_backend().release_reader(db.detach())
+        else:
+            get_backend().release(db.detach())
+
+# When readers can lag behind (a snapshot or replica), note in the session
+# when it last wrote, so its reads go to the primary until readers catch up
+def remember_write(response):
+    if (request.method not in READ_METHODS and g.get("db") is not None and not g.get("db_reader")
+            and get_backend().readers_current_as_of() is not None):
+        session["wrote_at"] = time.time()
+    return response
+
+# Upgrade the schema (unless DB_AUTO_MIGRATE=false) and return pooled
+# connections to the pool when each app context ends
+def init_app(app):
+    if os.getenv("DB_AUTO_MIGRATE", "true").lower() == "true":
+        get_backend().upgrade()
+    app.after_request(remember_write)
+    app.teardown_appcontext(close_db)
+
+# (name, declared type, notnull, default, pk) for each column of a table
+def get_table_info(db, table):
+    info = _table_info.get(table)
+    if info is None:
+        info = get_backend().table_info(db, table)
+        _table_info[table] = info
+    return info
+
+def get_table_columns(db, table):
+    return [column[0] for column in get_table_info(db, table)]
 
 if __name__ == "__main__":
     initialize_db()
-    print("Database initialized successfully")
\ No newline at end of file
+    print("Database initialized successfully")
@@ -0,0 +1,194 @@
+# Point-in-time reads over the asset event log (migration 0006).
+#
+# The state of a device on date D is the nearest snapshot taken on or before
+# D plus the events recorded after that snapshot up to D. Snapshots are taken
+# every ASSET_SNAPSHOT_EVENTS events (python -m api.db.history from cron, or
+# POST /api/inventory/snapshots), which bounds how much a read replays.
+# `python -m api.db.history --backfill` adds snapshots over the history that
+# predates the first one.
+from api.db.backends import get_backend
+import os
+import sys
+
+SNAPSHOT_EVERY = int(os.getenv("ASSET_SNAPSHOT_EVENTS", 10000))
+
+EVENT_COLUMNS = ("event_id", "device_id", "event_date", "event_type", "employee_id", "status")
+
+# (snapshot_id, snapshot_date, last_event_id) of the latest snapshot taken on
+# or before `as_of`, or None when the date predates every snapshot
+def nearest_snapshot(db, as_of):
+    return db.execute(
+        "SELECT snapshot_id, snapshot_date, last_event_id FROM asset_snapshots"
+        " WHERE snapshot_date <= ? ORDER BY snapshot_date DESC, last_event_id DESC LIMIT 1",
+        (as_of,),
+    ).fetchone()
+
+# Apply one (device_id, event_type, employee_id, status) event to {device_id: state}
+def apply_event(states, event):
+    device_id, event_type, employee_id, status = event
+    if event_type == "deleted":
+        states.pop(device_id, None)
+    elif event_type == "created":
+        states[device_id] = {"assignee": employee_id, "status": status}
+    else:
+        state = states.setdefault(device_id, {"assignee": None, "status": None})
+        if event_type == "assignee":
+            state["assignee"] = employee_id
+        else:
+            state["status"] = status
+
+def state_dict(device_id, state):
+    return {"device_id": device_id, "assignee": state["assignee"], "status": state["status"]}
+
+# One device's {device_id, assignee, status} on `as_of`, or None if it did
+# not exist then. Returns (state, snapshot row, events replayed).
+def device_as_of(db, device_id, as_of):
+    snapshot = nearest_snapshot(db, as_of)
+    states = {}
+    last_event_id = 0
+    if snapshot is not None:
+        last_event_id = snapshot[2]
+        row = db.execute(
+            "SELECT assignee, status FROM asset_snapshot_items WHERE snapshot_id = ? AND device_id = ?",
+            (snapshot[0], device_id),
+        ).fetchone()
+        if row is not None:
+            states[device_id] = {"assignee": row[0], "status": row[1]}
+    events = db.execute(
+        "SELECT device_id, event_type, employee_id, status FROM asset_events"
+        " WHERE device_id = ? AND event_id > ? AND event_date <= ? ORDER BY event_id",
+        (device_id, last_event_id, as_of),
+    ).fetchall()
+    for event in events:
+        apply_event(states, event)
+    state = states.get(device_id)
+    return (state_dict(device_id, state) if state else None), snapshot, len(events)
+
+# One keyset page of the whole fleet on `as_of`, in device_id order after
+# `cursor`. The page's device_id range is fixed from the snapshot first, so
+# only the delta events inside that range are replayed.
+# Returns (devices, next_cursor, snapshot row, events replayed).
+def fleet_as_of(db, as_of, limit, cursor=None):
+    after = cursor or 0
+    snapshot = nearest_snapshot(db, as_of)
+    if snapshot is not None:
+        last_event_id = snapshot[2]
+        rows = db.execute(
+            "SELECT device_id, assignee, status FROM asset_snapshot_items"
+            " WHERE snapshot_id = ? AND device_id > ? ORDER BY device_id LIMIT ?",
+            (snapshot[0], after, limit + 1),
+        ).fetchall()
+        states = {row[0]: {"assignee": row[1], "status": row[2]} for row in rows[:limit]}
+    else:
+        # Before the first snapshot: replay from the start of the log
+        last_event_id = 0
+        rows = db.execute(
+            "SELECT device_id FROM asset_events WHERE device_id > ? AND event_date <= ?"
+            " GROUP BY device_id ORDER BY device_id LIMIT ?",
+            (after, as_of, limit + 1),
+        ).fetchall()
+        states = {}
+
+    # Events only interact within a device, so they are read in (device_id,
+    # event_id) order off idx_asset_events_device. The unary + keeps SQLite
+    # from walking the whole delta by rowid instead of just this page's range.
+    sql = ("SELECT device_id, event_type, employee_id, status FROM asset_events"
+           " WHERE +event_id > ? AND event_date <= ? AND device_id > ?")
+    params = [last_event_id, as_of, after]
+    upper = None
+    if len(rows) > limit:
+        upper = rows[limit - 1][0]
+        sql += " AND device_id <= ?"
+        params.append(upper)
+    events = db.execute(sql + " ORDER BY device_id, event_id", params).fetchall()
+    for event in events:
+        apply_event(states, event)
+
+    device_ids = sorted(states)
+    page = device_ids[:limit]
+    if len(device_ids) > limit:
+        next_cursor = page[-1]
+    else:
+        next_cursor = upper
+    return [state_dict(device_id, states[device_id]) for device_id in page], next_cursor, snapshot, len(events)
+
+def events_since_snapshot(db):
+    row = db.execute(
+        "SELECT coalesce((SELECT max(event_id) FROM asset_events), 0)"
+        " - coalesce((SELECT max(last_event_id) FROM asset_snapshots), 0)"
+    ).fetchone()
+    return row[0]
+
+def insert_snapshot(db, snapshot_date, last_event_id):
+    return get_backend().insert(
+        db, "asset_snapshots", ("snapshot_date", "last_event_id"), (snapshot_date, last_event_id), "snapshot_id"
+    )
+
+# Materialise today's state of every device. hardware already holds the
+# state the log replays to, so the snapshot is copied from it; run this
+# inside a write transaction so no event lands between the two reads.
+# Returns the new snapshot_id, or None if nothing changed since the last one.
+def take_snapshot(db):
+    if events_since_snapshot(db) <= 0 and db.execute("SELECT 1 FROM asset_snapshots LIMIT 1").fetchone():
+        return None
+    today, last_event_id = db.execute(
+        "SELECT CURRENT_DATE, coalesce(max(event_id), 0) FROM asset_events"
+    ).fetchone()
+    snapshot_id = insert_snapshot(db, today, last_event_id)
+    db.execute(
+        "INSERT INTO asset_snapshot_items (snapshot_id, device_id, assignee, status)"
+        " SELECT ?, device_id, assignee, status FROM hardware",
+        (snapshot_id,),
+    )
+    return snapshot_id
+
+def snapshot_if_due(db, every=SNAPSHOT_EVERY):
+    if events_since_snapshot(db) < every:
+        return None
+    return take_snapshot(db)
+
+# Snapshots for the history recorded before the first snapshot (the rows
+# migration 0006 backfilled), one every `every` events, built by replaying
+# the log once. Without them a read that far back replays from the start.
+def backfill_snapshots(db, every=SNAPSHOT_EVERY * 10):
+    first = db.execute("SELECT min(last_event_id) FROM asset_snapshots").fetchone()[0]
+    if first is None:
+        return []
+    covered = set(row[0] for row in db.execute("SELECT last_event_id FROM asset_snapshots"))
+    states = {}
+    created = []
+    events = db.execute(
+        "SELECT event_id, event_date, device_id, event_type, employee_id, status FROM asset_events"
+        " WHERE event_id <= ? ORDER BY event_id",
+        (first,),
+    ).fetchall()
+    for position, (event_id, event_date, *event) in enumerate(events, 1):
+        apply_event(states, event)
+        if position % every or event_id == first or event_id in covered:
+            continue
+        snapshot_id = insert_snapshot(db, event_date, event_id)
+        db.executemany(
+            "INSERT INTO asset_snapshot_items (snapshot_id, device_id, assignee, status) VALUES (?, ?, ?, ?)",
+            ((snapshot_id, device_id, state["assignee"], state["status"]) for device_id, state in sorted(states.items())),
+        )
+        created.append(snapshot_id)
+    return created
+
+if __name__ == "__main__":
+    backend = get_backend()
+    conn = backend.acquire()
+    try:
+        backend.begin(conn, immediate=True)
+        if "--backfill" in sys.argv[1:]:
+            created = backfill_snapshots(conn)
+            message = f"Took {len(created)} historical snapshots"
+        else:
+            snapshot_id = take_snapshot(conn) if "--force" in sys.argv[1:] else snapshot_if_due(conn)
+            message = f"Took snapshot {snapshot_id}" if snapshot_id else "No snapshot due"
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        backend.release(conn)
+    print(message)
@@ -0,0 +1,197 @@
+from api.db.backends import get_backend
+import logging
+import os
+import re
+import threading
+import time
+import weakref
+
+# Statements slower than this (execute plus fetching every row) are logged
+# together with their query plan
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", 100))
+
+# Only these can be explained; BEGIN, SAVEPOINT, PRAGMA and friends cannot
+EXPLAINABLE = re.compile(r"^\s*(SELECT|INSERT|UPDATE|DELETE|WITH|REPLACE)\b", re.IGNORECASE)
+
+# Statements binding more parameters than this run untraced. sqlite3 renders
+# every bound value into the statement text on each trace call, and a write
+# makes one call per statement its triggers run, so a batch UPDATE over a
+# long IN list would spend its time re-rendering the list.
+TRACE_MAX_PARAMS = 100
+
+slow_query_log = logging.getLogger("api.db.slow_query")
+
+_slow_queries = 0
+_slow_lock = threading.Lock()
+
+def slow_query_count():
+    return _slow_queries
+
+# Database work done on behalf of one request (or one CLI run)
+class QueryStats:
+    def __init__(self):
+        self.queries = 0
+        self.statements = 0
+        self.seconds = 0.0
+        self.rows = 0
+        self.slow = 0
+
+    # sqlite3 trace callback: sees every statement SQLite runs, including
+    # ones fired by triggers, BEGIN/COMMIT and the pool's rollbacks
+    def trace(self, statement):
+        self.statements += 1
+
+# Cursor that times execute and fetch calls. SQLite does most of a query's
+# work while rows are being fetched, so a statement's time is only final
+# once its rows are exhausted, the cursor is closed or re-executed.
+class TimedCursor:
+    def __init__(self, cursor, conn):
+        self.cursor = cursor
+        self.conn = conn
+        self.sql = None
+        self.params = ()
+        self.elapsed = 0.0
+        self.fetched = 0
+
+    def _timed(self, fn, *args):
+        started = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            spent = time.perf_counter() - started
+            self.elapsed += spent
+            self.conn.stats.seconds += spent
+
+    def _begin(self, sql, params):
+        self._finish()
+        self.sql = sql
+        self.params = params
+        self.elapsed = 0.0
+        self.fetched = 0
+        self.conn.stats.queries += 1
+
+    def _count(self, rows):
+        self.fetched += rows
+        self.conn.stats.rows += rows
+
+    def _finish(self):
+        if self.sql is None:
+            return
+        sql, params, elapsed, fetched = self.sql, self.params, self.elapsed, self.fetched
+        self.sql = None
+        if elapsed * 1000 >= SLOW_QUERY_MS:
+            self.conn.report_slow(sql, params, elapsed, fetched)
+
+    def execute(self, sql, params=()):
+        self._begin(sql, params)
+        if self.conn.traced and len(params) > TRACE_MAX_PARAMS:
+            # Counted as one statement, whatever its triggers run
+            self.conn.stats.statements += 1
+            self.conn.conn.set_trace_callback(None)
+            try:
+                self._timed(self.cursor.execute, sql, params)
+            finally:
+                self.conn.conn.set_trace_callback(self.conn.stats.trace)
+        else:
+            self._timed(self.cursor.execute, sql, params)
+        return self
+
+    def executemany(self, sql, seq_of_params):
+        self._begin(sql, ())
+        self._timed(self.cursor.executemany, sql, seq_of_params)
+        self._finish()
+        return self
+
+    def fetchone(self):
+        row = self._timed(self.cursor.fetchone)
+        if row is None:
+            self._finish()
+        else:
+            self._count(1)
+        return row
+
+    def fetchmany(self, size):
+        rows = self._timed(self.cursor.fetchmany, size)
+        self._count(len(rows))
+        if len(rows) < size:
+            self._finish()
+        return rows
+
+    def fetchall(self):
+        rows = self._timed(self.cursor.fetchall)
+        self._count(len(rows))
+        self._finish()
+        return rows
+
+    def __iter__(self):
+        while True:
+            rows = self.fetchmany(256)
+            yield from rows
+            if len(rows) < 256:
+                return
+
+    def close(self):
+        self._finish()
+        self.cursor.close()
+
+    @property
+    def rowcount(self):
+        return self.cursor.rowcount
+
+    @property
+    def lastrowid(self):
+        return self.cursor.lastrowid
+
+    @property
+    def description(self):
+        return self.cursor.description
+
+# Connection wrapper handed out by get_db(). Everything not timed here
+# (commit, rollback, in_transaction, raw, ...) goes straight through.
+class TimedConnection:
+    def __init__(self, conn, stats):
+        self.conn = conn
+        self.stats = stats
+        self._cursors = weakref.WeakSet()
+        self.traced = hasattr(conn, "set_trace_callback")
+        if self.traced:
+            conn.set_trace_callback(stats.trace)
+
+    def cursor(self):
+        cursor = TimedCursor(self.conn.cursor(), self)
+        self._cursors.add(cursor)
+        return cursor
+
+    def execute(self, sql, params=()):
+        return self.cursor().execute(sql, params)
+
+    def executemany(self, sql, seq_of_params):
+        return self.cursor().executemany(sql, seq_of_params)
+
+    def __getattr__(self, name):
+        return getattr(self.conn, name)
+
+    def report_slow(self, sql, params, elapsed, rows):
+        global _slow_queries
+        self.stats.slow += 1
+        with _slow_lock:
+            _slow_queries += 1
+        plan = []
+        if EXPLAINABLE.match(sql):
+            try:
+                plan = get_backend().explain(self.conn, sql, params)
+            except Exception as e:
+                plan = [f"(plan unavailable: {e})"]
+        slow_query_log.warning(
+            "Slow query: %.1f ms, %d rows\n%s\n%s",
+            elapsed * 1000, rows, " ".join(sql.split()), "\n".join(f"  {line}" for line in plan),
+        )
+
+    # Settle statements whose cursors were never drained or closed, and
+    # unhook the trace callback before the connection goes back to the pool
+    def detach(self):
+        for cursor in list(self._cursors):
+            cursor._finish()
+        if self.traced:
+            self.conn.set_trace_callback(None)
+        return self.conn
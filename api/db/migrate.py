@@ -0,0 +1,179 @@
+import importlib.util
+import os
+import re
+import sqlite3
+import sys
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), "migrations")
+MIGRATION_FILE = re.compile(r"^(\d{4})_(\w+)\.(sql|py)$")
+
+# Representative queries behind the list and filter endpoints. check_query_plans
+# reports any of them that the planner answers with a full table scan.
+HOT_QUERIES = {
+    "hardware page": "SELECT * FROM hardware WHERE device_id > 0 ORDER BY device_id LIMIT 100",
+    "hardware by assignee": "SELECT device_id FROM hardware WHERE assignee = 1",
+    "hardware by status": "SELECT device_id FROM hardware WHERE status = 'active' ORDER BY device_id LIMIT 100",
+    "hardware by status and type": "SELECT device_id FROM hardware WHERE status = 'active' AND device_type = 'laptop'",
+    "warranty expiry range": "SELECT device_id FROM hardware WHERE warranty_expiration BETWEEN '2024-01-01' AND '2024-03-31'",
+    "software by assignee": "SELECT software_id FROM software WHERE assignee = 1",
+    "licence expiry range": "SELECT software_id FROM software WHERE expiration_date BETWEEN '2024-01-01' AND '2024-03-31'",
+    "assignments by employee": "SELECT assignment_id FROM inventory_assignments WHERE employee_id = 1",
+    "active loans": "SELECT device_id, employee_id, assigned_date FROM inventory_assignments WHERE return_date IS NULL",
+    "open loans page": (
+        "SELECT assignment_id FROM inventory_assignments"
+        " WHERE return_date IS NULL AND device_id > 0 ORDER BY device_id LIMIT 100"
+    ),
+    "open loans by employee": (
+        "SELECT assignment_id FROM inventory_assignments"
+        " WHERE return_date IS NULL AND employee_id = 1 AND device_id > 0 ORDER BY device_id LIMIT 100"
+    ),
+    "overdue loans": (
+        "SELECT assignment_id FROM inventory_assignments"
+        " WHERE return_date IS NULL AND due_date < '2024-01-01'"
+        " ORDER BY due_date, assignment_id LIMIT 100"
+    ),
+    "removal queue": (
+        "SELECT device_id FROM hardware"
+        " WHERE removal_requested_date IS NOT NULL AND status <> 'decommissioned'"
+        " ORDER BY removal_requested_date, device_id LIMIT 100"
+    ),
+    "data members": "SELECT employee_id FROM data_members WHERE data_id = 1 AND employee_id > 0 ORDER BY employee_id LIMIT 100",
+    "data access by employee": "SELECT data_id FROM data_members WHERE employee_id = 1 AND data_id > 0 ORDER BY data_id LIMIT 100",
+    "asset history": "SELECT * FROM asset_events WHERE device_id = 1 AND event_id > 0 ORDER BY event_id LIMIT 100",
+    "nearest snapshot": (
+        "SELECT snapshot_id FROM asset_snapshots"
+        " WHERE snapshot_date <= '2024-01-01' ORDER BY snapshot_date DESC, last_event_id DESC LIMIT 1"
+    ),
+    "as-of snapshot page": (
+        "SELECT device_id, assignee, status FROM asset_snapshot_items"
+        " WHERE snapshot_id = 1 AND device_id > 0 ORDER BY device_id LIMIT 100"
+    ),
+    "as-of delta": (
+        "SELECT device_id, event_type FROM asset_events WHERE +event_id > 0 AND event_date <= '2024-01-01'"
+        " AND device_id > 0 AND device_id <= 100 ORDER BY device_id, event_id"
+    ),
+    "asset with subtypes": (
+        "SELECT * FROM hardware h"
+        " LEFT JOIN computers c ON c.device_id = h.device_id"
+        " LEFT JOIN printers p ON p.device_id = h.device_id"
+        " LEFT JOIN devices d ON d.device_id = h.device_id"
+        " LEFT JOIN audio_video av ON av.device_id = h.device_id"
+        " LEFT JOIN employees e ON e.employee_id = h.assignee"
+        " WHERE h.device_id > 0 ORDER BY h.device_id LIMIT 100"
+    ),
+    "changes after seq": (
+        "SELECT seq, table_name, row_key, op, changed_at FROM change_log WHERE seq > 0 ORDER BY seq LIMIT 500"
+    ),
+    "prune changes": (
+        "SELECT seq FROM change_log WHERE changed_at < '2024-01-01 00:00:00'"
+        " AND seq < (SELECT max(seq) FROM change_log)"
+    ),
+    "alert queue": (
+        "SELECT alert_id FROM alerts WHERE resolved_at IS NULL"
+        " AND (expires_on, alert_id) > ('2024-01-01', 0) ORDER BY expires_on, alert_id LIMIT 100"
+    ),
+    "alert queue by state": (
+        "SELECT alert_id FROM alerts WHERE resolved_at IS NULL AND state = 'expired'"
+        " AND (expires_on, alert_id) > ('2024-01-01', 0) ORDER BY expires_on, alert_id LIMIT 100"
+    ),
+    "unsent alerts": "SELECT alert_id FROM alerts WHERE notified_at IS NULL ORDER BY alert_id LIMIT 100",
+    "expiring alerts to close": (
+        "SELECT alert_id FROM alerts WHERE state = 'expiring' AND expires_on < '2024-01-01' AND resolved_at IS NULL"
+    ),
+    "idempotency key": "SELECT status FROM idempotency_keys WHERE user_id = 1 AND idempotency_key = 'k'",
+    "expired idempotency keys": "SELECT entry_id FROM idempotency_keys WHERE created_at < 0",
+}
+
+class MigrationError(RuntimeError):
+    pass
+
+# (version, name, path) for every migration file, in version order
+def discover_migrations(directory=MIGRATIONS_DIR):
+    migrations = []
+    for filename in os.listdir(directory):
+        match = MIGRATION_FILE.match(filename)
+        if match:
+            migrations.append((int(match.group(1)), match.group(2), os.path.join(directory, filename)))
+    migrations.sort()
+    versions = [version for version, _, _ in migrations]
+    if len(versions) != len(set(versions)):
+        raise MigrationError("Duplicate migration version in " + directory)
+    return migrations
+
+def get_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+# Split a script into single statements (trigger bodies stay in one piece)
+def split_statements(script):
+    statement = ""
+    for line in script.splitlines(keepends=True):
+        statement += line
+        if sqlite3.complete_statement(statement):
+            yield statement
+            statement = ""
+
+def run_migration(conn, path):
+    if path.endswith(".sql"):
+        with open(path, "r") as f:
+            for statement in split_statements(f.read()):
+                conn.execute(statement)
+    else:
+        spec = importlib.util.spec_from_file_location(f"api.db.migrations.m{os.path.basename(path)[:4]}", path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        module.upgrade(conn)
+
+# Apply every migration newer than the database's user_version, each in its
+# own transaction. Migrations only move forward; there is no downgrade.
+def migrate(database=None):
+    if database is None:
+        from api.db.database import DATABASE as database
+    conn = sqlite3.connect(database, isolation_level=None)
+    conn.execute("PRAGMA busy_timeout = 5000")
+    applied = []
+    try:
+        for version, name, path in discover_migrations():
+            if version <= get_version(conn):
+                continue
+            # Take the write lock first, then re-check: another process may
+            # have applied this migration while we were waiting for it
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if version <= get_version(conn):
+                    conn.execute("ROLLBACK")
+                    continue
+                run_migration(conn, path)
+                conn.execute(f"PRAGMA user_version = {version}")
+                conn.execute("COMMIT")
+            except Exception as e:
+                conn.execute("ROLLBACK")
+                raise MigrationError(f"Migration {version:04d}_{name} failed: {e}") from e
+            applied.append(f"{version:04d}_{name}")
+    finally:
+        conn.close()
+    return applied
+
+# Run EXPLAIN QUERY PLAN over HOT_QUERIES and return {name: [plan steps]} for
+# every query that still scans a whole table, builds an automatic index or
+# sorts its result in a temporary b-tree
+def check_query_plans(conn, queries=HOT_QUERIES):
+    problems = {}
+    for name, sql in queries.items():
+        steps = [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql)]
+        bad = [step for step in steps if (step.startswith("SCAN") and "INDEX" not in step) or "AUTOMATIC" in step or "TEMP B-TREE" in step]
+        if bad:
+            problems[name] = bad
+    return problems
+
+if __name__ == "__main__":
+    from api.db.database import DATABASE
+    if "--check" in sys.argv[1:]:
+        conn = sqlite3.connect(DATABASE)
+        problems = check_query_plans(conn)
+        conn.close()
+        for name, steps in problems.items():
+            print(f"{name}: {'; '.join(steps)}")
+        print("All hot queries use indexes" if not problems else f"{len(problems)} queries scan")
+        sys.exit(1 if problems else 0)
+    applied = migrate(DATABASE)
+    print("Applied: " + ", ".join(applied) if applied else "Database is up to date")
@@ -0,0 +1,25 @@
+-- Indexes for the lookups the list, filter and asset endpoints actually run
+-- Hardware by assignee (also used by the employees ON DELETE SET NULL action)
+CREATE INDEX IF NOT EXISTS idx_hardware_assignee ON hardware(assignee);
+-- Hardware filtered by status or device_type; single-column so each index
+-- stays in device_id order within a value and keyset pages need no sort
+CREATE INDEX IF NOT EXISTS idx_hardware_status ON hardware(status);
+CREATE INDEX IF NOT EXISTS idx_hardware_device_type ON hardware(device_type);
+-- Warranty expiry ranges; rows without a warranty are never searched for
+CREATE INDEX IF NOT EXISTS idx_hardware_warranty ON hardware(warranty_expiration)
+WHERE warranty_expiration IS NOT NULL;
+-- Software by assignee and by licence expiry
+CREATE INDEX IF NOT EXISTS idx_software_assignee ON software(assignee);
+CREATE INDEX IF NOT EXISTS idx_software_expiration ON software(expiration_date)
+WHERE expiration_date IS NOT NULL;
+-- Assignments by employee, and a covering index over open loans only
+CREATE INDEX IF NOT EXISTS idx_inventory_employee ON inventory_assignments(employee_id);
+CREATE INDEX IF NOT EXISTS idx_inventory_active ON inventory_assignments(device_id, employee_id, assigned_date)
+WHERE return_date IS NULL;
+-- Subtype tables are joined (and cascade-deleted) on device_id
+CREATE INDEX IF NOT EXISTS idx_computers_device ON computers(device_id);
+CREATE INDEX IF NOT EXISTS idx_printers_device ON printers(device_id);
+CREATE INDEX IF NOT EXISTS idx_devices_device ON devices(device_id);
+CREATE INDEX IF NOT EXISTS idx_audio_video_device ON audio_video(device_id);
+-- users.employee_id is a foreign key checked when employees are deleted
+CREATE INDEX IF NOT EXISTS idx_user_employee ON users(employee_id);
@@ -0,0 +1,76 @@
+-- Full-text search over inventory tables. Each index is an external-content
+-- FTS5 table (the text stays in the base table) using the trigram tokenizer,
+-- so any substring of three or more characters matches, e.g. part of a serial.
+-- Triggers keep each index in step with its base table.
+-- Hardware names, serial numbers and notes
+CREATE VIRTUAL TABLE hardware_fts USING fts5(
+    device_name, serial_number, note,
+    content='hardware',
+    content_rowid='device_id',
+    tokenize='trigram'
+);
+CREATE TRIGGER hardware_fts_insert AFTER INSERT ON hardware BEGIN
+    INSERT INTO hardware_fts(rowid, device_name, serial_number, note) VALUES (new.device_id, new.device_name, new.serial_number, new.note);
+END;
+CREATE TRIGGER hardware_fts_delete AFTER DELETE ON hardware BEGIN
+    INSERT INTO hardware_fts(hardware_fts, rowid, device_name, serial_number, note) VALUES ('delete', old.device_id, old.device_name, old.serial_number, old.note);
+END;
+CREATE TRIGGER hardware_fts_update AFTER UPDATE OF device_name, serial_number, note ON hardware BEGIN
+    INSERT INTO hardware_fts(hardware_fts, rowid, device_name, serial_number, note) VALUES ('delete', old.device_id, old.device_name, old.serial_number, old.note);
+    INSERT INTO hardware_fts(rowid, device_name, serial_number, note) VALUES (new.device_id, new.device_name, new.serial_number, new.note);
+END;
+INSERT INTO hardware_fts(hardware_fts) VALUES ('rebuild');
+-- Software names, brands and licence keys
+CREATE VIRTUAL TABLE software_fts USING fts5(
+    software_name, software_brand, license_key,
+    content='software',
+    content_rowid='software_id',
+    tokenize='trigram'
+);
+CREATE TRIGGER software_fts_insert AFTER INSERT ON software BEGIN
+    INSERT INTO software_fts(rowid, software_name, software_brand, license_key) VALUES (new.software_id, new.software_name, new.software_brand, new.license_key);
+END;
+CREATE TRIGGER software_fts_delete AFTER DELETE ON software BEGIN
+    INSERT INTO software_fts(software_fts, rowid, software_name, software_brand, license_key) VALUES ('delete', old.software_id, old.software_name, old.software_brand, old.license_key);
+END;
+CREATE TRIGGER software_fts_update AFTER UPDATE OF software_name, software_brand, license_key ON software BEGIN
+    INSERT INTO software_fts(software_fts, rowid, software_name, software_brand, license_key) VALUES ('delete', old.software_id, old.software_name, old.software_brand, old.license_key);
+    INSERT INTO software_fts(rowid, software_name, software_brand, license_key) VALUES (new.software_id, new.software_name, new.software_brand, new.license_key);
+END;
+INSERT INTO software_fts(software_fts) VALUES ('rebuild');
+-- Employee names and emails
+CREATE VIRTUAL TABLE employees_fts USING fts5(
+    first_name, last_name, email,
+    content='employees',
+    content_rowid='employee_id',
+    tokenize='trigram'
+);
+CREATE TRIGGER employees_fts_insert AFTER INSERT ON employees BEGIN
+    INSERT INTO employees_fts(rowid, first_name, last_name, email) VALUES (new.employee_id, new.first_name, new.last_name, new.email);
+END;
+CREATE TRIGGER employees_fts_delete AFTER DELETE ON employees BEGIN
+    INSERT INTO employees_fts(employees_fts, rowid, first_name, last_name, email) VALUES ('delete', old.employee_id, old.first_name, old.last_name, old.email);
+END;
+CREATE TRIGGER employees_fts_update AFTER UPDATE OF first_name, last_name, email ON employees BEGIN
+    INSERT INTO employees_fts(employees_fts, rowid, first_name, last_name, email) VALUES ('delete', old.employee_id, old.first_name, old.last_name, old.email);
+    INSERT INTO employees_fts(rowid, first_name, last_name, email) VALUES (new.employee_id, new.first_name, new.last_name, new.email);
+END;
+INSERT INTO employees_fts(employees_fts) VALUES ('rebuild');
+-- Data asset names and storage locations
+CREATE VIRTUAL TABLE data_fts USING fts5(
+    data_name, storage_location,
+    content='data',
+    content_rowid='data_id',
+    tokenize='trigram'
+);
+CREATE TRIGGER data_fts_insert AFTER INSERT ON data BEGIN
+    INSERT INTO data_fts(rowid, data_name, storage_location) VALUES (new.data_id, new.data_name, new.storage_location);
+END;
+CREATE TRIGGER data_fts_delete AFTER DELETE ON data BEGIN
+    INSERT INTO data_fts(data_fts, rowid, data_name, storage_location) VALUES ('delete', old.data_id, old.data_name, old.storage_location);
+END;
+CREATE TRIGGER data_fts_update AFTER UPDATE OF data_name, storage_location ON data BEGIN
+    INSERT INTO data_fts(data_fts, rowid, data_name, storage_location) VALUES ('delete', old.data_id, old.data_name, old.storage_location);
+    INSERT INTO data_fts(rowid, data_name, storage_location) VALUES (new.data_id, new.data_name, new.storage_location);
+END;
+INSERT INTO data_fts(data_fts) VALUES ('rebuild');
@@ -0,0 +1,19 @@
+-- Write-version counter per table, bumped by the API handlers in the same
+-- transaction as each write and read by the response cache to build ETags.
+-- Keeping it in the database shares it between worker processes.
+CREATE TABLE table_versions (
+    table_name TEXT PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+INSERT INTO table_versions (table_name)
+VALUES ('departments'),
+    ('employees'),
+    ('users'),
+    ('hardware'),
+    ('computers'),
+    ('printers'),
+    ('devices'),
+    ('audio_video'),
+    ('software'),
+    ('data'),
+    ('inventory_assignments');
@@ -0,0 +1,108 @@
+-- Summary tables behind /api/stats, kept current by triggers so the dashboard
+-- never counts base-table rows at request time.
+-- Counts per bucket: hardware/software by status, hardware by device_type,
+-- and the number of open loans (bucket 'open')
+CREATE TABLE stat_counts (
+    metric TEXT NOT NULL,
+    bucket TEXT NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (metric, bucket)
+) WITHOUT ROWID;
+-- Rows per expiry date for hardware warranties and software licences. A
+-- "expiring in N days" count sums at most N of these rows.
+CREATE TABLE stat_expiry (
+    metric TEXT NOT NULL,
+    expiry_date DATE NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (metric, expiry_date)
+) WITHOUT ROWID;
+-- Hardware
+CREATE TRIGGER stats_hardware_insert AFTER INSERT ON hardware BEGIN
+    INSERT INTO stat_counts (metric, bucket, count) VALUES ('hardware_status', new.status, 1)
+    ON CONFLICT (metric, bucket) DO UPDATE SET count = count + 1;
+    INSERT INTO stat_counts (metric, bucket, count) VALUES ('hardware_type', new.device_type, 1)
+    ON CONFLICT (metric, bucket) DO UPDATE SET count = count + 1;
+    INSERT INTO stat_expiry (metric, expiry_date, count)
+    SELECT 'warranty', new.warranty_expiration, 1 WHERE new.warranty_expiration IS NOT NULL
+    ON CONFLICT (metric, expiry_date) DO UPDATE SET count = count + 1;
+END;
+CREATE TRIGGER stats_hardware_delete AFTER DELETE ON hardware BEGIN
+    UPDATE stat_counts SET count = count - 1 WHERE metric = 'hardware_status' AND bucket = old.status;
+    UPDATE stat_counts SET count = count - 1 WHERE metric = 'hardware_type' AND bucket = old.device_type;
+    UPDATE stat_expiry SET count = count - 1 WHERE metric = 'warranty' AND expiry_date = old.warranty_expiration;
+END;
+CREATE TRIGGER stats_hardware_status AFTER UPDATE OF status ON hardware
+WHEN old.status IS NOT new.status BEGIN
+    UPDATE stat_counts SET count = count - 1 WHERE metric = 'hardware_status' AND bucket = old.status;
+    INSERT INTO stat_counts (metric, bucket, count) VALUES ('hardware_status', new.status, 1)
+    ON CONFLICT (metric, bucket) DO UPDATE SET count = count + 1;
+END;
+CREATE TRIGGER stats_hardware_type AFTER UPDATE OF device_type ON hardware
+WHEN old.device_type IS NOT new.device_type BEGIN
+    UPDATE stat_counts SET count = count - 1 WHERE metric = 'hardware_type' AND bucket = old.device_type;
+    INSERT INTO stat_counts (metric, bucket, count) VALUES ('hardware_type', new.device_type, 1)
+    ON CONFLICT (metric, bucket) DO UPDATE SET count = count + 1;
+END;
+CREATE TRIGGER stats_hardware_warranty AFTER UPDATE OF warranty_expiration ON hardware
+WHEN old.warranty_expiration IS NOT new.warranty_expiration BEGIN
+    UPDATE stat_expiry SET count = count - 1 WHERE metric = 'warranty' AND expiry_date = old.warranty_expiration;
+    INSERT INTO stat_expiry (metric, expiry_date, count)
+    SELECT 'warranty', new.warranty_expiration, 1 WHERE new.warranty_expiration IS NOT NULL
+    ON CONFLICT (metric, expiry_date) DO UPDATE SET count = count + 1;
+END;
+-- Software
+CREATE TRIGGER stats_software_insert AFTER INSERT ON software BEGIN
+    INSERT INTO stat_counts (metric, bucket, count) VALUES ('software_status', new.status, 1)
+    ON CONFLICT (metric, bucket) DO UPDATE SET count = count + 1;
+    INSERT INTO stat_expiry (metric, expiry_date, count)
+    SELECT 'licence', new.expiration_date, 1 WHERE new.expiration_date IS NOT NULL
+    ON CONFLICT (metric, expiry_date) DO UPDATE SET count = count + 1;
+END;
+CREATE TRIGGER stats_software_delete AFTER DELETE ON software BEGIN
+    UPDATE stat_counts SET count = count - 1 WHERE metric = 'software_status' AND bucket = old.status;
+    UPDATE stat_expiry SET count = count - 1 WHERE metric = 'licence' AND expiry_date = old.expiration_date;
+END;
+CREATE TRIGGER stats_software_status AFTER UPDATE OF status ON software
+WHEN old.status IS NOT new.status BEGIN
+    UPDATE stat_counts SET count = count - 1 WHERE metric = 'software_status' AND bucket = old.status;
+    INSERT INTO stat_counts (metric, bucket, count) VALUES ('software_status', new.status, 1)
+    ON CONFLICT (metric, bucket) DO UPDATE SET count = count + 1;
+END;
+CREATE TRIGGER stats_software_expiration AFTER UPDATE OF expiration_date ON software
+WHEN old.expiration_date IS NOT new.expiration_date BEGIN
+    UPDATE stat_expiry SET count = count - 1 WHERE metric = 'licence' AND expiry_date = old.expiration_date;
+    INSERT INTO stat_expiry (metric, expiry_date, count)
+    SELECT 'licence', new.expiration_date, 1 WHERE new.expiration_date IS NOT NULL
+    ON CONFLICT (metric, expiry_date) DO UPDATE SET count = count + 1;
+END;
+-- Open loans (inventory assignments without a return date)
+CREATE TRIGGER stats_loan_insert AFTER INSERT ON inventory_assignments
+WHEN new.return_date IS NULL BEGIN
+    INSERT INTO stat_counts (metric, bucket, count) VALUES ('loans', 'open', 1)
+    ON CONFLICT (metric, bucket) DO UPDATE SET count = count + 1;
+END;
+CREATE TRIGGER stats_loan_delete AFTER DELETE ON inventory_assignments
+WHEN old.return_date IS NULL BEGIN
+    UPDATE stat_counts SET count = count - 1 WHERE metric = 'loans' AND bucket = 'open';
+END;
+CREATE TRIGGER stats_loan_update AFTER UPDATE OF return_date ON inventory_assignments
+WHEN (old.return_date IS NULL) <> (new.return_date IS NULL) BEGIN
+    INSERT INTO stat_counts (metric, bucket, count)
+    VALUES ('loans', 'open', CASE WHEN new.return_date IS NULL THEN 1 ELSE -1 END)
+    ON CONFLICT (metric, bucket) DO UPDATE SET count = count + excluded.count;
+END;
+-- Initial counts from the existing rows
+INSERT INTO stat_counts (metric, bucket, count)
+SELECT 'hardware_status', status, COUNT(*) FROM hardware GROUP BY status;
+INSERT INTO stat_counts (metric, bucket, count)
+SELECT 'hardware_type', device_type, COUNT(*) FROM hardware GROUP BY device_type;
+INSERT INTO stat_counts (metric, bucket, count)
+SELECT 'software_status', status, COUNT(*) FROM software GROUP BY status;
+INSERT INTO stat_counts (metric, bucket, count)
+SELECT 'loans', 'open', COUNT(*) FROM inventory_assignments WHERE return_date IS NULL;
+INSERT INTO stat_expiry (metric, expiry_date, count)
+SELECT 'warranty', warranty_expiration, COUNT(*) FROM hardware
+WHERE warranty_expiration IS NOT NULL GROUP BY warranty_expiration;
+INSERT INTO stat_expiry (metric, expiry_date, count)
+SELECT 'licence', expiration_date, COUNT(*) FROM software
+WHERE expiration_date IS NOT NULL GROUP BY expiration_date;
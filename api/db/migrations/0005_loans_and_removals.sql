@@ -0,0 +1,34 @@
+-- Loans (open inventory assignments) and the pending-removal queue.
+ALTER TABLE inventory_assignments ADD COLUMN due_date DATE;
+ALTER TABLE hardware ADD COLUMN removal_requested_date DATE;
+
+-- A device is on loan to at most one person at a time. Older loans left
+-- open alongside a newer one are closed on the day the next loan started.
+UPDATE inventory_assignments
+SET return_date = (
+    SELECT MIN(newer.assigned_date) FROM inventory_assignments newer
+    WHERE newer.device_id = inventory_assignments.device_id
+      AND newer.return_date IS NULL
+      AND newer.assignment_id > inventory_assignments.assignment_id
+)
+WHERE return_date IS NULL AND EXISTS (
+    SELECT 1 FROM inventory_assignments newer
+    WHERE newer.device_id = inventory_assignments.device_id
+      AND newer.return_date IS NULL
+      AND newer.assignment_id > inventory_assignments.assignment_id
+);
+
+-- Open loans only: these stay as small as the number of devices out on loan
+-- however long the assignment history grows. The unique one is also what
+-- makes a concurrent double checkout fail.
+CREATE UNIQUE INDEX IF NOT EXISTS idx_loans_open_device ON inventory_assignments(device_id)
+WHERE return_date IS NULL;
+CREATE INDEX IF NOT EXISTS idx_loans_open_employee ON inventory_assignments(employee_id, device_id)
+WHERE return_date IS NULL;
+-- Entries are ordered (due_date, assignment_id), the overdue queue's order
+CREATE INDEX IF NOT EXISTS idx_loans_open_due ON inventory_assignments(due_date)
+WHERE return_date IS NULL;
+
+-- Devices waiting for a decommission decision, oldest request first
+CREATE INDEX IF NOT EXISTS idx_hardware_removal_queue ON hardware(removal_requested_date)
+WHERE removal_requested_date IS NOT NULL AND status <> 'decommissioned';
@@ -0,0 +1,94 @@
+-- Append-only history of every hardware asset's assignee and status, with
+-- periodic full snapshots so a point-in-time read replays only the events
+-- recorded after the nearest earlier snapshot.
+--
+-- Event types: 'created' (full state), 'assignee' (employee_id is the new
+-- assignee, NULL when unassigned), 'status' and 'deleted'. event_date is the
+-- day the change was recorded, so it never decreases as event_id grows. The
+-- log has no foreign key: a device's history outlives the device.
+CREATE TABLE asset_events (
+    event_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    device_id INTEGER NOT NULL,
+    event_date DATE NOT NULL DEFAULT (date('now')),
+    event_type TEXT NOT NULL CHECK (event_type IN ('created', 'assignee', 'status', 'deleted')),
+    employee_id INTEGER,
+    status TEXT
+);
+CREATE INDEX idx_asset_events_device ON asset_events(device_id, event_id);
+-- A snapshot holds the state of every device after event last_event_id
+CREATE TABLE asset_snapshots (
+    snapshot_id INTEGER PRIMARY KEY,
+    snapshot_date DATE NOT NULL,
+    last_event_id INTEGER NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX idx_asset_snapshots_date ON asset_snapshots(snapshot_date, last_event_id);
+CREATE TABLE asset_snapshot_items (
+    snapshot_id INTEGER NOT NULL,
+    device_id INTEGER NOT NULL,
+    assignee INTEGER,
+    status TEXT,
+    PRIMARY KEY (snapshot_id, device_id),
+    FOREIGN KEY(snapshot_id) REFERENCES asset_snapshots(snapshot_id) ON DELETE CASCADE
+) WITHOUT ROWID;
+
+-- Backfill from what the tables already record: each device exists from its
+-- purchase date, and assignment rows give who held it when. Status history
+-- was never kept, so it starts today. Dates are clamped to today and the
+-- rows inserted in date order to keep event_date and event_id in step.
+INSERT INTO asset_events (device_id, event_date, event_type, employee_id)
+SELECT device_id, event_date, event_type, employee_id FROM (
+    SELECT device_id, min(purchase_date, date('now')) AS event_date, 'created' AS event_type,
+        NULL AS employee_id, 0 AS step, device_id AS seq
+    FROM hardware
+    UNION ALL
+    SELECT a.device_id, min(a.return_date, date('now')), 'assignee', NULL, 1, a.assignment_id
+    FROM inventory_assignments a JOIN hardware h ON h.device_id = a.device_id
+    WHERE a.return_date IS NOT NULL
+    UNION ALL
+    SELECT a.device_id, min(a.assigned_date, date('now')), 'assignee', a.employee_id, 2, a.assignment_id
+    FROM inventory_assignments a JOIN hardware h ON h.device_id = a.device_id
+)
+ORDER BY event_date, step, seq;
+-- Where hardware.assignee disagrees with the replayed assignments, the
+-- current value wins from today on
+INSERT INTO asset_events (device_id, event_type, employee_id)
+SELECT h.device_id, 'assignee', h.assignee FROM hardware h
+WHERE h.assignee IS NOT (
+    SELECT e.employee_id FROM asset_events e
+    WHERE e.device_id = h.device_id
+    ORDER BY e.event_id DESC LIMIT 1
+)
+ORDER BY h.device_id;
+INSERT INTO asset_events (device_id, event_type, status)
+SELECT device_id, 'status', status FROM hardware ORDER BY device_id;
+
+-- The first snapshot is today's state
+INSERT INTO asset_snapshots (snapshot_date, last_event_id)
+SELECT date('now'), coalesce(max(event_id), 0) FROM asset_events;
+INSERT INTO asset_snapshot_items (snapshot_id, device_id, assignee, status)
+SELECT (SELECT max(snapshot_id) FROM asset_snapshots), device_id, assignee, status FROM hardware;
+
+-- From here on the log is written by triggers, whichever path changed the
+-- row: the CRUD and loan endpoints, bulk imports or ON DELETE SET NULL
+CREATE TRIGGER history_hardware_insert AFTER INSERT ON hardware BEGIN
+    INSERT INTO asset_events (device_id, event_type, employee_id, status)
+    VALUES (new.device_id, 'created', new.assignee, new.status);
+END;
+CREATE TRIGGER history_hardware_assignee AFTER UPDATE OF assignee ON hardware
+WHEN old.assignee IS NOT new.assignee BEGIN
+    INSERT INTO asset_events (device_id, event_type, employee_id) VALUES (new.device_id, 'assignee', new.assignee);
+END;
+CREATE TRIGGER history_hardware_status AFTER UPDATE OF status ON hardware
+WHEN old.status IS NOT new.status BEGIN
+    INSERT INTO asset_events (device_id, event_type, status) VALUES (new.device_id, 'status', new.status);
+END;
+CREATE TRIGGER history_hardware_delete AFTER DELETE ON hardware BEGIN
+    INSERT INTO asset_events (device_id, event_type) VALUES (old.device_id, 'deleted');
+END;
+CREATE TRIGGER asset_events_append_only_update BEFORE UPDATE ON asset_events BEGIN
+    SELECT RAISE(ABORT, 'asset_events is append-only');
+END;
+CREATE TRIGGER asset_events_append_only_delete BEFORE DELETE ON asset_events BEGIN
+    SELECT RAISE(ABORT, 'asset_events is append-only');
+END;
@@ -0,0 +1,31 @@
+-- Data access as a join table instead of data.members_list, a comma-separated
+-- string of employee IDs that could only be searched by scanning every row.
+-- The primary key answers "who can access data asset N", the second index
+-- "what can employee N access"; both are plain index ranges.
+CREATE TABLE data_members (
+    data_id INTEGER NOT NULL,
+    employee_id INTEGER NOT NULL,
+    PRIMARY KEY (data_id, employee_id),
+    FOREIGN KEY(data_id) REFERENCES data(data_id) ON DELETE CASCADE,
+    FOREIGN KEY(employee_id) REFERENCES employees(employee_id) ON DELETE CASCADE
+) WITHOUT ROWID;
+CREATE INDEX idx_data_members_employee ON data_members(employee_id, data_id);
+
+-- Split every members_list into rows. Entries that are not employee IDs, or
+-- name employees that no longer exist, are dropped.
+WITH RECURSIVE split(data_id, item, rest) AS (
+    SELECT data_id, NULL, members_list || ',' FROM data
+    WHERE members_list IS NOT NULL AND trim(members_list) <> ''
+    UNION ALL
+    SELECT data_id, trim(substr(rest, 1, instr(rest, ',') - 1)), substr(rest, instr(rest, ',') + 1)
+    FROM split WHERE rest <> ''
+)
+INSERT OR IGNORE INTO data_members (data_id, employee_id)
+SELECT split.data_id, CAST(split.item AS INTEGER) FROM split
+WHERE split.item <> '' AND split.item NOT GLOB '*[^0-9]*'
+  AND EXISTS (SELECT 1 FROM employees e WHERE e.employee_id = CAST(split.item AS INTEGER))
+ORDER BY 1, 2;
+
+ALTER TABLE data DROP COLUMN members_list;
+
+INSERT INTO table_versions (table_name) VALUES ('data_members');
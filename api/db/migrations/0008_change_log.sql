@@ -0,0 +1,124 @@
+-- Sequence-numbered log of row changes behind /api/changes. Triggers append
+-- one row per insert, update or delete on every table the API serves (users
+-- is left out: it holds credentials), so writes through any blueprint, bulk
+-- imports and cascaded deletes all show up. row_key is the row's key; for
+-- data_members it is "data_id,employee_id". Old rows are pruned by
+-- `python -m api.db.changes --prune`, which always keeps the newest one.
+CREATE TABLE change_log (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    table_name TEXT NOT NULL,
+    row_key TEXT NOT NULL,
+    op TEXT NOT NULL CHECK (op IN ('insert', 'update', 'delete')),
+    changed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX idx_change_log_time ON change_log(changed_at);
+-- departments
+CREATE TRIGGER changes_departments_insert AFTER INSERT ON departments BEGIN
+    INSERT INTO change_log (table_name, row_key, op) VALUES ('departments', new.department_id, 'insert');
+END;
+CREATE TRIGGER changes_departments_update AFTER UPDATE ON departments BEGIN
+    INSERT INTO change_log (table_name, row_key, op) VALUES ('departments', new.department_id, 'update');
+END;
+CREATE TRIGGER changes_departments_delete AFTER DELETE ON departments BEGIN
+    INSERT INTO change_log (table_name, row_key, op) VALUES ('departments', old.department_id, 'delete');
+END;
+-- employees
+CREATE TRIGGER changes_employees_insert AFTER INSERT ON employees BEGIN
+    INSERT INTO change_log (table_name, row_key, op) VALUES ('employees', new.employee_id, 'insert');
+END;
+CREATE TRIGGER changes_employees_update AFTER UPDATE ON employees BEGIN
+    INSERT INTO change_log (table_name, row_key, op) VALUES ('employees', new.employee_id, 'update');
+END;
+CREATE TRIGGER changes_employees_delete AFTER DELETE ON employees BEGIN
+    INSERT INTO change_log (table_name, row_key, op) VALUES ('employees', old.employee_id, 'delete');
+END;
+-- hardware
+CREATE TRIGGER changes_hardware_insert AFTER INSERT ON hardware BEGIN
+    INSERT INTO change_log (table_name, row_key, op) VALUES ('hardware', new.device_id, 'insert');
+END;
+CREATE TRIGGER changes_hardware_update AFTER UPDATE ON hardware BEGIN
+    INSERT INTO change_log (table_name, row_key, op) VALUES ('hardware', new.device_id, 'update');
+END;
+CREATE TRIGGER changes_hardware_delete AFTER DELETE ON hardware BEGIN
+    INSERT INTO change_log (table_name, row_key, op) VALUES ('hardware', old.device_id, 'delete');
+END;
+-- computers
+CREATE TRIGGER changes_computers_insert AFTER INSERT ON computers BEGIN
+    INSERT INTO change_log (table_name, row_key, op) VALUES ('computers', new.device_id, 'insert');
+END;
+CREATE TRIGGER changes_computers_update AFTER UPDATE ON computers BEGIN
+    INSERT INTO change_log (table_name, row_key, op) VALUES ('computers', new.device_id, 'update');
+END;
+CREATE TRIGGER changes_computers_delete AFTER DELETE ON computers BEGIN
+    INSERT INTO change_log (table_name, row_key, op) VALUES ('computers', old.device_id, 'delete');
+END;
+-- printers
+CREATE TRIGGER changes_printers_insert AFTER INSERT ON printers BEGIN
+    INSERT INTO change_log (table_name, row_key, op) VALUES ('printers', new.device_id, 'insert');
+END;
+CREATE TRIGGER changes_printers_update AFTER UPDATE ON printers BEGIN
+    INSERT INTO change_log (table_name, row_key, op) VALUES ('printers', new.device_id, 'update');
+END;
+CREATE TRIGGER changes_printers_delete AFTER DELETE ON printers BEGIN
+    INSERT INTO change_log (table_name, row_key, op) VALUES ('printers', old.device_id, 'delete');
+END;
+-- devices
+CREATE TRIGGER changes_devices_insert AFTER INSERT ON devices BEGIN
+    INSERT INTO change_log (table_name, row_key, op) VALUES ('devices', new.device_id, 'insert');
+END;
+CREATE TRIGGER changes_devices_update AFTER UPDATE ON devices BEGIN
+    INSERT INTO change_log (table_name, row_key, op) VALUES ('devices', new.device_id, 'update');
+END;
+CREATE TRIGGER changes_devices_delete AFTER DELETE ON devices BEGIN
+    INSERT INTO change_log (table_name, row_key, op) VALUES ('devices', old.device_id, 'delete');
+END;
+-- audio_video
+CREATE TRIGGER changes_audio_video_insert AFTER INSERT ON audio_video BEGIN
+    INSERT INTO change_log (table_name, row_key, op) VALUES ('audio_video', new.device_id, 'insert');
+END;
+CREATE TRIGGER changes_audio_video_update AFTER UPDATE ON audio_video BEGIN
+    INSERT INTO change_log (table_name, row_key, op) VALUES ('audio_video', new.device_id, 'update');
+END;
+CREATE TRIGGER changes_audio_video_delete AFTER DELETE ON audio_video BEGIN
+    INSERT INTO change_log (table_name, row_key, op) VALUES ('audio_video', old.device_id, 'delete');
+END;
+-- software
+CREATE TRIGGER changes_software_insert AFTER INSERT ON software BEGIN
+    INSERT INTO change_log (table_name, row_key, op) VALUES ('software', new.software_id, 'insert');
+END;
+CREATE TRIGGER changes_software_update AFTER UPDATE ON software BEGIN
+    INSERT INTO change_log (table_name, row_key, op) VALUES ('software', new.software_id, 'update');
+END;
+CREATE TRIGGER changes_software_delete AFTER DELETE ON software BEGIN
+    INSERT INTO change_log (table_name, row_key, op) VALUES ('software', old.software_id, 'delete');
+END;
+-- data
+CREATE TRIGGER changes_data_insert AFTER INSERT ON data BEGIN
+    INSERT INTO change_log (table_name, row_key, op) VALUES ('data', new.data_id, 'insert');
+END;
+CREATE TRIGGER changes_data_update AFTER UPDATE ON data BEGIN
+    INSERT INTO change_log (table_name, row_key, op) VALUES ('data', new.data_id, 'update');
+END;
+CREATE TRIGGER changes_data_delete AFTER DELETE ON data BEGIN
+    INSERT INTO change_log (table_name, row_key, op) VALUES ('data', old.data_id, 'delete');
+END;
+-- inventory_assignments
+CREATE TRIGGER changes_inventory_assignments_insert AFTER INSERT ON inventory_assignments BEGIN
+    INSERT INTO change_log (table_name, row_key, op) VALUES ('inventory_assignments', new.assignment_id, 'insert');
+END;
+CREATE TRIGGER changes_inventory_assignments_update AFTER UPDATE ON inventory_assignments BEGIN
+    INSERT INTO change_log (table_name, row_key, op) VALUES ('inventory_assignments', new.assignment_id, 'update');
+END;
+CREATE TRIGGER changes_inventory_assignments_delete AFTER DELETE ON inventory_assignments BEGIN
+    INSERT INTO change_log (table_name, row_key, op) VALUES ('inventory_assignments', old.assignment_id, 'delete');
+END;
+-- data_members
+CREATE TRIGGER changes_data_members_insert AFTER INSERT ON data_members BEGIN
+    INSERT INTO change_log (table_name, row_key, op) VALUES ('data_members', new.data_id || ',' || new.employee_id, 'insert');
+END;
+CREATE TRIGGER changes_data_members_update AFTER UPDATE ON data_members BEGIN
+    INSERT INTO change_log (table_name, row_key, op) VALUES ('data_members', new.data_id || ',' || new.employee_id, 'update');
+END;
+CREATE TRIGGER changes_data_members_delete AFTER DELETE ON data_members BEGIN
+    INSERT INTO change_log (table_name, row_key, op) VALUES ('data_members', old.data_id || ',' || old.employee_id, 'delete');
+END;
@@ -0,0 +1,81 @@
+-- Precomputed warranty and licence expiry alerts behind /api/alerts.
+--
+-- The alert scheduler (api.db.alerts) raises an 'expiring' alert when an
+-- item's expiry date comes within the alert window and an 'expired' one once
+-- it has passed. Each run only reads the expiry dates that entered the
+-- window since the previous run (alert_scans), plus the items whose expiry
+-- or decommissioning changed since then (alert_rechecks, filled by the
+-- triggers below). Renewing, decommissioning or deleting an item resolves its
+-- open alerts at once, so the queue never has to be checked against the
+-- base tables when it is read.
+CREATE TABLE alerts (
+    alert_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL CHECK (kind IN ('warranty', 'licence')),
+    item_id INTEGER NOT NULL,
+    item_name TEXT,
+    expires_on DATE NOT NULL,
+    state TEXT NOT NULL CHECK (state IN ('expiring', 'expired')),
+    raised_on DATE NOT NULL DEFAULT (date('now')),
+    notified_at TIMESTAMP,
+    resolved_at TIMESTAMP
+);
+-- At most one open alert per item and state
+CREATE UNIQUE INDEX idx_alerts_open_item ON alerts(kind, item_id, state) WHERE resolved_at IS NULL;
+-- The renewal queue, soonest expiry first, all states or one
+CREATE INDEX idx_alerts_queue ON alerts(expires_on, alert_id) WHERE resolved_at IS NULL;
+CREATE INDEX idx_alerts_queue_state ON alerts(state, expires_on, alert_id) WHERE resolved_at IS NULL;
+-- Alerts the notification sinks have not been sent yet
+CREATE INDEX idx_alerts_unnotified ON alerts(alert_id) WHERE notified_at IS NULL;
+
+-- Expiry dates up to expiring_through have been raised as expiring and those
+-- up to expired_through as expired; NULL before the first run
+CREATE TABLE alert_scans (
+    kind TEXT PRIMARY KEY,
+    expiring_through DATE,
+    expired_through DATE
+) WITHOUT ROWID;
+INSERT INTO alert_scans (kind) VALUES ('warranty'), ('licence');
+
+-- Items to re-evaluate on the next run
+CREATE TABLE alert_rechecks (
+    kind TEXT NOT NULL,
+    item_id INTEGER NOT NULL,
+    PRIMARY KEY (kind, item_id)
+) WITHOUT ROWID;
+
+INSERT INTO table_versions (table_name) VALUES ('alerts');
+
+-- hardware warranties
+CREATE TRIGGER alerts_hardware_insert AFTER INSERT ON hardware
+WHEN new.warranty_expiration IS NOT NULL BEGIN
+    INSERT OR IGNORE INTO alert_rechecks (kind, item_id) VALUES ('warranty', new.device_id);
+END;
+CREATE TRIGGER alerts_hardware_update AFTER UPDATE OF warranty_expiration, status ON hardware
+WHEN old.warranty_expiration IS NOT new.warranty_expiration
+    OR (old.status = 'decommissioned') IS NOT (new.status = 'decommissioned') BEGIN
+    UPDATE alerts SET resolved_at = CURRENT_TIMESTAMP
+    WHERE kind = 'warranty' AND item_id = new.device_id AND resolved_at IS NULL;
+    INSERT OR IGNORE INTO alert_rechecks (kind, item_id) VALUES ('warranty', new.device_id);
+END;
+CREATE TRIGGER alerts_hardware_delete AFTER DELETE ON hardware BEGIN
+    UPDATE alerts SET resolved_at = CURRENT_TIMESTAMP
+    WHERE kind = 'warranty' AND item_id = old.device_id AND resolved_at IS NULL;
+    DELETE FROM alert_rechecks WHERE kind = 'warranty' AND item_id = old.device_id;
+END;
+-- software licences
+CREATE TRIGGER alerts_software_insert AFTER INSERT ON software
+WHEN new.expiration_date IS NOT NULL BEGIN
+    INSERT OR IGNORE INTO alert_rechecks (kind, item_id) VALUES ('licence', new.software_id);
+END;
+CREATE TRIGGER alerts_software_update AFTER UPDATE OF expiration_date, status ON software
+WHEN old.expiration_date IS NOT new.expiration_date
+    OR (old.status = 'decommissioned') IS NOT (new.status = 'decommissioned') BEGIN
+    UPDATE alerts SET resolved_at = CURRENT_TIMESTAMP
+    WHERE kind = 'licence' AND item_id = new.software_id AND resolved_at IS NULL;
+    INSERT OR IGNORE INTO alert_rechecks (kind, item_id) VALUES ('licence', new.software_id);
+END;
+CREATE TRIGGER alerts_software_delete AFTER DELETE ON software BEGIN
+    UPDATE alerts SET resolved_at = CURRENT_TIMESTAMP
+    WHERE kind = 'licence' AND item_id = old.software_id AND resolved_at IS NULL;
+    DELETE FROM alert_rechecks WHERE kind = 'licence' AND item_id = old.software_id;
+END;
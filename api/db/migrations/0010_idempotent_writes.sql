@@ -0,0 +1,31 @@
+-- Optimistic concurrency and safe retries for the write API.
+--
+-- row_version counts the writes to each row the resource blueprints serve.
+-- Every UPDATE the API runs sets row_version = row_version + 1 in the same
+-- statement; a PUT, PATCH or DELETE with If-Match only goes ahead when the
+-- version the client read is still current (412 otherwise).
+ALTER TABLE departments ADD COLUMN row_version INTEGER NOT NULL DEFAULT 1;
+ALTER TABLE employees ADD COLUMN row_version INTEGER NOT NULL DEFAULT 1;
+ALTER TABLE hardware ADD COLUMN row_version INTEGER NOT NULL DEFAULT 1;
+ALTER TABLE audio_video ADD COLUMN row_version INTEGER NOT NULL DEFAULT 1;
+ALTER TABLE software ADD COLUMN row_version INTEGER NOT NULL DEFAULT 1;
+ALTER TABLE data ADD COLUMN row_version INTEGER NOT NULL DEFAULT 1;
+ALTER TABLE inventory_assignments ADD COLUMN row_version INTEGER NOT NULL DEFAULT 1;
+
+-- Responses to writes sent with an Idempotency-Key header, per user and key,
+-- so a retried request gets the first response instead of running again.
+-- status is NULL while the first request is still running. Entries older
+-- than IDEMPOTENCY_TTL, and all but the newest IDEMPOTENCY_MAX_KEYS, are
+-- pruned as new ones are stored (api.utils.idempotency).
+CREATE TABLE idempotency_keys (
+    entry_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    idempotency_key TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    status INTEGER,
+    mimetype TEXT,
+    body BLOB,
+    created_at INTEGER NOT NULL,
+    UNIQUE (user_id, idempotency_key)
+);
+CREATE INDEX idx_idempotency_keys_created ON idempotency_keys(created_at);
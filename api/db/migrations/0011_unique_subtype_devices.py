@@ -0,0 +1,56 @@
+# One subtype row per device. /api/assets and the exports join computers,
+# printers and devices on device_id, and the audio_video blueprint keys its
+# keyset pages, gets, updates and deletes on it, so it has to be unique.
+#
+# Where a device has several rows, the one whose serial_number is the
+# device's own is kept, else the oldest (lowest rowid). The others are moved
+# to subtype_duplicates, whole rows as JSON, and listed in a warning, so they
+# can be reviewed and put back by hand.
+import json
+import logging
+
+SUBTYPE_TABLES = ("computers", "printers", "devices", "audio_video")
+
+logger = logging.getLogger(__name__)
+
+def upgrade(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS subtype_duplicates (
+            duplicate_id INTEGER PRIMARY KEY,
+            table_name TEXT NOT NULL,
+            device_id INTEGER,
+            row_data TEXT NOT NULL,
+            moved_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    moved = {}
+    for table in SUBTYPE_TABLES:
+        columns = [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+        rows = conn.execute(f"""
+            SELECT row_id FROM (
+                SELECT s.rowid AS row_id, row_number() OVER (
+                    PARTITION BY s.device_id ORDER BY s.serial_number IS NOT h.serial_number, s.rowid
+                ) AS rank
+                FROM {table} s LEFT JOIN hardware h ON h.device_id = s.device_id
+            ) WHERE rank > 1
+        """).fetchall()
+        for (row_id,) in rows:
+            row = dict(zip(columns, conn.execute(f"SELECT * FROM {table} WHERE rowid = ?", (row_id,)).fetchone()))
+            conn.execute(
+                "INSERT INTO subtype_duplicates (table_name, device_id, row_data) VALUES (?, ?, ?)",
+                (table, row["device_id"], json.dumps(row)),
+            )
+            conn.execute(f"DELETE FROM {table} WHERE rowid = ?", (row_id,))
+            moved.setdefault(table, []).append(row["device_id"])
+
+    # The lookup indexes from 0001, now unique: a second row for a device is
+    # a constraint error (409 from the API)
+    for table in SUBTYPE_TABLES:
+        conn.execute(f"DROP INDEX IF EXISTS idx_{table}_device")
+        conn.execute(f"CREATE UNIQUE INDEX idx_{table}_device ON {table}(device_id)")
+
+    for table, device_ids in moved.items():
+        logger.warning(
+            "Moved %d duplicate %s rows to subtype_duplicates (device_id %s)",
+            len(device_ids), table, ", ".join(str(device_id) for device_id in sorted(set(device_ids))),
+        )
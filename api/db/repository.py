@@ -0,0 +1,322 @@
+from contextlib import contextmanager
+from api.db.backends import get_backend
+from api.db.database import get_db, get_table_columns
+from api.utils.cache import bump_table_version
+
+# Statements kept per repository; ?fields= and partial updates can name any
+# subset of the columns, so the rarer combinations are built per call
+MAX_STATEMENTS = 128
+
+# Counter bumped by every UPDATE of a row (migration 0010); If-Match writes
+# compare against it. Clients cannot set it.
+ROW_VERSION = "row_version"
+
+class RepositoryError(ValueError):
+    pass
+
+# A write broke a UNIQUE, CHECK, NOT NULL or foreign key constraint
+class ConstraintError(RepositoryError):
+    pass
+
+class NotFoundError(RepositoryError):
+    pass
+
+# An If-Match write found the row at another version than the client read
+class PreconditionFailed(RepositoryError):
+    def __init__(self, message, current_version=None):
+        super().__init__(message)
+        self.current_version = current_version
+
+# One write transaction on the request's connection. The write lock is taken
+# up front so a transition's checks and writes see the same state; the
+# versions of `tables` are bumped and everything commits together, or
+# nothing does.
+@contextmanager
+def transaction(*tables):
+    db = get_db()
+    backend = get_backend()
+    backend.begin(db, immediate=True)
+    try:
+        yield db
+        bump_table_version(db, *tables)
+        db.commit()
+    except backend.integrity_errors as e:
+        db.rollback()
+        raise ConstraintError(str(e))
+    except Exception:
+        db.rollback()
+        raise
+
+# Table access shared by the blueprints. SQL uses "?" placeholders and only
+# portable syntax, so the same calls run on every storage backend.
+#
+# Statement text is built once per column set and reused, so every pooled
+# connection keeps the statement prepared: sqlite3 caches prepared statements
+# per connection by their text, and psycopg prepares a query server-side
+# once it has run the same text a few times.
+class Repository:
+    def __init__(self, table, key):
+        self.table = table
+        self.key = key
+        self._statements = {}
+
+    def columns(self):
+        return get_table_columns(get_db(), self.table)
+
+    # False for tables without a row_version (or a database from before
+    # migration 0010)
+    def versioned(self):
+        return ROW_VERSION in self.columns()
+
+    # Read the table's columns and build its fixed statements ahead of the
+    # first request
+    def prepare(self, db):
+        columns = get_table_columns(db, self.table)
+        self.statement("get", columns)
+        self.statement("page", columns)
+        self.statement("page_after", columns)
+        self.statement("delete")
+        if ROW_VERSION in columns:
+            self.statement("version")
+            self.statement("delete_versioned")
+
+    def statement(self, kind, fields=()):
+        fields = tuple(fields)
+        sql = self._statements.get((kind, fields))
+        if sql is None:
+            sql = self._build(kind, fields)
+            if len(self._statements) < MAX_STATEMENTS:
+                self._statements[(kind, fields)] = sql
+        return sql
+
+    def _build(self, kind, fields):
+        table, key = self.table, self.key
+        if kind == "get":
+            return f"SELECT {', '.join(fields)} FROM {table} WHERE {key} = ?"
+        if kind == "page":
+            return f"SELECT {key}, {', '.join(fields)} FROM {table} ORDER BY {key} LIMIT ?"
+        if kind == "page_after":
+            return f"SELECT {key}, {', '.join(fields)} FROM {table} WHERE {key} > ? ORDER BY {key} LIMIT ?"
+        if kind == "update":
+            return f"UPDATE {table} SET {', '.join(f'{name} = ?' for name in fields)} WHERE {key} = ?"
+        # The last parameter is the expected row_version, or None for any
+        if kind == "update_versioned":
+            return (
+                f"UPDATE {table} SET {', '.join(f'{name} = ?' for name in fields)},"
+                f" {ROW_VERSION} = {ROW_VERSION} + 1"
+                f" WHERE {key} = ? AND {ROW_VERSION} = coalesce(?, {ROW_VERSION})"
+            )
+        if kind == "version":
+            return f"SELECT {ROW_VERSION} FROM {table} WHERE {key} = ?"
+        if kind == "delete":
+            return f"DELETE FROM {table} WHERE {key} = ?"
+        if kind == "delete_versioned":
+            return f"DELETE FROM {table} WHERE {key} = ? AND {ROW_VERSION} = coalesce(?, {ROW_VERSION})"
+        raise ValueError(f"Unknown statement: {kind}")
+
+    def check_fields(self, names):
+        columns = self.columns()
+        unknown = [name for name in names if name not in columns]
+        if unknown:
+            raise RepositoryError(f"Unknown field: {', '.join(unknown)}")
+
+    # One keyset page: (rows as tuples of `fields`, key of the last row if
+    # more follow)
+    def list_rows(self, limit, cursor=None, fields=None):
+        fields = fields or self.columns()
+        if cursor is None:
+            rows = get_db().execute(self.statement("page", fields), (limit + 1,)).fetchall()
+        else:
+            rows = get_db().execute(self.statement("page_after", fields), (cursor, limit + 1)).fetchall()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = rows[-1][0]
+        return [row[1:] for row in rows], next_cursor
+
+    # One keyset page: (rows as dicts, key of the last row if more follow)
+    def list_page(self, limit, cursor=None, fields=None):
+        fields = fields or self.columns()
+        rows, next_cursor = self.list_rows(limit, cursor, fields)
+        return [dict(zip(fields, row)) for row in rows], next_cursor
+
+    def get(self, key_value):
+        columns = self.columns()
+        row = get_db().execute(self.statement("get", columns), (key_value,)).fetchone()
+        return dict(zip(columns, row)) if row else None
+
+    # Run `write(db)` and commit it together with the table's version bump
+    def _write(self, write):
+        db = get_db()
+        backend = get_backend()
+        try:
+            result = write(db)
+            bump_table_version(db, self.table)
+            db.commit()
+            return result
+        except backend.integrity_errors as e:
+            db.rollback()
+            raise ConstraintError(str(e))
+        except Exception:
+            db.rollback()
+            raise
+
+    # Insert a row from {column: value} and return its key
+    def insert(self, values):
+        if not isinstance(values, dict):
+            raise RepositoryError("Request body must be a JSON object")
+        values = {name: value for name, value in values.items() if name != ROW_VERSION}
+        if not values:
+            raise RepositoryError("No fields to insert")
+        self.check_fields(values)
+        return self._write(lambda db: get_backend().insert(
+            db, self.table, list(values), list(values.values()), self.key
+        ))
+
+    # The row's current row_version, None if there is no such row
+    def row_version(self, db, key_value):
+        row = db.execute(self.statement("version"), (key_value,)).fetchone()
+        return row[0] if row else None
+
+    # A versioned write matched no row: None if the row is gone, else it is
+    # at another version than `expected_version`
+    def _check_version(self, db, key_value, expected_version):
+        current = self.row_version(db, key_value)
+        if current is None:
+            return None
+        raise PreconditionFailed(
+            f"Row {key_value} is at version {current}, not {expected_version}", current
+        )
+
+    # Update the given columns of one row and return its new row_version (0
+    # on unversioned tables), or None if there is no such row. With
+    # `expected_version` the row is only updated while it is still at that
+    # version; PreconditionFailed says which version it is at instead.
+    # Writes the same values a client read back (key and row_version
+    # included) are accepted: both are left out.
+    def update(self, key_value, values, expected_version=None):
+        if not isinstance(values, dict):
+            raise RepositoryError("Request body must be a JSON object")
+        values = {name: value for name, value in values.items() if name not in (self.key, ROW_VERSION)}
+        if not values:
+            raise RepositoryError("No fields to update")
+        self.check_fields(values)
+        params = list(values.values()) + [key_value]
+        if not self.versioned():
+            if expected_version is not None:
+                raise PreconditionFailed(f"{self.table} rows have no version to match")
+            sql = self.statement("update", values)
+            return self._write(lambda db: 0 if db.execute(sql, params).rowcount else None)
+        sql = self.statement("update_versioned", values)
+
+        def write(db):
+            if db.execute(sql, params + [expected_version]).rowcount:
+                return self.row_version(db, key_value)
+            return self._check_version(db, key_value, expected_version)
+        return self._write(write)
+
+    # Delete one row; returns the number of rows deleted. `expected_version`
+    # works as for update.
+    def delete(self, key_value, expected_version=None):
+        if not self.versioned():
+            if expected_version is not None:
+                raise PreconditionFailed(f"{self.table} rows have no version to match")
+            sql = self.statement("delete")
+            return self._write(lambda db: db.execute(sql, (key_value,)).rowcount)
+        sql = self.statement("delete_versioned")
+
+        def write(db):
+            deleted = db.execute(sql, (key_value, expected_version)).rowcount
+            if not deleted:
+                self._check_version(db, key_value, expected_version)
+            return deleted
+        return self._write(write)
+
+    # WHERE clause matching a batch: rows whose key is in `ids` and whose
+    # columns equal `filters` ({column: value}; a list matches any of its
+    # values, None matches NULL). Both may be given; at least one must be.
+    def batch_where(self, ids=None, filters=None):
+        filters = filters or {}
+        self.check_fields(filters)
+        clauses, params = [], []
+        if ids is not None:
+            clauses.append(f"{self.key} IN ({', '.join('?' for _ in ids)})")
+            params.extend(ids)
+        for name, value in filters.items():
+            if value is None:
+                clauses.append(f"{name} IS NULL")
+            elif isinstance(value, list):
+                if not value:
+                    raise RepositoryError(f"Filter on {name} must list at least one value")
+                clauses.append(f"{name} IN ({', '.join('?' for _ in value)})")
+                params.extend(value)
+            else:
+                clauses.append(f"{name} = ?")
+                params.append(value)
+        if not clauses:
+            raise RepositoryError("A batch needs ids or a filter")
+        return " AND ".join(clauses), params
+
+    # Keys of the rows matching `where`, in key order
+    def matching_keys(self, db, where, params):
+        return [row[0] for row in db.execute(
+            f"SELECT {self.key} FROM {self.table} WHERE {where} ORDER BY {self.key}", params
+        ).fetchall()]
+
+    # Up to `limit` matching rows, `fields` only, for a dry-run preview
+    def preview(self, db, where, params, fields, limit):
+        columns = [self.key] + [name for name in fields if name != self.key]
+        rows = db.execute(
+            f"SELECT {', '.join(columns)} FROM {self.table} WHERE {where} ORDER BY {self.key} LIMIT ?",
+            params + [limit],
+        ).fetchall()
+        return [dict(zip(columns, row)) for row in rows]
+
+    # Set `values` on every row of a batch with one UPDATE in one
+    # transaction. Returns (matched keys, rows updated, preview rows); a dry
+    # run writes nothing and previews the current values instead.
+    def update_batch(self, values, ids=None, filters=None, dry_run=False, preview_rows=0):
+        if not isinstance(values, dict) or not values:
+            raise RepositoryError("set must be an object with at least one field")
+        for name in (self.key, ROW_VERSION):
+            if name in values:
+                raise RepositoryError(f"{name} cannot be changed")
+        self.check_fields(values)
+        where, params = self.batch_where(ids, filters)
+        if dry_run:
+            db = get_db()
+            return self.matching_keys(db, where, params), 0, self.preview(db, where, params, values, preview_rows)
+        with transaction(self.table) as db:
+            keys = self.matching_keys(db, where, params)
+            updated = 0
+            if keys:
+                assignments = ", ".join(f"{name} = ?" for name in values)
+                if self.versioned():
+                    assignments += f", {ROW_VERSION} = {ROW_VERSION} + 1"
+                updated = db.execute(
+                    f"UPDATE {self.table} SET {assignments} WHERE {where}", list(values.values()) + params
+                ).rowcount
+        return keys, updated, []
+
+    # Delete every row of a batch in one transaction; same return shape as
+    # update_batch
+    def delete_batch(self, ids=None, filters=None, dry_run=False, preview_rows=0):
+        where, params = self.batch_where(ids, filters)
+        if dry_run:
+            db = get_db()
+            return self.matching_keys(db, where, params), 0, self.preview(db, where, params, self.columns(), preview_rows)
+        with transaction(self.table) as db:
+            keys = self.matching_keys(db, where, params)
+            deleted = 0
+            if keys:
+                deleted = db.execute(f"DELETE FROM {self.table} WHERE {where}", params).rowcount
+        return keys, deleted, []
+
+    # Yield batches of row tuples in key order, without loading the whole table
+    def stream(self, fields, limit=None, batch_size=500):
+        sql = f"SELECT {', '.join(fields)} FROM {self.table} ORDER BY {self.key}"
+        params = ()
+        if limit is not None:
+            sql += " LIMIT ?"
+            params = (limit,)
+        return get_backend().stream(get_db(), sql, params, batch_size)
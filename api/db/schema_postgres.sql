@@ -0,0 +1,874 @@
+-- PostgreSQL version of schema.sql, used when DATABASE_URL points at PostgreSQL.
+-- Tables, constraints and sample rows match schema.sql; the indexes,
+-- table_versions, row_version columns and idempotency_keys come from the SQLite
+-- migrations that are portable (0001, 0003, 0005, 0007, 0010, 0011). Full-text
+-- search (0002) uses GIN tsvector indexes instead of FTS5, and the dashboard
+-- summary tables (0004), the asset history log (0006), the change log (0008)
+-- and the expiry alert queue (0009) are kept by plpgsql triggers.
+DROP TABLE IF EXISTS alert_rechecks CASCADE;
+DROP TABLE IF EXISTS alert_scans CASCADE;
+DROP TABLE IF EXISTS alerts CASCADE;
+DROP TABLE IF EXISTS change_log CASCADE;
+DROP TABLE IF EXISTS asset_snapshot_items CASCADE;
+DROP TABLE IF EXISTS asset_snapshots CASCADE;
+DROP TABLE IF EXISTS asset_events CASCADE;
+DROP TABLE IF EXISTS stat_expiry CASCADE;
+DROP TABLE IF EXISTS stat_counts CASCADE;
+DROP TABLE IF EXISTS idempotency_keys CASCADE;
+DROP TABLE IF EXISTS table_versions CASCADE;
+DROP TABLE IF EXISTS data_members CASCADE;
+DROP TABLE IF EXISTS inventory_assignments CASCADE;
+DROP TABLE IF EXISTS audio_video CASCADE;
+DROP TABLE IF EXISTS devices CASCADE;
+DROP TABLE IF EXISTS printers CASCADE;
+DROP TABLE IF EXISTS computers CASCADE;
+DROP TABLE IF EXISTS data CASCADE;
+DROP TABLE IF EXISTS software CASCADE;
+DROP TABLE IF EXISTS hardware CASCADE;
+DROP TABLE IF EXISTS users CASCADE;
+DROP TABLE IF EXISTS employees CASCADE;
+DROP TABLE IF EXISTS departments CASCADE;
+-- Departments Table: Stores department details
+CREATE TABLE departments (
+    department_id INTEGER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    department_name TEXT NOT NULL UNIQUE,
+    department_type TEXT,
+    department_note TEXT,
+    row_version INTEGER NOT NULL DEFAULT 1
+);
+-- Employees Table: Stores employee details
+CREATE TABLE employees (
+    employee_id INTEGER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    first_name TEXT NOT NULL,
+    last_name TEXT NOT NULL,
+    email TEXT UNIQUE NOT NULL,
+    phone TEXT,
+    note TEXT,
+    row_version INTEGER NOT NULL DEFAULT 1
+);
+-- Users Table: Stores user credentials and roles
+-- Security Level: 1 (low) to 4 (high)
+-- 1: Basic user, 2: Intern, 3: Admin, 4: Super admin
+CREATE TABLE users (
+    user_id INTEGER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    user_role TEXT NOT NULL CHECK(
+        user_role IN ('basic', 'intern', 'admin', 'super_admin')
+    ),
+    security_level INTEGER NOT NULL CHECK(security_level IN (1, 2, 3, 4)),
+    username TEXT NOT NULL UNIQUE,
+    password TEXT NOT NULL,
+    employee_id INTEGER,
+    FOREIGN KEY(employee_id) REFERENCES employees(employee_id) ON DELETE
+    SET NULL
+);
+-- Hardware Assets Table: Stores hardware asset details
+CREATE TABLE hardware (
+    device_id INTEGER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    serial_number TEXT UNIQUE NOT NULL,
+    device_name TEXT NOT NULL,
+    device_type TEXT NOT NULL,
+    purchase_date DATE NOT NULL,
+    warranty_expiration DATE,
+    status TEXT CHECK(
+        status IN (
+            'active',
+            'inactive',
+            'maintenance',
+            'decommissioned'
+        )
+    ) NOT NULL,
+    assignee INTEGER,
+    note TEXT,
+    removal_requested_date DATE,
+    row_version INTEGER NOT NULL DEFAULT 1,
+    FOREIGN KEY(assignee) REFERENCES employees(employee_id) ON DELETE
+    SET NULL
+);
+-- Sub Tables for Hardware Assets: Computers, Printers, Devices, Audio/Video Equipment
+-- Computers Table: Stores computer asset details
+CREATE TABLE computers (
+    device_id INTEGER NOT NULL,
+    serial_number TEXT UNIQUE NOT NULL,
+    device_type TEXT NOT NULL CHECK(
+        device_type IN ('desktop', 'laptop', 'server', 'AIO')
+    ),
+    computer_model TEXT NOT NULL,
+    computer_brand TEXT NOT NULL,
+    cpu TEXT,
+    ram TEXT,
+    operating_system TEXT,
+    FOREIGN KEY(device_id) REFERENCES hardware(device_id) ON DELETE CASCADE,
+    FOREIGN KEY(serial_number) REFERENCES hardware(serial_number) ON DELETE CASCADE
+);
+-- Printers Table: Stores printer asset details
+CREATE TABLE printers (
+    device_id INTEGER NOT NULL,
+    serial_number TEXT UNIQUE NOT NULL,
+    mac_address TEXT UNIQUE NOT NULL,
+    ip_address TEXT,
+    printer_model TEXT NOT NULL,
+    printer_brand TEXT NOT NULL,
+    FOREIGN KEY(device_id) REFERENCES hardware(device_id) ON DELETE CASCADE,
+    FOREIGN KEY(serial_number) REFERENCES hardware(serial_number) ON DELETE CASCADE
+);
+-- Devices Table: Stores other device asset details
+CREATE TABLE devices (
+    device_id INTEGER NOT NULL,
+    serial_number TEXT UNIQUE NOT NULL,
+    device_type TEXT NOT NULL,
+    brand TEXT NOT NULL,
+    model TEXT NOT NULL,
+    FOREIGN KEY(device_id) REFERENCES hardware(device_id) ON DELETE CASCADE,
+    FOREIGN KEY(serial_number) REFERENCES hardware(serial_number) ON DELETE CASCADE
+);
+-- Audio/Video Equipment Table: Stores audio/video equipment details
+CREATE TABLE audio_video (
+    device_id INTEGER NOT NULL,
+    serial_number TEXT UNIQUE NOT NULL,
+    equipment_type TEXT NOT NULL,
+    brand TEXT NOT NULL,
+    model TEXT NOT NULL,
+    row_version INTEGER NOT NULL DEFAULT 1,
+    FOREIGN KEY(device_id) REFERENCES hardware(device_id) ON DELETE CASCADE,
+    FOREIGN KEY(serial_number) REFERENCES hardware(serial_number) ON DELETE CASCADE
+);
+-- Software Assets Table: Stores software asset details
+CREATE TABLE software (
+    software_id INTEGER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    software_brand TEXT NOT NULL,
+    software_name TEXT NOT NULL,
+    version TEXT NOT NULL,
+    license_key TEXT UNIQUE NOT NULL,
+    purchase_date DATE,
+    expiration_date DATE,
+    status TEXT CHECK(
+        status IN (
+            'active',
+            'inactive',
+            'maintenance',
+            'decommissioned'
+        )
+    ) NOT NULL,
+    assignee INTEGER,
+    row_version INTEGER NOT NULL DEFAULT 1,
+    FOREIGN KEY(assignee) REFERENCES employees(employee_id) ON DELETE
+    SET NULL
+);
+-- Data Assets Table: Stores data asset details
+CREATE TABLE data (
+    data_id INTEGER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    data_name TEXT NOT NULL,
+    data_type TEXT NOT NULL,
+    storage_location TEXT NOT NULL,
+    access_level TEXT CHECK(
+        access_level IN (
+            'public',
+            'internal',
+            'confidential',
+            'restricted'
+        )
+    ) NOT NULL,
+    created_date DATE NOT NULL DEFAULT CURRENT_DATE,
+    last_modified_date DATE NOT NULL DEFAULT CURRENT_DATE,
+    status TEXT CHECK(
+        status IN (
+            'active',
+            'inactive',
+            'archived',
+            'decommissioned'
+        )
+    ) NOT NULL,
+    row_version INTEGER NOT NULL DEFAULT 1
+);
+-- Inventory Assignments Table: Tracks device assignments
+CREATE TABLE inventory_assignments (
+    assignment_id INTEGER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    device_id INTEGER NOT NULL,
+    employee_id INTEGER NOT NULL,
+    assigned_date DATE NOT NULL DEFAULT CURRENT_DATE,
+    return_date DATE,
+    due_date DATE,
+    row_version INTEGER NOT NULL DEFAULT 1,
+    FOREIGN KEY(device_id) REFERENCES hardware(device_id) ON DELETE CASCADE,
+    FOREIGN KEY(employee_id) REFERENCES employees(employee_id) ON DELETE CASCADE
+);
+-- Data Access Table: which employees can access which data assets
+CREATE TABLE data_members (
+    data_id INTEGER NOT NULL,
+    employee_id INTEGER NOT NULL,
+    PRIMARY KEY (data_id, employee_id),
+    FOREIGN KEY(data_id) REFERENCES data(data_id) ON DELETE CASCADE,
+    FOREIGN KEY(employee_id) REFERENCES employees(employee_id) ON DELETE CASCADE
+);
+-- Indexes for faster queries
+CREATE INDEX idx_department_name ON departments(department_name);
+CREATE INDEX idx_employee_email ON employees(email);
+CREATE INDEX idx_user_username ON users(username);
+CREATE INDEX idx_hardware_serial ON hardware(serial_number);
+CREATE INDEX idx_software_license ON software(license_key);
+CREATE INDEX idx_data_name ON data(data_name);
+CREATE INDEX idx_inventory_device ON inventory_assignments(device_id);
+-- Indexes for the lookups the list, filter and asset endpoints actually run
+-- Hardware by assignee (also used by the employees ON DELETE SET NULL action)
+CREATE INDEX idx_hardware_assignee ON hardware(assignee);
+-- Hardware filtered by status or device_type; single-column so each index
+-- stays in device_id order within a value and keyset pages need no sort
+CREATE INDEX idx_hardware_status ON hardware(status);
+CREATE INDEX idx_hardware_device_type ON hardware(device_type);
+-- Warranty expiry ranges; rows without a warranty are never searched for
+CREATE INDEX idx_hardware_warranty ON hardware(warranty_expiration)
+WHERE warranty_expiration IS NOT NULL;
+-- Software by assignee and by licence expiry
+CREATE INDEX idx_software_assignee ON software(assignee);
+CREATE INDEX idx_software_expiration ON software(expiration_date)
+WHERE expiration_date IS NOT NULL;
+-- Assignments by employee, and a covering index over open loans only
+CREATE INDEX idx_inventory_employee ON inventory_assignments(employee_id);
+CREATE INDEX idx_inventory_active ON inventory_assignments(device_id, employee_id, assigned_date)
+WHERE return_date IS NULL;
+-- Loans and the removal queue: at most one open loan per device, open loans
+-- by employee and by due date, devices waiting for a decommission decision
+CREATE UNIQUE INDEX idx_loans_open_device ON inventory_assignments(device_id)
+WHERE return_date IS NULL;
+CREATE INDEX idx_loans_open_employee ON inventory_assignments(employee_id, device_id)
+WHERE return_date IS NULL;
+CREATE INDEX idx_loans_open_due ON inventory_assignments(due_date, assignment_id)
+WHERE return_date IS NULL;
+CREATE INDEX idx_hardware_removal_queue ON hardware(removal_requested_date, device_id)
+WHERE removal_requested_date IS NOT NULL AND status <> 'decommissioned';
+-- Data assets by member; members by data asset come from the primary key
+CREATE INDEX idx_data_members_employee ON data_members(employee_id, data_id);
+-- Subtype tables are joined (and cascade-deleted) on device_id, one row per
+-- device (0011)
+CREATE UNIQUE INDEX idx_computers_device ON computers(device_id);
+CREATE UNIQUE INDEX idx_printers_device ON printers(device_id);
+CREATE UNIQUE INDEX idx_devices_device ON devices(device_id);
+CREATE UNIQUE INDEX idx_audio_video_device ON audio_video(device_id);
+-- Full-text search (the FTS5 indexes of 0002): GIN indexes over the same
+-- columns as word-prefix tsvectors; api/routes/search.py queries the identical
+-- expression
+CREATE INDEX idx_hardware_search ON hardware USING GIN (to_tsvector('simple', coalesce(device_name, '') || ' ' || coalesce(serial_number, '') || ' ' || coalesce(note, '')));
+CREATE INDEX idx_software_search ON software USING GIN (to_tsvector('simple', coalesce(software_name, '') || ' ' || coalesce(software_brand, '') || ' ' || coalesce(license_key, '')));
+CREATE INDEX idx_employees_search ON employees USING GIN (to_tsvector('simple', coalesce(first_name, '') || ' ' || coalesce(last_name, '') || ' ' || coalesce(email, '')));
+CREATE INDEX idx_data_search ON data USING GIN (to_tsvector('simple', coalesce(data_name, '') || ' ' || coalesce(storage_location, '')));
+-- users.employee_id is a foreign key checked when employees are deleted
+CREATE INDEX idx_user_employee ON users(employee_id);
+-- Write-version counter per table, bumped by the API handlers in the same
+-- transaction as each write and read by the response cache to build ETags.
+-- Keeping it in the database shares it between worker processes.
+CREATE TABLE table_versions (
+    table_name TEXT PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0
+);
+INSERT INTO table_versions (table_name)
+VALUES ('departments'),
+    ('employees'),
+    ('users'),
+    ('hardware'),
+    ('computers'),
+    ('printers'),
+    ('devices'),
+    ('audio_video'),
+    ('software'),
+    ('data'),
+    ('inventory_assignments'),
+    ('data_members');
+-- Responses to writes sent with an Idempotency-Key header (migration 0010)
+CREATE TABLE idempotency_keys (
+    entry_id INTEGER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    idempotency_key TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    status INTEGER,
+    mimetype TEXT,
+    body BYTEA,
+    created_at BIGINT NOT NULL,
+    UNIQUE (user_id, idempotency_key)
+);
+CREATE INDEX idx_idempotency_keys_created ON idempotency_keys(created_at);
+-- Sample data insertion for all tables
+INSERT INTO departments (
+        department_name,
+        department_type,
+        department_note
+    )
+VALUES (
+        'IT',
+        'Technology',
+        'Information Technology Department'
+    ),
+    (
+        'HR',
+        'Human Resources',
+        'Human Resources Department'
+    ),
+    ('Finance', 'Finance', 'Finance Department');
+INSERT INTO employees (first_name, last_name, email, phone, note)
+VALUES (
+        'John',
+        'Doe',
+        'john.doe@example.com',
+        '123-456-7890',
+        'IT Department'
+    ),
+    (
+        'Jane',
+        'Smith',
+        'jane.smith@example.com',
+        '987-654-3210',
+        'HR Department'
+    ),
+    (
+        'Alice',
+        'Johnson',
+        'alice.johnson@example.com',
+        '555-123-4567',
+        'Finance Department'
+    );
+INSERT INTO users (username, password, user_role, security_level)
+VALUES (
+        'user1',
+        'scrypt:32768:8:1$U8hJ9yVxJUUCJrXf$5fa60c2d950346be75db37a733db93d72c55591d26477c88b00b96e7e058c97935b3307b0de49b1f41ddc7fdd1a5be1ff43514c68d909007217ccc665fb2ed47',
+        'intern',
+        2
+    ),
+    (
+        'admin',
+        'scrypt:32768:8:1$hCiEtfqornuTb8aP$2b219d2559dcb854d00ee78b0aada18534ebc883ba803bfb2e932cab10395e7852ae9c8476f2bf6653c839d2ca3ca72bc81713369dc307d5942281e697843cd9',
+        'admin',
+        3
+    ),
+    (
+        'superadmin',
+        'scrypt:32768:8:1$Wacwj3uuFjuekDJs$561b5d00326455be223aa955ab7413947377f9590709529016a7cfc717cdc27d342909e188b50fad43adb3b102d4108000aac497e9b9163b68c39be263e3c907',
+        'super_admin',
+        4
+    );
+INSERT INTO hardware (
+        serial_number,
+        device_name,
+        device_type,
+        purchase_date,
+        warranty_expiration,
+        status,
+        assignee,
+        note
+    )
+VALUES (
+        'SN123456',
+        'Dell Laptop',
+        'laptop',
+        '2023-01-15',
+        '2024-01-15',
+        'active',
+        1,
+        'Dell XPS 13'
+    ),
+    (
+        'SN654321',
+        'HP Printer',
+        'printer',
+        '2022-05-20',
+        '2023-05-20',
+        'active',
+        2,
+        'HP LaserJet Pro M404dn'
+    ),
+    (
+        'SN789012',
+        'Cisco Switch',
+        'device',
+        '2021-10-10',
+        NULL,
+        'inactive',
+        NULL,
+        'Cisco Catalyst 2960X'
+    );
+INSERT INTO computers (
+        device_id,
+        serial_number,
+        device_type,
+        computer_model,
+        computer_brand,
+        cpu,
+        ram,
+        operating_system
+    )
+VALUES (
+        1,
+        'SN123456',
+        'laptop',
+        'XPS 13',
+        'Dell',
+        'Intel Core i7',
+        '16GB',
+        'Windows 10'
+    );
+INSERT INTO printers (
+        device_id,
+        serial_number,
+        mac_address,
+        ip_address,
+        printer_model,
+        printer_brand
+    )
+VALUES (
+        2,
+        'SN654321',
+        '00:1A:2B:3C:4D:5E',
+        '192.168.1.100',
+        'LaserJet Pro M404dn',
+        'HP'
+    );
+INSERT INTO devices (
+        device_id,
+        serial_number,
+        device_type,
+        brand,
+        model
+    )
+VALUES (
+        3,
+        'SN789012',
+        'switch',
+        'Cisco',
+        'Catalyst 2960X'
+    );
+INSERT INTO audio_video (
+        device_id,
+        serial_number,
+        equipment_type,
+        brand,
+        model
+    )
+VALUES (
+        3,
+        'SN789012',
+        'projector',
+        'Epson',
+        'PowerLite 1781W'
+    );
+INSERT INTO software (
+        software_brand,
+        software_name,
+        version,
+        license_key,
+        purchase_date,
+        expiration_date,
+        status,
+        assignee
+    )
+VALUES (
+        'Microsoft',
+        'Office 365',
+        '2023',
+        'ABC123XYZ',
+        '2023-01-01',
+        '2024-01-01',
+        'active',
+        1
+    ),
+    (
+        'Adobe',
+        'Photoshop',
+        '2022',
+        'DEF456UVW',
+        '2022-06-15',
+        NULL,
+        'active',
+        2
+    );
+INSERT INTO data (
+        data_name,
+        data_type,
+        storage_location,
+        access_level,
+        created_date,
+        last_modified_date,
+        status
+    )
+VALUES (
+        'Employee Records',
+        'database',
+        'internal server',
+        'confidential',
+        '2023-01-01',
+        '2023-01-15',
+        'active'
+    ),
+    (
+        'Financial Reports',
+        'spreadsheet',
+        'cloud storage',
+        'restricted',
+        '2022-05-20',
+        '2022-06-01',
+        'archived'
+    );
+INSERT INTO inventory_assignments (
+        device_id,
+        employee_id,
+        assigned_date,
+        return_date
+    )
+VALUES (1, 1, '2023-01-15', NULL),
+    (2, 2, '2022-05-20', '2023-05-20'),
+    (3, 3, '2021-10-10', NULL);
+INSERT INTO data_members (data_id, employee_id)
+VALUES (1, 1),
+    (1, 2),
+    (2, 3);-- Dashboard summary tables behind /api/stats (migration 0004), kept current
+-- by triggers so the dashboard never counts base-table rows at request time
+CREATE TABLE stat_counts (
+    metric TEXT NOT NULL,
+    bucket TEXT NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (metric, bucket)
+);
+CREATE TABLE stat_expiry (
+    metric TEXT NOT NULL,
+    expiry_date DATE NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (metric, expiry_date)
+);
+-- Add `delta` to a counter; a NULL bucket or date is not counted
+CREATE OR REPLACE FUNCTION stat_count_add(p_metric TEXT, p_bucket TEXT, delta INTEGER) RETURNS void AS $$
+BEGIN
+    IF p_bucket IS NOT NULL THEN
+        INSERT INTO stat_counts (metric, bucket, count) VALUES (p_metric, p_bucket, delta)
+        ON CONFLICT (metric, bucket) DO UPDATE SET count = stat_counts.count + excluded.count;
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+CREATE OR REPLACE FUNCTION stat_expiry_add(p_metric TEXT, p_date DATE, delta INTEGER) RETURNS void AS $$
+BEGIN
+    IF p_date IS NOT NULL THEN
+        INSERT INTO stat_expiry (metric, expiry_date, count) VALUES (p_metric, p_date, delta)
+        ON CONFLICT (metric, expiry_date) DO UPDATE SET count = stat_expiry.count + excluded.count;
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+CREATE OR REPLACE FUNCTION stats_hardware() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM stat_count_add('hardware_status', old.status, -1);
+        PERFORM stat_count_add('hardware_type', old.device_type, -1);
+        PERFORM stat_expiry_add('warranty', old.warranty_expiration, -1);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM stat_count_add('hardware_status', new.status, 1);
+        PERFORM stat_count_add('hardware_type', new.device_type, 1);
+        PERFORM stat_expiry_add('warranty', new.warranty_expiration, 1);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+CREATE TRIGGER stats_hardware_rows AFTER INSERT OR DELETE ON hardware
+FOR EACH ROW EXECUTE FUNCTION stats_hardware();
+CREATE TRIGGER stats_hardware_update AFTER UPDATE OF status, device_type, warranty_expiration ON hardware
+FOR EACH ROW WHEN (old.status IS DISTINCT FROM new.status
+    OR old.device_type IS DISTINCT FROM new.device_type
+    OR old.warranty_expiration IS DISTINCT FROM new.warranty_expiration)
+EXECUTE FUNCTION stats_hardware();
+CREATE OR REPLACE FUNCTION stats_software() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM stat_count_add('software_status', old.status, -1);
+        PERFORM stat_expiry_add('licence', old.expiration_date, -1);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM stat_count_add('software_status', new.status, 1);
+        PERFORM stat_expiry_add('licence', new.expiration_date, 1);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+CREATE TRIGGER stats_software_rows AFTER INSERT OR DELETE ON software
+FOR EACH ROW EXECUTE FUNCTION stats_software();
+CREATE TRIGGER stats_software_update AFTER UPDATE OF status, expiration_date ON software
+FOR EACH ROW WHEN (old.status IS DISTINCT FROM new.status OR old.expiration_date IS DISTINCT FROM new.expiration_date)
+EXECUTE FUNCTION stats_software();
+-- Open loans (inventory assignments without a return date)
+CREATE OR REPLACE FUNCTION stats_loans() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND old.return_date IS NULL THEN
+        PERFORM stat_count_add('loans', 'open', -1);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND new.return_date IS NULL THEN
+        PERFORM stat_count_add('loans', 'open', 1);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+CREATE TRIGGER stats_loans_rows AFTER INSERT OR DELETE ON inventory_assignments
+FOR EACH ROW EXECUTE FUNCTION stats_loans();
+CREATE TRIGGER stats_loans_update AFTER UPDATE OF return_date ON inventory_assignments
+FOR EACH ROW WHEN ((old.return_date IS NULL) <> (new.return_date IS NULL))
+EXECUTE FUNCTION stats_loans();
+-- Initial counts from the sample rows
+INSERT INTO stat_counts (metric, bucket, count)
+SELECT 'hardware_status', status, COUNT(*) FROM hardware GROUP BY status;
+INSERT INTO stat_counts (metric, bucket, count)
+SELECT 'hardware_type', device_type, COUNT(*) FROM hardware GROUP BY device_type;
+INSERT INTO stat_counts (metric, bucket, count)
+SELECT 'software_status', status, COUNT(*) FROM software GROUP BY status;
+INSERT INTO stat_counts (metric, bucket, count)
+SELECT 'loans', 'open', COUNT(*) FROM inventory_assignments WHERE return_date IS NULL;
+INSERT INTO stat_expiry (metric, expiry_date, count)
+SELECT 'warranty', warranty_expiration, COUNT(*) FROM hardware
+WHERE warranty_expiration IS NOT NULL GROUP BY warranty_expiration;
+INSERT INTO stat_expiry (metric, expiry_date, count)
+SELECT 'licence', expiration_date, COUNT(*) FROM software
+WHERE expiration_date IS NOT NULL GROUP BY expiration_date;
+-- Append-only history of every hardware asset's assignee and status, with
+-- periodic full snapshots (migration 0006); see api/db/history.py
+CREATE TABLE asset_events (
+    event_id INTEGER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    device_id INTEGER NOT NULL,
+    event_date DATE NOT NULL DEFAULT CURRENT_DATE,
+    event_type TEXT NOT NULL CHECK (event_type IN ('created', 'assignee', 'status', 'deleted')),
+    employee_id INTEGER,
+    status TEXT
+);
+CREATE INDEX idx_asset_events_device ON asset_events(device_id, event_id);
+CREATE TABLE asset_snapshots (
+    snapshot_id INTEGER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    snapshot_date DATE NOT NULL,
+    last_event_id INTEGER NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX idx_asset_snapshots_date ON asset_snapshots(snapshot_date, last_event_id);
+CREATE TABLE asset_snapshot_items (
+    snapshot_id INTEGER NOT NULL REFERENCES asset_snapshots(snapshot_id) ON DELETE CASCADE,
+    device_id INTEGER NOT NULL,
+    assignee INTEGER,
+    status TEXT,
+    PRIMARY KEY (snapshot_id, device_id)
+);
+-- Backfill from the sample rows the same way 0006 does: each device exists
+-- from its purchase date, assignments give who held it when, and status
+-- history starts today
+INSERT INTO asset_events (device_id, event_date, event_type, employee_id)
+SELECT device_id, event_date, event_type, employee_id FROM (
+    SELECT device_id, LEAST(purchase_date, CURRENT_DATE) AS event_date, 'created' AS event_type,
+        NULL::INTEGER AS employee_id, 0 AS step, device_id AS seq
+    FROM hardware
+    UNION ALL
+    SELECT a.device_id, LEAST(a.return_date, CURRENT_DATE), 'assignee', NULL, 1, a.assignment_id
+    FROM inventory_assignments a JOIN hardware h ON h.device_id = a.device_id
+    WHERE a.return_date IS NOT NULL
+    UNION ALL
+    SELECT a.device_id, LEAST(a.assigned_date, CURRENT_DATE), 'assignee', a.employee_id, 2, a.assignment_id
+    FROM inventory_assignments a JOIN hardware h ON h.device_id = a.device_id
+) backfill
+ORDER BY event_date, step, seq;
+INSERT INTO asset_events (device_id, event_type, employee_id)
+SELECT h.device_id, 'assignee', h.assignee FROM hardware h
+WHERE h.assignee IS DISTINCT FROM (
+    SELECT e.employee_id FROM asset_events e
+    WHERE e.device_id = h.device_id
+    ORDER BY e.event_id DESC LIMIT 1
+)
+ORDER BY h.device_id;
+INSERT INTO asset_events (device_id, event_type, status)
+SELECT device_id, 'status', status FROM hardware ORDER BY device_id;
+INSERT INTO asset_snapshots (snapshot_date, last_event_id)
+SELECT CURRENT_DATE, coalesce(max(event_id), 0) FROM asset_events;
+INSERT INTO asset_snapshot_items (snapshot_id, device_id, assignee, status)
+SELECT (SELECT max(snapshot_id) FROM asset_snapshots), device_id, assignee, status FROM hardware;
+CREATE OR REPLACE FUNCTION history_hardware() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO asset_events (device_id, event_type, employee_id, status)
+        VALUES (new.device_id, 'created', new.assignee, new.status);
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO asset_events (device_id, event_type) VALUES (old.device_id, 'deleted');
+    ELSE
+        IF old.assignee IS DISTINCT FROM new.assignee THEN
+            INSERT INTO asset_events (device_id, event_type, employee_id) VALUES (new.device_id, 'assignee', new.assignee);
+        END IF;
+        IF old.status IS DISTINCT FROM new.status THEN
+            INSERT INTO asset_events (device_id, event_type, status) VALUES (new.device_id, 'status', new.status);
+        END IF;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+CREATE TRIGGER history_hardware_rows AFTER INSERT OR DELETE ON hardware
+FOR EACH ROW EXECUTE FUNCTION history_hardware();
+CREATE TRIGGER history_hardware_update AFTER UPDATE OF assignee, status ON hardware
+FOR EACH ROW WHEN (old.assignee IS DISTINCT FROM new.assignee OR old.status IS DISTINCT FROM new.status)
+EXECUTE FUNCTION history_hardware();
+CREATE OR REPLACE FUNCTION asset_events_append_only() RETURNS trigger AS $$
+BEGIN
+    RAISE EXCEPTION 'asset_events is append-only';
+END;
+$$ LANGUAGE plpgsql;
+CREATE TRIGGER asset_events_append_only BEFORE UPDATE OR DELETE ON asset_events
+FOR EACH ROW EXECUTE FUNCTION asset_events_append_only();
+-- Sequence-numbered log of row changes behind /api/changes (migration 0008);
+-- see api/db/changes.py. users is left out: it holds credentials.
+CREATE TABLE change_log (
+    seq INTEGER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    table_name TEXT NOT NULL,
+    row_key TEXT NOT NULL,
+    op TEXT NOT NULL CHECK (op IN ('insert', 'update', 'delete')),
+    changed_at TIMESTAMP(0) NOT NULL DEFAULT (CURRENT_TIMESTAMP AT TIME ZONE 'UTC')
+);
+CREATE INDEX idx_change_log_time ON change_log(changed_at);
+-- SQLite has one writer at a time, so seqs become visible in order and the
+-- feed can read on from the last seq it saw. Here a write to a feed table
+-- takes the write lock (PostgresBackend.begin) before it touches a row, so
+-- writers that log changes commit one after another, in seq order, just the
+-- same.
+CREATE OR REPLACE FUNCTION change_log_lock() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_advisory_xact_lock(hashtext('inventory_write'));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+-- One change_log row per changed row; the trigger's arguments are the key
+-- columns, joined with "," into row_key
+CREATE OR REPLACE FUNCTION log_change() RETURNS trigger AS $$
+DECLARE
+    changed jsonb;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        changed := to_jsonb(old);
+    ELSE
+        changed := to_jsonb(new);
+    END IF;
+    INSERT INTO change_log (table_name, row_key, op)
+    VALUES (
+        TG_TABLE_NAME,
+        array_to_string(ARRAY(
+            SELECT changed ->> key_column FROM unnest(TG_ARGV) WITH ORDINALITY AS k(key_column, position)
+            ORDER BY position
+        ), ','),
+        lower(TG_OP)
+    );
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+CREATE TRIGGER changes_departments_lock BEFORE INSERT OR UPDATE OR DELETE ON departments
+FOR EACH STATEMENT EXECUTE FUNCTION change_log_lock();
+CREATE TRIGGER changes_departments AFTER INSERT OR UPDATE OR DELETE ON departments
+FOR EACH ROW EXECUTE FUNCTION log_change('department_id');
+CREATE TRIGGER changes_employees_lock BEFORE INSERT OR UPDATE OR DELETE ON employees
+FOR EACH STATEMENT EXECUTE FUNCTION change_log_lock();
+CREATE TRIGGER changes_employees AFTER INSERT OR UPDATE OR DELETE ON employees
+FOR EACH ROW EXECUTE FUNCTION log_change('employee_id');
+CREATE TRIGGER changes_hardware_lock BEFORE INSERT OR UPDATE OR DELETE ON hardware
+FOR EACH STATEMENT EXECUTE FUNCTION change_log_lock();
+CREATE TRIGGER changes_hardware AFTER INSERT OR UPDATE OR DELETE ON hardware
+FOR EACH ROW EXECUTE FUNCTION log_change('device_id');
+CREATE TRIGGER changes_computers_lock BEFORE INSERT OR UPDATE OR DELETE ON computers
+FOR EACH STATEMENT EXECUTE FUNCTION change_log_lock();
+CREATE TRIGGER changes_computers AFTER INSERT OR UPDATE OR DELETE ON computers
+FOR EACH ROW EXECUTE FUNCTION log_change('device_id');
+CREATE TRIGGER changes_printers_lock BEFORE INSERT OR UPDATE OR DELETE ON printers
+FOR EACH STATEMENT EXECUTE FUNCTION change_log_lock();
+CREATE TRIGGER changes_printers AFTER INSERT OR UPDATE OR DELETE ON printers
+FOR EACH ROW EXECUTE FUNCTION log_change('device_id');
+CREATE TRIGGER changes_devices_lock BEFORE INSERT OR UPDATE OR DELETE ON devices
+FOR EACH STATEMENT EXECUTE FUNCTION change_log_lock();
+CREATE TRIGGER changes_devices AFTER INSERT OR UPDATE OR DELETE ON devices
+FOR EACH ROW EXECUTE FUNCTION log_change('device_id');
+CREATE TRIGGER changes_audio_video_lock BEFORE INSERT OR UPDATE OR DELETE ON audio_video
+FOR EACH STATEMENT EXECUTE FUNCTION change_log_lock();
+CREATE TRIGGER changes_audio_video AFTER INSERT OR UPDATE OR DELETE ON audio_video
+FOR EACH ROW EXECUTE FUNCTION log_change('device_id');
+CREATE TRIGGER changes_software_lock BEFORE INSERT OR UPDATE OR DELETE ON software
+FOR EACH STATEMENT EXECUTE FUNCTION change_log_lock();
+CREATE TRIGGER changes_software AFTER INSERT OR UPDATE OR DELETE ON software
+FOR EACH ROW EXECUTE FUNCTION log_change('software_id');
+CREATE TRIGGER changes_data_lock BEFORE INSERT OR UPDATE OR DELETE ON data
+FOR EACH STATEMENT EXECUTE FUNCTION change_log_lock();
+CREATE TRIGGER changes_data AFTER INSERT OR UPDATE OR DELETE ON data
+FOR EACH ROW EXECUTE FUNCTION log_change('data_id');
+CREATE TRIGGER changes_inventory_assignments_lock BEFORE INSERT OR UPDATE OR DELETE ON inventory_assignments
+FOR EACH STATEMENT EXECUTE FUNCTION change_log_lock();
+CREATE TRIGGER changes_inventory_assignments AFTER INSERT OR UPDATE OR DELETE ON inventory_assignments
+FOR EACH ROW EXECUTE FUNCTION log_change('assignment_id');
+CREATE TRIGGER changes_data_members_lock BEFORE INSERT OR UPDATE OR DELETE ON data_members
+FOR EACH STATEMENT EXECUTE FUNCTION change_log_lock();
+CREATE TRIGGER changes_data_members AFTER INSERT OR UPDATE OR DELETE ON data_members
+FOR EACH ROW EXECUTE FUNCTION log_change('data_id', 'employee_id');
+-- Precomputed warranty and licence expiry alerts behind /api/alerts
+-- (migration 0009); see api/db/alerts.py
+CREATE TABLE alerts (
+    alert_id INTEGER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    kind TEXT NOT NULL CHECK (kind IN ('warranty', 'licence')),
+    item_id INTEGER NOT NULL,
+    item_name TEXT,
+    expires_on DATE NOT NULL,
+    state TEXT NOT NULL CHECK (state IN ('expiring', 'expired')),
+    raised_on DATE NOT NULL DEFAULT CURRENT_DATE,
+    notified_at TIMESTAMP(0),
+    resolved_at TIMESTAMP(0)
+);
+CREATE UNIQUE INDEX idx_alerts_open_item ON alerts(kind, item_id, state) WHERE resolved_at IS NULL;
+CREATE INDEX idx_alerts_queue ON alerts(expires_on, alert_id) WHERE resolved_at IS NULL;
+CREATE INDEX idx_alerts_queue_state ON alerts(state, expires_on, alert_id) WHERE resolved_at IS NULL;
+CREATE INDEX idx_alerts_unnotified ON alerts(alert_id) WHERE notified_at IS NULL;
+CREATE TABLE alert_scans (
+    kind TEXT PRIMARY KEY,
+    expiring_through DATE,
+    expired_through DATE
+);
+INSERT INTO alert_scans (kind) VALUES ('warranty'), ('licence');
+CREATE TABLE alert_rechecks (
+    kind TEXT NOT NULL,
+    item_id INTEGER NOT NULL,
+    PRIMARY KEY (kind, item_id)
+);
+INSERT INTO table_versions (table_name) VALUES ('alerts');
+-- A changed expiry date or decommissioning resolves the item's open alerts
+-- and queues it for the next run; a deleted item's alerts are resolved
+CREATE OR REPLACE FUNCTION alerts_recheck(p_kind TEXT, p_item_id INTEGER, p_queue BOOLEAN) RETURNS void AS $$
+BEGIN
+    UPDATE alerts SET resolved_at = CURRENT_TIMESTAMP
+    WHERE kind = p_kind AND item_id = p_item_id AND resolved_at IS NULL;
+    IF p_queue THEN
+        INSERT INTO alert_rechecks (kind, item_id) VALUES (p_kind, p_item_id) ON CONFLICT DO NOTHING;
+    ELSE
+        DELETE FROM alert_rechecks WHERE kind = p_kind AND item_id = p_item_id;
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+CREATE OR REPLACE FUNCTION alerts_hardware() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        PERFORM alerts_recheck('warranty', old.device_id, false);
+    ELSE
+        PERFORM alerts_recheck('warranty', new.device_id, true);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+CREATE TRIGGER alerts_hardware_insert AFTER INSERT ON hardware
+FOR EACH ROW WHEN (new.warranty_expiration IS NOT NULL) EXECUTE FUNCTION alerts_hardware();
+CREATE TRIGGER alerts_hardware_update AFTER UPDATE OF warranty_expiration, status ON hardware
+FOR EACH ROW WHEN (old.warranty_expiration IS DISTINCT FROM new.warranty_expiration
+    OR (old.status = 'decommissioned') IS DISTINCT FROM (new.status = 'decommissioned'))
+EXECUTE FUNCTION alerts_hardware();
+CREATE TRIGGER alerts_hardware_delete AFTER DELETE ON hardware
+FOR EACH ROW EXECUTE FUNCTION alerts_hardware();
+CREATE OR REPLACE FUNCTION alerts_software() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        PERFORM alerts_recheck('licence', old.software_id, false);
+    ELSE
+        PERFORM alerts_recheck('licence', new.software_id, true);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+CREATE TRIGGER alerts_software_insert AFTER INSERT ON software
+FOR EACH ROW WHEN (new.expiration_date IS NOT NULL) EXECUTE FUNCTION alerts_software();
+CREATE TRIGGER alerts_software_update AFTER UPDATE OF expiration_date, status ON software
+FOR EACH ROW WHEN (old.expiration_date IS DISTINCT FROM new.expiration_date
+    OR (old.status = 'decommissioned') IS DISTINCT FROM (new.status = 'decommissioned'))
+EXECUTE FUNCTION alerts_software();
+CREATE TRIGGER alerts_software_delete AFTER DELETE ON software
+FOR EACH ROW EXECUTE FUNCTION alerts_software();
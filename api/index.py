@@ -1,7 +1,17 @@
-from flask import Flask
+from flask import Flask, jsonify
 from flask_cors import CORS
 import os
 
+from api.db.backends import get_backend
+from api.db.database import init_app as init_db
+from api.utils.cache import response_cache
+from api.utils.auth import require_role
+from api.utils.metrics import init_metrics
+from api.utils.compression import compressed_cache, init_compression
+from api.utils.encoding import init_encoding
+from api.utils.idempotency import init_idempotency
+from api.utils.resource import prepare_resources
+
 from api.routes.employee import employee_bp
 from api.routes.hardware import hardware_bp
 from api.routes.software import software_bp
@@ -10,6 +20,16 @@ from api.routes.audio_video import audio_video_bp
 from api.routes.department import department_bp
 from api.routes.inventory_assignments import inventory_bp
 from api.routes.user import user_bp
+from api.routes.export import export_bp
+from api.routes.assets import assets_bp
+from api.routes.search import search_bp
+from api.routes.stats import stats_bp
+from api.routes.metrics import metrics_bp
+from api.routes.loans import loans_bp
+from api.routes.removals import removals_bp
+from api.routes.history import history_bp
+from api.routes.changes import changes_bp
+from api.routes.alerts import alerts_bp
 
 app = Flask(__name__)
 app.secret_key = "your-very-secret-key"  # Use a strong, random value in production
@@ -27,6 +47,12 @@ else:
         "https://nextjs-flask-inventory.vercel.app"
     ])
 
+init_db(app)
+init_metrics(app)
+init_encoding(app)
+init_compression(app)
+init_idempotency(app)
+
 app.register_blueprint(employee_bp)
 app.register_blueprint(hardware_bp)
 app.register_blueprint(software_bp)
@@ -35,6 +61,28 @@ app.register_blueprint(audio_video_bp)
 app.register_blueprint(department_bp)
 app.register_blueprint(inventory_bp)
 app.register_blueprint(user_bp)
+app.register_blueprint(export_bp)
+app.register_blueprint(assets_bp)
+app.register_blueprint(search_bp)
+app.register_blueprint(stats_bp)
+app.register_blueprint(metrics_bp)
+app.register_blueprint(loans_bp)
+app.register_blueprint(removals_bp)
+app.register_blueprint(history_bp)
+app.register_blueprint(changes_bp)
+app.register_blueprint(alerts_bp)
+
+prepare_resources()
+
+# Connection pool usage, checkout wait times and response cache hit rates
+@app.route("/api/db/stats", methods=["GET"])
+@require_role("admin", "super_admin")
+def db_stats():
+    return jsonify({
+        "pool": get_backend().stats(),
+        "response_cache": response_cache.stats(),
+        "compressed_cache": compressed_cache.stats(),
+    }), 200
 
 if __name__ == "__main__":
     debug_mode = os.getenv("FLASK_DEBUG", "false").lower() == "true"
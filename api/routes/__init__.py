@@ -10,6 +10,16 @@ from api.routes.audio_video import audio_video_bp
 from api.routes.department import department_bp
 from api.routes.inventory_assignments import inventory_bp
 from api.routes.user import user_bp
+from api.routes.export import export_bp
+from api.routes.assets import assets_bp
+from api.routes.search import search_bp
+from api.routes.stats import stats_bp
+from api.routes.metrics import metrics_bp
+from api.routes.loans import loans_bp
+from api.routes.removals import removals_bp
+from api.routes.history import history_bp
+from api.routes.changes import changes_bp
+from api.routes.alerts import alerts_bp
 
 # Register blueprints
 bp.register_blueprint(employee_bp)
@@ -19,6 +29,16 @@ bp.register_blueprint(data_bp)
 bp.register_blueprint(audio_video_bp)
 bp.register_blueprint(department_bp)
 bp.register_blueprint(inventory_bp)
+bp.register_blueprint(export_bp)
+bp.register_blueprint(assets_bp)
+bp.register_blueprint(search_bp)
+bp.register_blueprint(stats_bp)
+bp.register_blueprint(metrics_bp)
+bp.register_blueprint(loans_bp)
+bp.register_blueprint(removals_bp)
+bp.register_blueprint(history_bp)
+bp.register_blueprint(changes_bp)
+bp.register_blueprint(alerts_bp)
 
 # Optionally, export all blueprints as a list for easy import elsewhere
 all_blueprints = [
@@ -29,7 +49,17 @@ all_blueprints = [
     data_bp,
     department_bp,
     inventory_bp,
-    user_bp
+    user_bp,
+    export_bp,
+    assets_bp,
+    search_bp,
+    stats_bp,
+    metrics_bp,
+    loans_bp,
+    removals_bp,
+    history_bp,
+    changes_bp,
+    alerts_bp
 ]
 
 # The above code imports the necessary blueprints and registers them with the main blueprint.
@@ -0,0 +1,67 @@
+from flask import Blueprint, jsonify, request
+from api.db.alerts import ALERT_COLUMNS, ALERT_SOURCES, ALERT_STATES, run_once
+from api.db.database import get_db
+from api.db.repository import RepositoryError
+from api.utils.auth import protect_blueprint, require_role, DELETE_ROLES
+from api.utils.pagination import parse_limit, PaginationError
+from api.utils.cache import cached_response
+from api.routes.loans import parse_date, parse_int
+from api.utils.notify import parse_sinks
+
+alerts_bp = Blueprint("alerts", __name__, url_prefix="/api/alerts")
+protect_blueprint(alerts_bp)
+
+def parse_choice(name, choices):
+    value = request.args.get(name)
+    if value in (None, ""):
+        return None
+    if value not in choices:
+        raise PaginationError(f"{name} must be one of: {', '.join(choices)}")
+    return value
+
+# Open alerts, soonest expiry first, read from the alert queue alone.
+# ?kind=warranty|licence and ?state=expiring|expired narrow it; ?cursor= is
+# the "expires_on,alert_id" of the last row returned. An alert drops out as
+# soon as its item is renewed, decommissioned or deleted.
+@alerts_bp.route("/", methods=["GET"])
+@cached_response("alerts")
+def get_alerts():
+    try:
+        limit = parse_limit()
+        sql = f"SELECT {', '.join(ALERT_COLUMNS)} FROM alerts WHERE resolved_at IS NULL"
+        params = []
+        for name, choices in (("kind", tuple(ALERT_SOURCES)), ("state", ALERT_STATES)):
+            value = parse_choice(name, choices)
+            if value is not None:
+                sql += f" AND {name} = ?"
+                params.append(value)
+        cursor = request.args.get("cursor")
+        if cursor:
+            expires_on, _, alert_id = cursor.partition(",")
+            sql += " AND (expires_on, alert_id) > (?, ?)"
+            params += [parse_date(expires_on, "cursor"), parse_int(alert_id, "cursor")]
+        sql += " ORDER BY expires_on, alert_id LIMIT ?"
+        params.append(limit + 1)
+        rows = get_db().execute(sql, params).fetchall()
+        next_cursor = None
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            next_cursor = f"{last[4]},{last[0]}"
+        alerts = [dict(zip(ALERT_COLUMNS, row)) for row in rows[:limit]]
+        return jsonify({"alerts": alerts, "next_cursor": next_cursor}), 200
+    except (PaginationError, RepositoryError) as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": f"Failed to fetch alerts: {str(e)}"}), 500
+
+# Run the alert scan and send notifications now rather than on the worker's next tick
+@alerts_bp.route("/run", methods=["POST"])
+@require_role(*DELETE_ROLES)
+def run_alerts_now():
+    try:
+        result, sent = run_once(parse_sinks())
+        if result is None:
+            return jsonify({"raised": 0, "resolved": 0, "notified": sent, "message": "No alert scan due"}), 200
+        return jsonify({**result, "notified": sent}), 200
+    except Exception as e:
+        return jsonify({"error": f"Failed to run alerts: {str(e)}"}), 500
@@ -0,0 +1,152 @@
+from flask import Blueprint, jsonify, request
+from api.db.database import get_db, get_table_columns
+from api.utils.auth import protect_blueprint
+from api.utils.pagination import parse_limit, parse_cursor, PaginationError
+from api.utils.cache import cached_response
+from datetime import date
+
+assets_bp = Blueprint("assets", __name__, url_prefix="/api/assets")
+protect_blueprint(assets_bp)
+
+# Subtype tables hanging off hardware(device_id): (table, alias, response key)
+SUBTYPES = (
+    ("computers", "c", "computer"),
+    ("printers", "p", "printer"),
+    ("devices", "d", "device"),
+    ("audio_video", "av", "audio_video"),
+)
+ASSIGNEE_COLUMNS = ("employee_id", "first_name", "last_name", "email")
+# Every table an asset response reads from, for cache invalidation
+ASSET_TABLES = ("hardware",) + tuple(table for table, _, _ in SUBTYPES) + ("employees",)
+# Columns already present on the hardware row
+SHARED_COLUMNS = ("device_id", "serial_number")
+
+# Built on first use: the SELECT/FROM part of the query and, for each result
+# column, which nested object (None for the hardware row itself) it belongs to
+_asset_query = None
+
+def build_asset_query(db):
+    global _asset_query
+    if _asset_query is not None:
+        return _asset_query
+
+    select = []
+    layout = []
+    for column in get_table_columns(db, "hardware"):
+        select.append(f"h.{column}")
+        layout.append((None, column))
+    for table, alias, key in SUBTYPES:
+        # A present device_id tells "no subtype row" apart from all-null columns
+        select.append(f"{alias}.device_id")
+        layout.append((key, None))
+        for column in get_table_columns(db, table):
+            if column not in SHARED_COLUMNS:
+                select.append(f"{alias}.{column}")
+                layout.append((key, column))
+    select.append("e.employee_id")
+    layout.append(("assigned_to", None))
+    for column in ASSIGNEE_COLUMNS:
+        select.append(f"e.{column}")
+        layout.append(("assigned_to", column))
+
+    joins = "".join(f" LEFT JOIN {table} {alias} ON {alias}.device_id = h.device_id" for table, alias, _ in SUBTYPES)
+    sql = f"SELECT {', '.join(select)} FROM hardware h{joins} LEFT JOIN employees e ON e.employee_id = h.assignee"
+    _asset_query = (sql, layout)
+    return _asset_query
+
+# Turn one flat joined row into the hardware dict with nested subtype/assignee objects
+def row_to_asset(row, layout):
+    asset = {key: None for _, _, key in SUBTYPES}
+    asset["assigned_to"] = None
+    present = set()
+    for value, (key, column) in zip(row, layout):
+        if key is None:
+            asset[column] = value
+        elif column is None:
+            if value is not None:
+                present.add(key)
+                asset[key] = {}
+        elif key in present:
+            asset[key][column] = value
+    return asset
+
+def parse_date_arg(name):
+    raw = request.args.get(name)
+    if not raw:
+        return None
+    try:
+        return date.fromisoformat(raw).isoformat()
+    except ValueError:
+        raise PaginationError(f"{name} must be a YYYY-MM-DD date")
+
+# Build the WHERE clause from ?status=, ?device_type=, ?assignee= and the
+# ?warranty_from= / ?warranty_to= expiry range (inclusive)
+def build_filters():
+    clauses, params = [], []
+    for name in ("status", "device_type"):
+        raw = request.args.get(name)
+        if raw:
+            values = [value.strip() for value in raw.split(",") if value.strip()]
+            clauses.append(f"h.{name} IN ({', '.join('?' for _ in values)})")
+            params.extend(values)
+    assignee = request.args.get("assignee")
+    if assignee:
+        try:
+            params.append(int(assignee))
+        except ValueError:
+            raise PaginationError("assignee must be an integer")
+        clauses.append("h.assignee = ?")
+    warranty_from = parse_date_arg("warranty_from")
+    if warranty_from:
+        clauses.append("h.warranty_expiration >= ?")
+        params.append(warranty_from)
+    warranty_to = parse_date_arg("warranty_to")
+    if warranty_to:
+        clauses.append("h.warranty_expiration <= ?")
+        params.append(warranty_to)
+    return clauses, params
+
+# Hardware joined with its subtype rows and assignee, filtered and keyset-paginated
+@assets_bp.route("/", methods=["GET"])
+@cached_response(*ASSET_TABLES)
+def get_assets():
+    try:
+        db = get_db()
+        sql, layout = build_asset_query(db)
+        limit = parse_limit()
+        cursor = parse_cursor()
+        clauses, params = build_filters()
+        if cursor is not None:
+            clauses.append("h.device_id > ?")
+            params.append(cursor)
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY h.device_id LIMIT ?"
+        params.append(limit + 1)
+
+        rows = db.execute(sql, params).fetchall()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = rows[-1][0]
+        assets = [row_to_asset(row, layout) for row in rows]
+        return jsonify({"assets": assets, "next_cursor": next_cursor}), 200
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": f"Failed to fetch assets: {str(e)}"}), 500
+
+# One asset with its subtype rows and assignee
+@assets_bp.route("/<int:device_id>", methods=["GET"])
+@cached_response(*ASSET_TABLES)
+def get_asset_by_id(device_id):
+    try:
+        db = get_db()
+        sql, layout = build_asset_query(db)
+        row = db.execute(sql + " WHERE h.device_id = ?", (device_id,)).fetchone()
+        if row:
+            return jsonify({"asset": row_to_asset(row, layout)}), 200
+        else:
+            return jsonify({"error": "Asset not found"}), 404
+    except Exception as e:
+        return jsonify({"error": f"Failed to fetch asset: {str(e)}"}), 500
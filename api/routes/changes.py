@@ -0,0 +1,121 @@
+from flask import Blueprint, Response, jsonify, request
+from api.db.changes import FEED_TABLES, CHANGE_BATCH, ChangesExpired, event_bytes, get_change_feed, latest_seq, read_changes
+from api.db.database import get_db
+from api.utils.auth import protect_blueprint
+from api.utils.pagination import parse_limit, PaginationError
+import os
+import time
+
+changes_bp = Blueprint("changes", __name__, url_prefix="/api/changes")
+protect_blueprint(changes_bp)
+
+# Seconds between keep-alive comments on an idle stream
+CHANGE_KEEPALIVE = float(os.getenv("CHANGE_KEEPALIVE", 15))
+# A stream is closed after this many seconds; EventSource reconnects with
+# Last-Event-ID, which re-checks the session's role and resumes in place
+CHANGE_STREAM_SECONDS = float(os.getenv("CHANGE_STREAM_SECONDS", 600))
+# Milliseconds EventSource waits before reconnecting
+CHANGE_RETRY_MS = 3000
+
+# Set by the ASGI entry point to a threading.Event that is set once the
+# client has gone away, so an open stream can end without waiting for its
+# deadline
+CLIENT_GONE = "api.client_gone"
+
+KEEPALIVE = b": keepalive\n\n"
+
+def parse_since(value):
+    if value in (None, ""):
+        return None
+    try:
+        since = int(value)
+    except ValueError:
+        raise PaginationError("since must be an integer")
+    if since < 0:
+        raise PaginationError("since cannot be negative")
+    return since
+
+# ?tables=a,b limits the feed to those tables; None means all of them
+def parse_tables():
+    raw = request.args.get("tables")
+    if not raw:
+        return None
+    tables = set(name.strip() for name in raw.split(",") if name.strip())
+    unknown = sorted(tables - set(FEED_TABLES))
+    if unknown:
+        raise PaginationError(f"Unknown table: {', '.join(unknown)}")
+    return tables
+
+def reset_event(error):
+    return event_bytes("reset", {"error": str(error)})
+
+def stream_events(feed, since, tables, client_gone=None):
+    last = since
+    deadline = time.monotonic() + CHANGE_STREAM_SECONDS
+    while not feed.stopped and time.monotonic() < deadline and not (client_gone and client_gone.is_set()):
+        try:
+            chunk, last = feed.events_after(last, tables)
+        except ChangesExpired as e:
+            yield reset_event(e)
+            return
+        if chunk:
+            yield chunk
+        elif not feed.wait(last, CHANGE_KEEPALIVE):
+            yield KEEPALIVE
+
+# One page of changes after ?since= (default 0), oldest first, for clients
+# that poll. Each change carries its row as it is now (null once deleted).
+# Resume with next_since; 410 means the changes were pruned and the client
+# has to reload its tables.
+@changes_bp.route("/", methods=["GET"])
+def get_changes():
+    try:
+        since = parse_since(request.args.get("since")) or 0
+        limit = parse_limit(CHANGE_BATCH)
+        tables = parse_tables()
+        db = get_db()
+        changes = read_changes(db, since, limit)
+        next_since = changes[-1]["seq"] if changes else since
+        if tables is not None:
+            changes = [change for change in changes if change["table"] in tables]
+        return jsonify({
+            "changes": changes,
+            "next_since": next_since,
+            "latest_seq": max(latest_seq(db), next_since),
+        }), 200
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
+    except ChangesExpired as e:
+        return jsonify({"error": str(e)}), 410
+    except Exception as e:
+        return jsonify({"error": f"Failed to fetch changes: {str(e)}"}), 500
+
+# Server-Sent Events: a "ready" event with the seq the stream starts after,
+# then a "change" event (id = seq) per row change. Resumes after
+# Last-Event-ID or ?since=, else starts from now. A "reset" event means the
+# requested changes were pruned and the client has to reload.
+@changes_bp.route("/stream", methods=["GET"])
+def stream_changes():
+    try:
+        since = parse_since(request.headers.get("Last-Event-ID"))
+        if since is None:
+            since = parse_since(request.args.get("since"))
+        tables = parse_tables()
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
+    feed = get_change_feed()
+    if since is None:
+        since = feed.head
+    preamble = f"retry: {CHANGE_RETRY_MS}\n\n".encode() + event_bytes("ready", {"seq": since})
+    client_gone = request.environ.get(CLIENT_GONE)
+
+    def body():
+        yield preamble
+        yield from stream_events(feed, since, tables, client_gone)
+
+    # No stream_with_context: the app context, and with it the pooled
+    # connection used for the role check, ends before streaming starts
+    response = Response(body(), mimetype="text/event-stream")
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
@@ -1,82 +1,152 @@
-from flask import Blueprint, jsonify, request
+from flask import jsonify, request
 from api.db.database import get_db
+from api.db.repository import Repository, RepositoryError, ConstraintError, NotFoundError, transaction
+from api.utils.auth import require_role, DELETE_ROLES
+from api.utils.pagination import parse_limit, parse_cursor, PaginationError
+from api.utils.cache import cached_response
+from api.utils.resource import resource_blueprint
 
-data_bp = Blueprint("data", __name__, url_prefix="/api/data")
+data_repo = Repository("data", "data_id")
 
-@data_bp.route("/", methods=["GET"])
-def get_all_data():
-    try:
-        db = get_db()
-        cursor = db.cursor()
-        cursor.execute("SELECT * FROM data")
-        rows = cursor.fetchall()
-        data = [{"id": row[0], "name": row[1], "value": row[2]} for row in rows]
-        return jsonify({"data": data}), 200
-    except Exception as e:
-        return jsonify({"error": f"Failed to fetch data: {str(e)}"}), 500
+# /api/data: list, get, create, bulk import, update and delete data assets;
+# the member routes below manage who can access them
+data_bp = resource_blueprint("data", data_repo, "/api/data", item="data", noun="data")
+
+# Largest data_ids / employee_ids list one grant or revoke accepts
+MAX_MEMBER_IDS = 1000
+MEMBER_COLUMNS = ("employee_id", "first_name", "last_name", "email")
+ACCESS_COLUMNS = ("data_id", "data_name", "data_type", "access_level", "status")
+MEMBER_TABLES = ("data_members", "data", "employees")
+
+# A list of integer IDs from a grant/revoke body; None if the key is absent
+def parse_id_list(body, name):
+    values = body.get(name)
+    if values is None:
+        return None
+    if not isinstance(values, list) or not values:
+        raise RepositoryError(f"{name} must be a non-empty list of IDs")
+    if len(values) > MAX_MEMBER_IDS:
+        raise RepositoryError(f"{name} can hold at most {MAX_MEMBER_IDS} IDs")
+    if not all(isinstance(value, int) and not isinstance(value, bool) for value in values):
+        raise RepositoryError(f"{name} must only contain integer IDs")
+    return sorted(set(values))
+
+def member_request():
+    body = request.get_json(silent=True)
+    if not isinstance(body, dict):
+        raise RepositoryError("Request body must be a JSON object")
+    return parse_id_list(body, "data_ids"), parse_id_list(body, "employee_ids")
+
+def in_clause(values):
+    return ", ".join("?" for _ in values)
+
+# Raise NotFoundError naming any of `ids` that has no row in `table`
+def check_ids_exist(db, table, key, ids):
+    found = set(row[0] for row in db.execute(f"SELECT {key} FROM {table} WHERE {key} IN ({in_clause(ids)})", ids))
+    missing = [value for value in ids if value not in found]
+    if missing:
+        raise NotFoundError(f"Unknown {key}: {', '.join(str(value) for value in missing)}")
 
-# Get all data entries
-@data_bp.route("/<int:data_id>", methods=["GET"])
-def get_data_by_id(data_id):
+# Employees who can access a data asset, keyset-paged by employee_id
+@data_bp.route("/<int:data_id>/members", methods=["GET"])
+@cached_response(*MEMBER_TABLES)
+def get_data_members(data_id):
     try:
+        limit = parse_limit()
+        cursor = parse_cursor()
         db = get_db()
-        cursor = db.cursor()
-        cursor.execute("SELECT * FROM data WHERE id = ?", (data_id,))
-        row = cursor.fetchone()
-        
-        if row:
-            return jsonify({"data": row}), 200
-        else:
+        if db.execute("SELECT 1 FROM data WHERE data_id = ?", (data_id,)).fetchone() is None:
             return jsonify({"error": "Data not found"}), 404
-
+        rows = db.execute(
+            f"SELECT {', '.join('e.' + column for column in MEMBER_COLUMNS)} FROM data_members m"
+            " JOIN employees e ON e.employee_id = m.employee_id"
+            " WHERE m.data_id = ? AND m.employee_id > ? ORDER BY m.employee_id LIMIT ?",
+            (data_id, cursor or 0, limit + 1),
+        ).fetchall()
+        next_cursor = rows[limit - 1][0] if len(rows) > limit else None
+        members = [dict(zip(MEMBER_COLUMNS, row)) for row in rows[:limit]]
+        return jsonify({"data_id": data_id, "members": members, "next_cursor": next_cursor}), 200
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
-        return jsonify({"error": f"Failed to fetch data: {str(e)}"}), 500
+        return jsonify({"error": f"Failed to fetch data members: {str(e)}"}), 500
 
-# Create a new data entry
-@data_bp.route("/", methods=["POST"])
-def create_data():
+# Data assets an employee can access, keyset-paged by data_id
+@data_bp.route("/access/<int:employee_id>", methods=["GET"])
+@cached_response(*MEMBER_TABLES)
+def get_employee_data_access(employee_id):
     try:
-        data = request.get_json()
+        limit = parse_limit()
+        cursor = parse_cursor()
         db = get_db()
-        cursor = db.cursor()
-        cursor.execute("INSERT INTO data (name, value) VALUES (?, ?)", (data['name'], data['value']))
-        db.commit()
-        new_id = cursor.lastrowid
-        return jsonify({"id": new_id, "message": "Data created successfully"}), 201
+        if db.execute("SELECT 1 FROM employees WHERE employee_id = ?", (employee_id,)).fetchone() is None:
+            return jsonify({"error": "Employee not found"}), 404
+        rows = db.execute(
+            f"SELECT {', '.join('d.' + column for column in ACCESS_COLUMNS)} FROM data_members m"
+            " JOIN data d ON d.data_id = m.data_id"
+            " WHERE m.employee_id = ? AND m.data_id > ? ORDER BY m.data_id LIMIT ?",
+            (employee_id, cursor or 0, limit + 1),
+        ).fetchall()
+        next_cursor = rows[limit - 1][0] if len(rows) > limit else None
+        data = [dict(zip(ACCESS_COLUMNS, row)) for row in rows[:limit]]
+        return jsonify({"employee_id": employee_id, "data": data, "next_cursor": next_cursor}), 200
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
-        return jsonify({"error": f"Failed to create data: {str(e)}"}), 500
-    
-# Update an existing data entry
-@data_bp.route("/<int:data_id>", methods=["PUT", "PATCH"])
-def update_data(data_id):
-    try:
-        data = request.get_json()
-        db = get_db()
-        cursor = db.cursor()
-        cursor.execute("UPDATE data SET name = ?, value = ? WHERE id = ?", (data['name'], data['value'], data_id))
-        db.commit()
-        
-        if cursor.rowcount == 0:
-            return jsonify({"error": "Data not found"}), 404
-        
-        return jsonify({"message": "Data updated successfully"}), 200
+        return jsonify({"error": f"Failed to fetch data access: {str(e)}"}), 500
 
+# Give every employee in employee_ids access to every asset in data_ids.
+# Existing memberships are left as they are.
+@data_bp.route("/members/grant", methods=["POST"])
+def grant_data_access():
+    try:
+        data_ids, employee_ids = member_request()
+        if data_ids is None or employee_ids is None:
+            raise RepositoryError("data_ids and employee_ids are required")
+        with transaction("data_members") as db:
+            check_ids_exist(db, "data", "data_id", data_ids)
+            check_ids_exist(db, "employees", "employee_id", employee_ids)
+            existing = db.execute(
+                f"SELECT COUNT(*) FROM data_members WHERE data_id IN ({in_clause(data_ids)})"
+                f" AND employee_id IN ({in_clause(employee_ids)})",
+                data_ids + employee_ids,
+            ).fetchone()[0]
+            db.executemany(
+                "INSERT INTO data_members (data_id, employee_id) VALUES (?, ?) ON CONFLICT DO NOTHING",
+                [(data_id, employee_id) for data_id in data_ids for employee_id in employee_ids],
+            )
+        granted = len(data_ids) * len(employee_ids) - existing
+        return jsonify({"granted": granted, "message": "Access granted successfully"}), 200
+    except NotFoundError as e:
+        return jsonify({"error": str(e)}), 404
+    except ConstraintError as e:
+        return jsonify({"error": f"Failed to grant access: {str(e)}"}), 409
+    except RepositoryError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
-        return jsonify({"error": f"Failed to update data: {str(e)}"}), 500
+        return jsonify({"error": f"Failed to grant access: {str(e)}"}), 500
 
-# Delete a data entry
-@data_bp.route("/<int:data_id>", methods=["DELETE"])
-def delete_data(data_id):
+# Remove access: the data_ids x employee_ids pairs, or with only one list
+# given, every membership of those assets or of those employees
+@data_bp.route("/members/revoke", methods=["POST"])
+@require_role(*DELETE_ROLES)
+def revoke_data_access():
     try:
-        db = get_db()
-        cursor = db.cursor()
-        cursor.execute("DELETE FROM data WHERE id = ?", (data_id,))
-        db.commit()
-        
-        if cursor.rowcount == 0:
-            return jsonify({"error": "Data not found"}), 404
-        
-        return jsonify({"message": "Data deleted successfully"}), 200
-
+        data_ids, employee_ids = member_request()
+        if data_ids is None and employee_ids is None:
+            raise RepositoryError("data_ids or employee_ids is required")
+        conditions = []
+        params = []
+        if data_ids is not None:
+            conditions.append(f"data_id IN ({in_clause(data_ids)})")
+            params += data_ids
+        if employee_ids is not None:
+            conditions.append(f"employee_id IN ({in_clause(employee_ids)})")
+            params += employee_ids
+        with transaction("data_members") as db:
+            revoked = db.execute(f"DELETE FROM data_members WHERE {' AND '.join(conditions)}", params).rowcount
+        return jsonify({"revoked": revoked, "message": "Access revoked successfully"}), 200
+    except RepositoryError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
-        return jsonify({"error": f"Failed to delete data: {str(e)}"}), 500
\ No newline at end of file
+        return jsonify({"error": f"Failed to revoke access: {str(e)}"}), 500
@@ -0,0 +1,115 @@
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+from api.db.database import get_db, get_table_columns
+from api.db.repository import Repository
+from api.utils.auth import protect_blueprint
+from api.utils.pagination import parse_fields, PaginationError
+from api.utils.cache import cached_response
+from api.utils.encoding import dumps
+import csv
+import io
+
+export_bp = Blueprint("export", __name__, url_prefix="/api")
+protect_blueprint(export_bp)
+
+# Exportable tables and the key each one is streamed in order of
+EXPORT_TABLES = {
+    "hardware": "device_id",
+    "computers": "device_id",
+    "printers": "device_id",
+    "devices": "device_id",
+    "audio_video": "device_id",
+    "software": "software_id",
+    "data": "data_id",
+    "inventory_assignments": "assignment_id",
+}
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+EXPORT_BATCH_SIZE = 500
+DEFAULT_PREVIEW_ROWS = 10
+MAX_PREVIEW_ROWS = 100
+
+# Read ?preview=N (or ?limit=N on the preview endpoint) as a row cap
+def parse_row_limit(name, default=None, maximum=None):
+    raw = request.args.get(name)
+    if raw in (None, ""):
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        raise PaginationError(f"{name} must be an integer")
+    if value < 1:
+        raise PaginationError(f"{name} must be at least 1")
+    return min(value, maximum) if maximum else value
+
+# Yield rows in batches from a server-side cursor, so at most one batch is
+# held in memory however large the table is
+def iter_batches(table, fields, limit=None):
+    return Repository(table, EXPORT_TABLES[table]).stream(fields, limit, EXPORT_BATCH_SIZE)
+
+def generate_ndjson(table, fields, limit):
+    for batch in iter_batches(table, fields, limit):
+        yield b"".join(dumps(dict(zip(fields, row))) + b"\n" for row in batch)
+
+def generate_csv(table, fields, limit):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    for batch in iter_batches(table, fields, limit):
+        writer.writerows(batch)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+    if buffer.tell():
+        yield buffer.getvalue()
+
+# Stream a whole table as NDJSON (default) or CSV; ?preview=N stops after N rows
+@export_bp.route("/export/<table>", methods=["GET"])
+def export_table(table):
+    if table not in EXPORT_TABLES:
+        return jsonify({"error": f"Unknown export table: {table}"}), 404
+    export_format = request.args.get("format", "ndjson").lower()
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({"error": f"Unsupported export format: {export_format}"}), 400
+    try:
+        fields = parse_fields(get_table_columns(get_db(), table))
+        limit = parse_row_limit("preview")
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": f"Failed to export {table}: {str(e)}"}), 500
+
+    generate = generate_csv if export_format == "csv" else generate_ndjson
+    response = Response(
+        stream_with_context(generate(table, fields, limit)),
+        mimetype=EXPORT_FORMATS[export_format],
+    )
+    response.headers["Content-Disposition"] = f"attachment; filename={table}.{export_format}"
+    return response
+
+# First N rows of every exportable table (or ?tables=a,b), for the export preview page
+@export_bp.route("/export-preview", methods=["GET"])
+@cached_response(*EXPORT_TABLES)
+def export_preview():
+    try:
+        limit = parse_row_limit("limit", DEFAULT_PREVIEW_ROWS, MAX_PREVIEW_ROWS)
+        requested = request.args.get("tables")
+        tables = [t.strip() for t in requested.split(",") if t.strip()] if requested else list(EXPORT_TABLES)
+        unknown = [t for t in tables if t not in EXPORT_TABLES]
+        if unknown:
+            return jsonify({"error": f"Unknown export table: {', '.join(unknown)}"}), 404
+
+        db = get_db()
+        preview = {}
+        for table in tables:
+            fields = get_table_columns(db, table)
+            rows = [row for batch in iter_batches(table, fields, limit) for row in batch]
+            preview[table] = {"columns": fields, "rows": [dict(zip(fields, row)) for row in rows]}
+        return jsonify({"limit": limit, "tables": preview}), 200
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": f"Failed to build export preview: {str(e)}"}), 500
@@ -0,0 +1,90 @@
+from flask import Blueprint, jsonify, request
+from api.db.database import get_db
+from api.db.history import EVENT_COLUMNS, device_as_of, fleet_as_of, take_snapshot
+from api.db.repository import transaction, RepositoryError
+from api.utils.auth import protect_blueprint, require_role, DELETE_ROLES
+from api.utils.pagination import parse_limit, parse_cursor, PaginationError
+from api.utils.cache import cached_response, current_date
+from api.routes.loans import parse_date, parse_int
+
+history_bp = Blueprint("history", __name__, url_prefix="/api")
+protect_blueprint(history_bp)
+
+def snapshot_info(snapshot):
+    if snapshot is None:
+        return None
+    return {"snapshot_id": snapshot[0], "snapshot_date": snapshot[1]}
+
+# A device's recorded events, oldest first. Optional ?from= and ?to= bound
+# event_date; ?cursor= is the last event_id of the previous page.
+@history_bp.route("/assets/<int:device_id>/history", methods=["GET"])
+@cached_response("hardware")
+def get_asset_history(device_id):
+    try:
+        limit = parse_limit()
+        cursor = parse_cursor()
+        sql = f"SELECT {', '.join(EVENT_COLUMNS)} FROM asset_events WHERE device_id = ? AND event_id > ?"
+        params = [device_id, cursor or 0]
+        for name, op in (("from", ">="), ("to", "<=")):
+            value = parse_date(request.args.get(name), name)
+            if value is not None:
+                sql += f" AND event_date {op} ?"
+                params.append(value)
+        sql += " ORDER BY event_id LIMIT ?"
+        params.append(limit + 1)
+        db = get_db()
+        rows = db.execute(sql, params).fetchall()
+        if not rows and cursor is None and not db.execute(
+            "SELECT 1 FROM asset_events WHERE device_id = ? LIMIT 1", (device_id,)
+        ).fetchone():
+            return jsonify({"error": "No history for this device"}), 404
+        next_cursor = rows[limit - 1][0] if len(rows) > limit else None
+        events = [dict(zip(EVENT_COLUMNS, row)) for row in rows[:limit]]
+        return jsonify({"device_id": device_id, "events": events, "next_cursor": next_cursor}), 200
+    except (PaginationError, RepositoryError) as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": f"Failed to fetch asset history: {str(e)}"}), 500
+
+# Who held what, and in which status, at the end of ?date= (default today).
+# ?device_id= answers for one device; otherwise the fleet is keyset-paged by
+# device_id. Devices that did not exist on that date are left out. Cached
+# per day, so the default moves on at midnight.
+@history_bp.route("/inventory/as-of", methods=["GET"])
+@cached_response("hardware", vary=current_date)
+def get_inventory_as_of():
+    try:
+        as_of = parse_date(request.args.get("date"), "date", current_date())
+        device_id = request.args.get("device_id")
+        db = get_db()
+        if device_id not in (None, ""):
+            state, snapshot, replayed = device_as_of(db, parse_int(device_id, "device_id"), as_of)
+            if state is None:
+                return jsonify({"error": "Device did not exist on this date"}), 404
+            return jsonify({
+                "as_of": as_of, "device": state,
+                "snapshot": snapshot_info(snapshot), "replayed_events": replayed,
+            }), 200
+        limit = parse_limit()
+        devices, next_cursor, snapshot, replayed = fleet_as_of(db, as_of, limit, parse_cursor())
+        return jsonify({
+            "as_of": as_of, "devices": devices, "next_cursor": next_cursor,
+            "snapshot": snapshot_info(snapshot), "replayed_events": replayed,
+        }), 200
+    except (PaginationError, RepositoryError) as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": f"Failed to fetch inventory: {str(e)}"}), 500
+
+# Materialise a snapshot now rather than waiting for the scheduled one
+@history_bp.route("/inventory/snapshots", methods=["POST"])
+@require_role(*DELETE_ROLES)
+def create_snapshot():
+    try:
+        with transaction() as db:
+            snapshot_id = take_snapshot(db)
+        if snapshot_id is None:
+            return jsonify({"message": "No changes since the last snapshot"}), 200
+        return jsonify({"id": snapshot_id, "message": "Snapshot created successfully"}), 201
+    except Exception as e:
+        return jsonify({"error": f"Failed to create snapshot: {str(e)}"}), 500
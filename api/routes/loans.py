@@ -0,0 +1,184 @@
+from flask import Blueprint, jsonify, request
+from api.db.backends import get_backend
+from api.db.database import get_db
+from api.db.repository import transaction, RepositoryError, ConstraintError, NotFoundError
+from api.utils.auth import protect_blueprint
+from api.utils.pagination import parse_limit, parse_cursor, PaginationError
+from api.utils.cache import cached_response, current_date
+from datetime import date
+
+loans_bp = Blueprint("loans", __name__, url_prefix="/api/loans")
+protect_blueprint(loans_bp)
+
+# A loan is an inventory assignment whose return_date is still NULL. Every
+# read below filters on exactly that, so it is answered from the partial
+# idx_loans_open_* indexes rather than the whole assignment history.
+LOAN_COLUMNS = ("assignment_id", "device_id", "employee_id", "assigned_date", "due_date")
+LOAN_TABLES = ("inventory_assignments", "hardware", "employees")
+LOAN_SELECT = (
+    "SELECT a.assignment_id, a.device_id, a.employee_id, a.assigned_date, a.due_date,"
+    " h.device_name, h.serial_number, e.first_name, e.last_name"
+    " FROM inventory_assignments a"
+    " JOIN hardware h ON h.device_id = a.device_id"
+    " JOIN employees e ON e.employee_id = a.employee_id"
+)
+
+def row_to_loan(row):
+    loan = dict(zip(LOAN_COLUMNS, row[:5]))
+    loan["device_name"], loan["serial_number"] = row[5], row[6]
+    loan["employee_name"] = f"{row[7]} {row[8]}"
+    return loan
+
+# Read an optional ISO date from the JSON body or query string
+def parse_date(value, name, default=None):
+    if value in (None, ""):
+        return default
+    try:
+        return date.fromisoformat(value).isoformat()
+    except (TypeError, ValueError):
+        raise RepositoryError(f"{name} must be a date (YYYY-MM-DD)")
+
+def request_body():
+    data = request.get_json(silent=True)
+    if data is None:
+        return {}
+    if not isinstance(data, dict):
+        raise RepositoryError("Request body must be a JSON object")
+    return data
+
+def parse_int(value, name):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise RepositoryError(f"{name} must be an integer")
+
+# Open loans, keyset-paged by device_id (?employee_id= narrows to one person)
+@loans_bp.route("/", methods=["GET"])
+@cached_response(*LOAN_TABLES)
+def get_open_loans():
+    try:
+        limit = parse_limit()
+        cursor = parse_cursor()
+        employee_id = request.args.get("employee_id")
+        sql = LOAN_SELECT + " WHERE a.return_date IS NULL AND a.device_id > ?"
+        params = [cursor or 0]
+        if employee_id not in (None, ""):
+            sql += " AND a.employee_id = ?"
+            params.append(parse_int(employee_id, "employee_id"))
+        sql += " ORDER BY a.device_id LIMIT ?"
+        params.append(limit + 1)
+        rows = get_db().execute(sql, params).fetchall()
+        next_cursor = rows[limit - 1][1] if len(rows) > limit else None
+        return jsonify({"loans": [row_to_loan(row) for row in rows[:limit]], "next_cursor": next_cursor}), 200
+    except (PaginationError, RepositoryError) as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": f"Failed to fetch loans: {str(e)}"}), 500
+
+# Open loans past their due date (?as_of=, default today), most overdue
+# first. ?cursor= is the "due_date,assignment_id" of the last row returned.
+# Cached per day, so the default moves on at midnight.
+@loans_bp.route("/overdue", methods=["GET"])
+@cached_response(*LOAN_TABLES, vary=current_date)
+def get_overdue_loans():
+    try:
+        limit = parse_limit()
+        as_of = parse_date(request.args.get("as_of"), "as_of", current_date())
+        sql = LOAN_SELECT + " WHERE a.return_date IS NULL AND a.due_date < ?"
+        params = [as_of]
+        cursor = request.args.get("cursor")
+        if cursor:
+            due, _, assignment_id = cursor.partition(",")
+            sql += " AND (a.due_date, a.assignment_id) > (?, ?)"
+            params += [parse_date(due, "cursor"), parse_int(assignment_id, "cursor")]
+        sql += " ORDER BY a.due_date, a.assignment_id LIMIT ?"
+        params.append(limit + 1)
+        rows = get_db().execute(sql, params).fetchall()
+        next_cursor = None
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            next_cursor = f"{last[4]},{last[0]}"
+        return jsonify({"as_of": as_of, "loans": [row_to_loan(row) for row in rows[:limit]], "next_cursor": next_cursor}), 200
+    except (PaginationError, RepositoryError) as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": f"Failed to fetch overdue loans: {str(e)}"}), 500
+
+# Lend a device: {device_id, employee_id, due_date?, assigned_date?}. The
+# device must be active, not queued for removal and not already out.
+@loans_bp.route("/checkout", methods=["POST"])
+def checkout_device():
+    try:
+        data = request_body()
+        device_id = parse_int(data.get("device_id"), "device_id")
+        employee_id = parse_int(data.get("employee_id"), "employee_id")
+        assigned_date = parse_date(data.get("assigned_date"), "assigned_date", date.today().isoformat())
+        due_date = parse_date(data.get("due_date"), "due_date")
+        if due_date is not None and due_date < assigned_date:
+            raise RepositoryError("due_date cannot be before assigned_date")
+
+        with transaction("inventory_assignments", "hardware") as db:
+            device = db.execute(
+                "SELECT status, removal_requested_date FROM hardware WHERE device_id = ?", (device_id,)
+            ).fetchone()
+            if device is None:
+                raise NotFoundError("Hardware not found")
+            if db.execute("SELECT 1 FROM employees WHERE employee_id = ?", (employee_id,)).fetchone() is None:
+                raise NotFoundError("Employee not found")
+            if device[0] != "active" or device[1] is not None:
+                raise ConstraintError("Device is not available for loan")
+            if db.execute(
+                "SELECT 1 FROM inventory_assignments WHERE device_id = ? AND return_date IS NULL", (device_id,)
+            ).fetchone():
+                raise ConstraintError("Device is already on loan")
+            assignment_id = get_backend().insert(
+                db, "inventory_assignments", ["device_id", "employee_id", "assigned_date", "due_date"],
+                [device_id, employee_id, assigned_date, due_date], "assignment_id",
+            )
+            db.execute(
+                "UPDATE hardware SET assignee = ?, row_version = row_version + 1"
+                " WHERE device_id = ?", (employee_id, device_id)
+            )
+        return jsonify({"id": assignment_id, "message": "Device checked out successfully"}), 201
+    except NotFoundError as e:
+        return jsonify({"error": str(e)}), 404
+    except ConstraintError as e:
+        return jsonify({"error": str(e)}), 409
+    except RepositoryError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": f"Failed to check out device: {str(e)}"}), 500
+
+# Close a loan: {return_date?}. The device is unassigned in the same transaction.
+@loans_bp.route("/<int:assignment_id>/return", methods=["POST"])
+def return_device(assignment_id):
+    try:
+        return_date = parse_date(request_body().get("return_date"), "return_date", date.today().isoformat())
+        with transaction("inventory_assignments", "hardware") as db:
+            loan = db.execute(
+                "SELECT device_id, employee_id, assigned_date, return_date FROM inventory_assignments WHERE assignment_id = ?",
+                (assignment_id,),
+            ).fetchone()
+            if loan is None:
+                raise NotFoundError("Loan not found")
+            if loan[3] is not None:
+                raise ConstraintError("Loan has already been returned")
+            if return_date < loan[2]:
+                raise RepositoryError("return_date cannot be before assigned_date")
+            db.execute(
+                "UPDATE inventory_assignments SET return_date = ?, row_version = row_version + 1"
+                " WHERE assignment_id = ?", (return_date, assignment_id)
+            )
+            db.execute(
+                "UPDATE hardware SET assignee = NULL, row_version = row_version + 1"
+                " WHERE device_id = ? AND assignee = ?", (loan[0], loan[1])
+            )
+        return jsonify({"message": "Device returned successfully"}), 200
+    except NotFoundError as e:
+        return jsonify({"error": str(e)}), 404
+    except ConstraintError as e:
+        return jsonify({"error": str(e)}), 409
+    except RepositoryError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": f"Failed to return device: {str(e)}"}), 500
@@ -0,0 +1,46 @@
+from flask import Blueprint, Response, request
+from api.db.backends import get_backend
+from api.utils.auth import check_roles
+from api.utils.cache import response_cache
+from api.utils.metrics import format_labels, request_metrics
+import hmac
+import os
+
+metrics_bp = Blueprint("metrics", __name__, url_prefix="/api/metrics")
+
+# Scrapers have no session; when METRICS_TOKEN is set they may send it as a
+# bearer token instead. Otherwise only admins can read the metrics.
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+METRICS_ROLES = ("admin", "super_admin")
+
+def scraper_authorized():
+    if not METRICS_TOKEN:
+        return False
+    supplied = request.headers.get("Authorization", "")
+    return hmac.compare_digest(supplied.encode(), f"Bearer {METRICS_TOKEN}".encode())
+
+def numeric_gauges(prefix, stats):
+    return {f"{prefix}_{name}": value for name, value in stats.items() if isinstance(value, (int, float))}
+
+# Pool and cache stats as gauges. The read-only pool (DB_READ_ROUTING) gets
+# gauges of its own, with the routing mode as the label of an info metric.
+def current_gauges():
+    stats = get_backend().stats()
+    gauges = numeric_gauges("inventory_db_pool", stats)
+    readers = stats.get("readers")
+    if readers:
+        gauges[f"inventory_db_reader_routing_info{{{format_labels([('routing', readers['routing'])])}}}"] = 1
+        gauges.update(numeric_gauges("inventory_db_reader_pool", readers))
+        gauges.update(numeric_gauges("inventory_db_snapshot", readers.get("snapshot", {})))
+    gauges.update(numeric_gauges("inventory_response_cache", response_cache.stats()))
+    return gauges
+
+# Prometheus text format: per-route latency and DB time histograms, rows,
+# bytes, slow query count, pool and response cache gauges
+@metrics_bp.route("/", methods=["GET"])
+def get_metrics():
+    if not scraper_authorized():
+        denied = check_roles(METRICS_ROLES)
+        if denied is not None:
+            return denied
+    return Response(request_metrics.render(current_gauges()), mimetype="text/plain; version=0.0.4")
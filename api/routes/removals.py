@@ -0,0 +1,126 @@
+from flask import Blueprint, jsonify, request
+from api.db.database import get_db
+from api.db.repository import transaction, RepositoryError, ConstraintError, NotFoundError
+from api.utils.auth import protect_blueprint, require_role, DELETE_ROLES
+from api.utils.pagination import parse_limit, PaginationError
+from api.utils.cache import cached_response
+from api.routes.loans import parse_date, parse_int, request_body
+from datetime import date
+
+removals_bp = Blueprint("removals", __name__, url_prefix="/api/removals")
+protect_blueprint(removals_bp)
+
+# A device is pending removal from the day removal_requested_date is set
+# until it is decommissioned (approve) or the request is withdrawn (DELETE).
+# The queue filter below must match idx_hardware_removal_queue's WHERE clause
+# word for word for the planner to use that partial index.
+QUEUE_FILTER = "removal_requested_date IS NOT NULL AND status <> 'decommissioned'"
+REMOVAL_COLUMNS = ("device_id", "serial_number", "device_name", "device_type", "status", "assignee", "removal_requested_date")
+
+def pending_device(db, device_id):
+    row = db.execute(
+        "SELECT status, removal_requested_date FROM hardware WHERE device_id = ?", (device_id,)
+    ).fetchone()
+    if row is None:
+        raise NotFoundError("Hardware not found")
+    if row[1] is None or row[0] == "decommissioned":
+        raise NotFoundError("No pending removal for this device")
+    return row
+
+# The removal queue, oldest request first. ?cursor= is the
+# "removal_requested_date,device_id" of the last row returned.
+@removals_bp.route("/", methods=["GET"])
+@cached_response("hardware")
+def get_removal_queue():
+    try:
+        limit = parse_limit()
+        sql = f"SELECT {', '.join(REMOVAL_COLUMNS)} FROM hardware WHERE {QUEUE_FILTER}"
+        params = []
+        cursor = request.args.get("cursor")
+        if cursor:
+            requested, _, device_id = cursor.partition(",")
+            sql += " AND (removal_requested_date, device_id) > (?, ?)"
+            params += [parse_date(requested, "cursor"), parse_int(device_id, "cursor")]
+        sql += " ORDER BY removal_requested_date, device_id LIMIT ?"
+        params.append(limit + 1)
+        rows = get_db().execute(sql, params).fetchall()
+        next_cursor = None
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            next_cursor = f"{last[6]},{last[0]}"
+        removals = [dict(zip(REMOVAL_COLUMNS, row)) for row in rows[:limit]]
+        return jsonify({"removals": removals, "next_cursor": next_cursor}), 200
+    except (PaginationError, RepositoryError) as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": f"Failed to fetch removal queue: {str(e)}"}), 500
+
+# Queue a device for removal: {device_id, requested_date?}. Devices out on
+# loan have to be returned first.
+@removals_bp.route("/", methods=["POST"])
+def request_removal():
+    try:
+        data = request_body()
+        device_id = parse_int(data.get("device_id"), "device_id")
+        requested_date = parse_date(data.get("requested_date"), "requested_date", date.today().isoformat())
+        with transaction("hardware") as db:
+            device = db.execute(
+                "SELECT status, removal_requested_date FROM hardware WHERE device_id = ?", (device_id,)
+            ).fetchone()
+            if device is None:
+                raise NotFoundError("Hardware not found")
+            if device[0] == "decommissioned":
+                raise ConstraintError("Device is already decommissioned")
+            if device[1] is not None:
+                raise ConstraintError("Removal has already been requested for this device")
+            if db.execute(
+                "SELECT 1 FROM inventory_assignments WHERE device_id = ? AND return_date IS NULL", (device_id,)
+            ).fetchone():
+                raise ConstraintError("Device is on loan")
+            db.execute(
+                "UPDATE hardware SET removal_requested_date = ?, row_version = row_version + 1"
+                " WHERE device_id = ?", (requested_date, device_id)
+            )
+        return jsonify({"message": "Removal requested successfully"}), 201
+    except NotFoundError as e:
+        return jsonify({"error": str(e)}), 404
+    except ConstraintError as e:
+        return jsonify({"error": str(e)}), 409
+    except RepositoryError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": f"Failed to request removal: {str(e)}"}), 500
+
+# Approve a pending removal: the device is decommissioned and unassigned.
+# Admins only, like a delete
+@removals_bp.route("/<int:device_id>/approve", methods=["POST"])
+@require_role(*DELETE_ROLES)
+def approve_removal(device_id):
+    try:
+        with transaction("hardware") as db:
+            pending_device(db, device_id)
+            db.execute(
+                "UPDATE hardware SET status = 'decommissioned', assignee = NULL, row_version = row_version + 1"
+                " WHERE device_id = ?", (device_id,)
+            )
+        return jsonify({"message": "Device decommissioned successfully"}), 200
+    except NotFoundError as e:
+        return jsonify({"error": str(e)}), 404
+    except Exception as e:
+        return jsonify({"error": f"Failed to approve removal: {str(e)}"}), 500
+
+# Withdraw a pending removal request
+@removals_bp.route("/<int:device_id>", methods=["DELETE"])
+def cancel_removal(device_id):
+    try:
+        with transaction("hardware") as db:
+            pending_device(db, device_id)
+            db.execute(
+                "UPDATE hardware SET removal_requested_date = NULL, row_version = row_version + 1"
+                " WHERE device_id = ?", (device_id,)
+            )
+        return jsonify({"message": "Removal request cancelled successfully"}), 200
+    except NotFoundError as e:
+        return jsonify({"error": str(e)}), 404
+    except Exception as e:
+        return jsonify({"error": f"Failed to cancel removal: {str(e)}"}), 500
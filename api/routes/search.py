@@ -0,0 +1,130 @@
+from flask import Blueprint, jsonify, request
+from api.db.backends import get_backend
+from api.db.database import get_db
+from api.utils.auth import protect_blueprint
+from api.utils.pagination import parse_limit, PaginationError
+from api.utils.cache import cached_response
+import json
+
+search_bp = Blueprint("search", __name__, url_prefix="/api/search")
+protect_blueprint(search_bp)
+
+# Searchable entities: base table, its key and the indexed columns returned
+# with each hit. On SQLite each has an FTS5 index, <table>_fts (migration
+# 0002); on PostgreSQL a GIN index over search_vector(columns)
+# (schema_postgres.sql).
+SEARCH_INDEXES = {
+    "hardware": ("hardware", "device_id", ("device_name", "serial_number", "note")),
+    "software": ("software", "software_id", ("software_name", "software_brand", "license_key")),
+    "employees": ("employees", "employee_id", ("first_name", "last_name", "email")),
+    "data": ("data", "data_id", ("data_name", "storage_location")),
+}
+
+# The trigram tokenizer cannot match anything shorter than three characters
+MIN_TERM_LENGTH = 3
+MAX_OFFSET = 10000
+
+def parse_terms(query):
+    terms = query.split()
+    if not terms:
+        raise PaginationError("q is required")
+    short = [term for term in terms if len(term) < MIN_TERM_LENGTH]
+    if short:
+        raise PaginationError(f"Search terms must be at least {MIN_TERM_LENGTH} characters")
+    return terms
+
+# Quote each term so user input is never parsed as FTS5 query syntax; quoted
+# terms are ANDed together
+def fts5_match(terms):
+    return " ".join('"' + term.replace('"', '""') + '"' for term in terms)
+
+# The same as a tsquery: every term, as a prefix, ANDed together
+def tsquery(terms):
+    return " & ".join("'" + term.replace("\\", "\\\\").replace("'", "''") + "':*" for term in terms)
+
+# The document a PostgreSQL search index covers; the expression has to match
+# the index definition in schema_postgres.sql for the index to be used
+def search_vector(columns):
+    return "to_tsvector('simple', " + " || ' ' || ".join(f"coalesce({column}, '')" for column in columns) + ")"
+
+# bm25() (FTS5) and ts_rank() scores depend on each table's size and term
+# statistics, so they are not comparable across tables. Every branch scales
+# its scores by its own best match: the top hit of each table scores 1.0 and
+# the merged list interleaves tables by how close each hit is to that.
+def sqlite_branch(entity, table, key, columns):
+    fts = f"{table}_fts"
+    fields = ", ".join(f"'{column}', {column}" for column in columns)
+    return (
+        f"SELECT * FROM (SELECT '{entity}' AS entity, rowid AS id,"
+        f" CASE WHEN min(rank) OVER () < 0 THEN rank / min(rank) OVER () ELSE 1.0 END AS score,"
+        f" json_object({fields}) AS fields"
+        f" FROM {fts} WHERE {fts} MATCH ? ORDER BY rank, rowid LIMIT ?) AS {entity}_hits"
+    )
+
+def postgres_branch(entity, table, key, columns):
+    vector = search_vector(columns)
+    fields = ", ".join(f"'{column}', {column}" for column in columns)
+    rank = f"ts_rank({vector}, search_query)"
+    return (
+        f"SELECT * FROM (SELECT '{entity}' AS entity, {key} AS id,"
+        f" coalesce({rank} / nullif(max({rank}) OVER (), 0), 1.0) AS score,"
+        f" json_build_object({fields})::text AS fields"
+        f" FROM {table}, to_tsquery('simple', ?) AS search_query WHERE {vector} @@ search_query"
+        f" ORDER BY score DESC, {key} LIMIT ?) AS {entity}_hits"
+    )
+
+def parse_offset():
+    raw = request.args.get("offset")
+    if raw in (None, ""):
+        return 0
+    try:
+        offset = int(raw)
+    except ValueError:
+        raise PaginationError("offset must be an integer")
+    if offset < 0 or offset > MAX_OFFSET:
+        raise PaginationError(f"offset must be between 0 and {MAX_OFFSET}")
+    return offset
+
+# Ranked search across hardware, software, employees and data: substrings on
+# SQLite, word prefixes on PostgreSQL. ?q= terms, ?types=hardware,software to
+# narrow, ?limit= and ?offset= to page.
+@search_bp.route("/", methods=["GET"])
+@cached_response(*SEARCH_INDEXES)
+def search():
+    try:
+        terms = parse_terms(request.args.get("q", ""))
+        limit = parse_limit(default=20)
+        offset = parse_offset()
+        requested = request.args.get("types")
+        types = [t.strip() for t in requested.split(",") if t.strip()] if requested else list(SEARCH_INDEXES)
+        unknown = [t for t in types if t not in SEARCH_INDEXES]
+        if unknown:
+            return jsonify({"error": f"Unknown search type: {', '.join(unknown)}"}), 400
+
+        if get_backend().name == "sqlite":
+            branch, match = sqlite_branch, fts5_match(terms)
+        else:
+            branch, match = postgres_branch, tsquery(terms)
+        # Each branch returns only its own best offset+limit hits, so the
+        # merge below never sorts more than types * (offset + limit) rows
+        branches, params = [], []
+        for entity in types:
+            branches.append(branch(entity, *SEARCH_INDEXES[entity]))
+            params.extend([match, offset + limit + 1])
+        sql = " UNION ALL ".join(branches) + " ORDER BY score DESC, entity, id LIMIT ? OFFSET ?"
+        params.extend([limit + 1, offset])
+
+        rows = get_db().execute(sql, params).fetchall()
+        has_more = len(rows) > limit
+        results = [
+            {"type": row[0], "id": row[1], "score": round(float(row[2]), 6), "fields": json.loads(row[3])}
+            for row in rows[:limit]
+        ]
+        return jsonify({
+            "results": results,
+            "next_offset": offset + limit if has_more else None,
+        }), 200
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": f"Failed to search: {str(e)}"}), 500
@@ -0,0 +1,97 @@
+from flask import Blueprint, jsonify
+from api.db.database import get_db
+from api.utils.auth import protect_blueprint, require_role, DELETE_ROLES
+from datetime import date, timedelta
+
+stats_bp = Blueprint("stats", __name__, url_prefix="/api/stats")
+protect_blueprint(stats_bp)
+
+# Windows reported for warranties and licences expiring soon, in days
+EXPIRY_WINDOWS = (30, 60, 90)
+
+# Statements that recompute the summary tables from the base tables
+REBUILD_STATEMENTS = (
+    "DELETE FROM stat_counts",
+    "DELETE FROM stat_expiry",
+    "INSERT INTO stat_counts (metric, bucket, count) "
+    "SELECT 'hardware_status', status, COUNT(*) FROM hardware GROUP BY status",
+    "INSERT INTO stat_counts (metric, bucket, count) "
+    "SELECT 'hardware_type', device_type, COUNT(*) FROM hardware GROUP BY device_type",
+    "INSERT INTO stat_counts (metric, bucket, count) "
+    "SELECT 'software_status', status, COUNT(*) FROM software GROUP BY status",
+    "INSERT INTO stat_counts (metric, bucket, count) "
+    "SELECT 'loans', 'open', COUNT(*) FROM inventory_assignments WHERE return_date IS NULL",
+    "INSERT INTO stat_expiry (metric, expiry_date, count) "
+    "SELECT 'warranty', warranty_expiration, COUNT(*) FROM hardware "
+    "WHERE warranty_expiration IS NOT NULL GROUP BY warranty_expiration",
+    "INSERT INTO stat_expiry (metric, expiry_date, count) "
+    "SELECT 'licence', expiration_date, COUNT(*) FROM software "
+    "WHERE expiration_date IS NOT NULL GROUP BY expiration_date",
+)
+
+def rebuild_stats(db):
+    try:
+        for statement in REBUILD_STATEMENTS:
+            db.execute(statement)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+def read_counts(db, metric):
+    rows = db.execute(
+        "SELECT bucket, count FROM stat_counts WHERE metric = ? AND count > 0 ORDER BY bucket", (metric,)
+    ).fetchall()
+    return dict((row[0], row[1]) for row in rows)
+
+# Expired and expiring-within-N-days totals from the per-date expiry counts
+def read_expiry(db, metric, today):
+    cursor = db.execute(
+        "SELECT COALESCE(SUM(count), 0) FROM stat_expiry WHERE metric = ? AND expiry_date <= ?",
+        (metric, today.isoformat()),
+    )
+    summary = {"expired": cursor.fetchone()[0]}
+    for days in EXPIRY_WINDOWS:
+        cursor = db.execute(
+            "SELECT COALESCE(SUM(count), 0) FROM stat_expiry"
+            " WHERE metric = ? AND expiry_date > ? AND expiry_date <= ?",
+            (metric, today.isoformat(), (today + timedelta(days=days)).isoformat()),
+        )
+        summary[f"expiring_{days}"] = cursor.fetchone()[0]
+    return summary
+
+# Dashboard totals, read from the trigger-maintained summary tables
+@stats_bp.route("/", methods=["GET"])
+def get_stats():
+    try:
+        db = get_db()
+        today = date.today()
+        hardware_status = read_counts(db, "hardware_status")
+        software_status = read_counts(db, "software_status")
+        return jsonify({
+            "hardware": {
+                "total": sum(hardware_status.values()),
+                "by_status": hardware_status,
+                "by_device_type": read_counts(db, "hardware_type"),
+                "warranties": read_expiry(db, "warranty", today),
+            },
+            "software": {
+                "total": sum(software_status.values()),
+                "by_status": software_status,
+                "licences": read_expiry(db, "licence", today),
+            },
+            "loans": {"active": read_counts(db, "loans").get("open", 0)},
+            "as_of": today.isoformat(),
+        }), 200
+    except Exception as e:
+        return jsonify({"error": f"Failed to fetch stats: {str(e)}"}), 500
+
+# Recompute the summary tables from scratch
+@stats_bp.route("/rebuild", methods=["POST"])
+@require_role(*DELETE_ROLES)
+def rebuild():
+    try:
+        rebuild_stats(get_db())
+        return jsonify({"message": "Stats rebuilt successfully"}), 200
+    except Exception as e:
+        return jsonify({"error": f"Failed to rebuild stats: {str(e)}"}), 500
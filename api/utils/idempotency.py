@@ -0,0 +1,172 @@
+# Safe retries for writes. A POST, PUT, PATCH or DELETE sent with an
+# Idempotency-Key header runs at most once per user and key: its status and
+# body are stored in idempotency_keys (migration 0010), and a retry with the
+# same key gets them back, marked "Idempotent-Replayed: true", without the
+# handler running again.
+#
+#   - a retry while the first request is still running gets 409
+#   - the same key with another method, URL or body gets 422
+#   - 5xx responses are not stored, so the request can simply be retried
+#
+# Entries expire after IDEMPOTENCY_TTL seconds and at most
+# IDEMPOTENCY_MAX_KEYS are kept, both enforced as responses are stored. A
+# request that died before storing its response holds its key for
+# IDEMPOTENCY_LOCK_TIMEOUT seconds; after that a retry runs it again.
+#
+# The fingerprint behind the 422 is a hash of the method, URL and body.
+# Streamed imports (NDJSON, CSV) are hashed as the handler reads them and the
+# hash is stored with the response; a retry of one reads its whole body to
+# compare, which is safe because a retry is never run.
+from flask import Response, g, jsonify, request, session
+from api.db.backends import get_backend
+from api.db.database import get_db
+from api.utils.bulk import STREAMED_TYPES
+import hashlib
+import io
+import os
+import time
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+IDEMPOTENCY_TTL = int(os.getenv("IDEMPOTENCY_TTL", 24 * 60 * 60))
+IDEMPOTENCY_MAX_KEYS = int(os.getenv("IDEMPOTENCY_MAX_KEYS", 100000))
+IDEMPOTENCY_LOCK_TIMEOUT = int(os.getenv("IDEMPOTENCY_LOCK_TIMEOUT", 60))
+MAX_KEY_LENGTH = 255
+
+IDEMPOTENT_METHODS = ("POST", "PUT", "PATCH", "DELETE")
+
+# Fingerprint of a streamed import still being read
+PENDING_FINGERPRINT = ""
+
+def fingerprint_digest():
+    return hashlib.sha256(f"{request.method} {request.full_path}\n".encode())
+
+# Hash of what the key stands for; reads the whole body
+def fingerprint():
+    digest = fingerprint_digest()
+    digest.update(request.get_data(cache=True))
+    return digest.hexdigest()
+
+def streamed_body():
+    return (request.mimetype or "").lower() in STREAMED_TYPES
+
+# The WSGI input of a streamed import, hashing every byte the handler reads
+class HashingStream(io.RawIOBase):
+    def __init__(self, stream, digest):
+        self.stream = stream
+        self.digest = digest
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self.stream.read(len(buffer))
+        self.digest.update(data)
+        buffer[:len(data)] = data
+        return len(data)
+
+def replay(status, mimetype, body):
+    response = Response(bytes(body or b""), status=status, mimetype=mimetype)
+    response.headers[REPLAYED_HEADER] = "true"
+    return response
+
+# Take `key` for this request: (entry_id, None) when the handler should run,
+# or (None, response) to answer with instead. The body of a streamed import
+# is only read once the answer is known to come from the stored entry.
+def claim(db, user_id, key, streamed):
+    backend = get_backend()
+    request_fingerprint = PENDING_FINGERPRINT if streamed else fingerprint()
+    now = int(time.time())
+    # A second pass after removing an expired or abandoned entry
+    for _ in range(2):
+        try:
+            entry_id = backend.insert(
+                db, "idempotency_keys", ["user_id", "idempotency_key", "fingerprint", "created_at"],
+                [user_id, key, request_fingerprint, now], "entry_id",
+            )
+            db.commit()
+            return entry_id, None
+        except backend.integrity_errors:
+            db.rollback()
+        row = db.execute(
+            "SELECT entry_id, fingerprint, status, mimetype, body, created_at FROM idempotency_keys"
+            " WHERE user_id = ? AND idempotency_key = ?",
+            (user_id, key),
+        ).fetchone()
+        if row is None:
+            continue
+        entry_id, stored_fingerprint, status, mimetype, body, created_at = row
+        if created_at < now - IDEMPOTENCY_TTL or (status is None and created_at < now - IDEMPOTENCY_LOCK_TIMEOUT):
+            db.execute("DELETE FROM idempotency_keys WHERE entry_id = ?", (entry_id,))
+            db.commit()
+            continue
+        if status is None:
+            break
+        if stored_fingerprint != (fingerprint() if streamed else request_fingerprint):
+            return None, (jsonify({"error": f"{IDEMPOTENCY_HEADER} was already used for a different request"}), 422)
+        return None, replay(status, mimetype, body)
+    return None, (jsonify({"error": f"A request with this {IDEMPOTENCY_HEADER} is still in progress"}), 409)
+
+# Drop expired entries and all but the newest IDEMPOTENCY_MAX_KEYS; both are
+# ranges of an index
+def prune(db, now):
+    db.execute("DELETE FROM idempotency_keys WHERE created_at < ?", (now - IDEMPOTENCY_TTL,))
+    db.execute(
+        "DELETE FROM idempotency_keys WHERE entry_id <= (SELECT max(entry_id) FROM idempotency_keys) - ?",
+        (IDEMPOTENCY_MAX_KEYS,),
+    )
+
+def begin_idempotent_request():
+    key = request.headers.get(IDEMPOTENCY_HEADER)
+    if key is None or request.method not in IDEMPOTENT_METHODS:
+        return None
+    user_id = session.get("user_id")
+    if user_id is None:
+        # Left to the blueprint to turn away
+        return None
+    if not key or len(key) > MAX_KEY_LENGTH:
+        return jsonify({"error": f"{IDEMPOTENCY_HEADER} must be 1 to {MAX_KEY_LENGTH} characters"}), 400
+    streamed = streamed_body()
+    entry_id, response = claim(get_db(), user_id, key, streamed)
+    if entry_id is not None:
+        g.idempotency_entry = entry_id
+        if streamed:
+            # request.stream is built from wsgi.input on first use, which
+            # is still to come
+            g.idempotency_digest = fingerprint_digest()
+            request.environ["wsgi.input"] = HashingStream(request.environ["wsgi.input"], g.idempotency_digest)
+    return response
+
+# Store the response under the request's key, or give the key up if the
+# request failed on the server's side. Runs before compression, so the body
+# is stored as the handler produced it.
+def finish_idempotent_request(response):
+    entry_id = g.pop("idempotency_entry", None)
+    digest = g.pop("idempotency_digest", None)
+    if entry_id is None:
+        return response
+    db = get_db()
+    # Nothing a handler left uncommitted goes in with the entry
+    db.rollback()
+    if response.status_code >= 500 or response.is_streamed:
+        db.execute("DELETE FROM idempotency_keys WHERE entry_id = ?", (entry_id,))
+    else:
+        streamed_fingerprint = None
+        if digest is not None:
+            # Hash whatever the handler left unread
+            while request.stream.read(64 * 1024):
+                pass
+            streamed_fingerprint = digest.hexdigest()
+        db.execute(
+            "UPDATE idempotency_keys SET fingerprint = coalesce(?, fingerprint), status = ?, mimetype = ?, body = ?"
+            " WHERE entry_id = ?",
+            (streamed_fingerprint, response.status_code, response.mimetype, response.get_data(), entry_id),
+        )
+        prune(db, int(time.time()))
+    db.commit()
+    return response
+
+# Register after init_compression: after_request functions run in reverse order
+def init_idempotency(app):
+    app.before_request(begin_idempotent_request)
+    app.after_request(finish_idempotent_request)
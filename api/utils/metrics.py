@@ -0,0 +1,194 @@
+from flask import Response, g, request, session
+from api.db.instrument import QueryStats, slow_query_count
+from api.utils.auth import get_user_role
+import cProfile
+import io
+import os
+import pstats
+import threading
+import time
+
+# Upper bounds, in seconds, of the request and DB time histogram buckets
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Roles that may ask for ?profile=1, and how many functions the dump lists
+PROFILE_ROLES = ("admin", "super_admin")
+PROFILE_LINES = int(os.getenv("PROFILE_LINES", 40))
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+                break
+
+    # Cumulative (le, count) pairs ending with +Inf, as Prometheus expects
+    def cumulative(self):
+        running = 0
+        for bound, count in zip(self.buckets, self.counts):
+            running += count
+            yield repr(bound), running
+        yield "+Inf", self.count
+
+def escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def format_labels(labels):
+    return ",".join(f'{name}="{escape_label(value)}"' for name, value in labels)
+
+# Per-route request counts, latency and DB histograms, rows and bytes.
+# Routes are labelled by their URL rule, so /api/hardware/<int:hardware_id>
+# is one series however many ids are requested.
+class RequestMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._requests = {}
+        self._latency = {}
+        self._db_time = {}
+        self._totals = {}
+
+    def record(self, method, route, status, seconds, query_stats, response_bytes):
+        key = (method, route)
+        with self._lock:
+            self._requests[key + (status,)] = self._requests.get(key + (status,), 0) + 1
+            self._latency.setdefault(key, Histogram()).observe(seconds)
+            totals = self._totals.setdefault(key, {"db_queries": 0, "db_statements": 0, "db_rows": 0, "response_bytes": 0})
+            totals["response_bytes"] += response_bytes
+            if query_stats is not None:
+                self._db_time.setdefault(key, Histogram()).observe(query_stats.seconds)
+                totals["db_queries"] += query_stats.queries
+                totals["db_statements"] += query_stats.statements
+                totals["db_rows"] += query_stats.rows
+
+    # Prometheus text exposition format; `gauges` are extra {name: value} readings
+    def render(self, gauges=None):
+        lines = []
+        with self._lock:
+            lines += [
+                "# HELP inventory_http_requests_total Requests handled, by route and status.",
+                "# TYPE inventory_http_requests_total counter",
+            ]
+            for (method, route, status), count in sorted(self._requests.items()):
+                lines.append(f"inventory_http_requests_total{{{format_labels([('method', method), ('route', route), ('status', status)])}}} {count}")
+            for name, help_text, series in (
+                ("inventory_http_request_duration_seconds", "Time from request start until the response body was sent.", self._latency),
+                ("inventory_db_duration_seconds", "Time spent in database calls per request.", self._db_time),
+            ):
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+                for (method, route), histogram in sorted(series.items()):
+                    labels = [("method", method), ("route", route)]
+                    for bound, count in histogram.cumulative():
+                        lines.append(f"{name}_bucket{{{format_labels(labels + [('le', bound)])}}} {count}")
+                    lines.append(f"{name}_sum{{{format_labels(labels)}}} {histogram.sum:.6f}")
+                    lines.append(f"{name}_count{{{format_labels(labels)}}} {histogram.count}")
+            for total, help_text in (
+                ("db_queries", "Statements issued by handlers."),
+                ("db_statements", "Statements SQLite ran, including trigger bodies and transaction control."),
+                ("db_rows", "Rows fetched from the database."),
+                ("response_bytes", "Response body bytes sent."),
+            ):
+                name = f"inventory_{total}_total"
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+                for (method, route), totals in sorted(self._totals.items()):
+                    lines.append(f"{name}{{{format_labels([('method', method), ('route', route)])}}} {totals[total]}")
+        lines += [
+            "# HELP inventory_slow_queries_total Statements slower than SLOW_QUERY_MS.",
+            "# TYPE inventory_slow_queries_total counter",
+            f"inventory_slow_queries_total {slow_query_count()}",
+        ]
+        # A gauge name may carry labels: name{label="value"}
+        for name, value in sorted((gauges or {}).items()):
+            lines += [f"# TYPE {name.partition('{')[0]} gauge", f"{name} {value}"]
+        return "\n".join(lines) + "\n"
+
+request_metrics = RequestMetrics()
+
+# Response body that counts bytes as the server sends them and records the
+# request once it has been closed, i.e. after streaming and teardown
+class MeteredBody:
+    def __init__(self, body, on_close):
+        self.body = body
+        self.on_close = on_close
+        self.sent = 0
+
+    def __iter__(self):
+        for chunk in self.body:
+            self.sent += len(chunk)
+            yield chunk
+
+    def close(self):
+        try:
+            if hasattr(self.body, "close"):
+                self.body.close()
+        finally:
+            self.on_close(self.sent)
+
+# WSGI half of the middleware: timing and byte counts around the whole
+# response. The Flask hooks below fill in the route and DB stats.
+class MetricsMiddleware:
+    def __init__(self, wsgi_app, metrics=request_metrics):
+        self.wsgi_app = wsgi_app
+        self.metrics = metrics
+
+    def __call__(self, environ, start_response):
+        started = time.perf_counter()
+        status = []
+
+        def metered_start_response(status_line, headers, exc_info=None):
+            status[:] = [status_line.split(" ", 1)[0]]
+            return start_response(status_line, headers, exc_info)
+
+        def record(sent):
+            self.metrics.record(
+                environ["REQUEST_METHOD"],
+                environ.get("metrics.route", "unmatched"),
+                status[0] if status else "500",
+                time.perf_counter() - started,
+                environ.get("metrics.query_stats"),
+                sent,
+            )
+
+        return MeteredBody(self.wsgi_app(environ, metered_start_response), record)
+
+def profiling_allowed():
+    return request.args.get("profile") == "1" and get_user_role(session.get("user_id")) in PROFILE_ROLES
+
+def profile_response(profiler, response):
+    output = io.StringIO()
+    stats = pstats.Stats(profiler, stream=output)
+    stats.sort_stats("cumulative").print_stats(PROFILE_LINES)
+    profiled = Response(output.getvalue(), mimetype="text/plain")
+    profiled.headers["X-Profiled-Status"] = str(response.status_code)
+    return profiled
+
+# Install the middleware on `app`. ?profile=1 from an admin runs the request
+# under cProfile and replaces the response with the top functions by
+# cumulative time (for streamed responses, only the part before streaming).
+def init_metrics(app):
+    app.wsgi_app = MetricsMiddleware(app.wsgi_app)
+
+    @app.before_request
+    def start_request_metrics():
+        g.query_stats = QueryStats()
+        request.environ["metrics.query_stats"] = g.query_stats
+        if request.url_rule is not None:
+            request.environ["metrics.route"] = request.url_rule.rule
+        if profiling_allowed():
+            g.profiler = cProfile.Profile()
+            g.profiler.enable()
+
+    @app.after_request
+    def finish_request_metrics(response):
+        profiler = g.pop("profiler", None)
+        if profiler is not None:
+            profiler.disable()
+            return profile_response(profiler, response)
+        return response
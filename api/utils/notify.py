@@ -0,0 +1,65 @@
+# Where expiry alerts are sent. ALERT_SINKS lists sinks as "kind:target",
+# separated by commas:
+#
+#   file:/var/log/inventory-alerts.ndjson   append one JSON line per alert
+#   webhook:https://hooks.example.com/x     POST {"alerts": [...]} as JSON
+#
+# Other kinds can be added with register_sink(). A sink that raises keeps
+# its alerts queued, and they are sent again on the next run.
+from api.utils.encoding import dumps
+import os
+import threading
+import urllib.request
+
+ALERT_SINKS = os.getenv("ALERT_SINKS", "")
+ALERT_WEBHOOK_TIMEOUT = float(os.getenv("ALERT_WEBHOOK_TIMEOUT", 10))
+
+class SinkError(ValueError):
+    pass
+
+class FileSink:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def send(self, alerts):
+        with self._lock, open(self.path, "ab") as f:
+            f.write(b"".join(dumps(alert) + b"\n" for alert in alerts))
+
+class WebhookSink:
+    def __init__(self, url, timeout=ALERT_WEBHOOK_TIMEOUT):
+        self.url = url
+        self.timeout = timeout
+
+    def send(self, alerts):
+        request = urllib.request.Request(
+            self.url,
+            data=dumps({"alerts": alerts}),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        # Anything other than a 2xx raises HTTPError
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+SINK_TYPES = {
+    "file": FileSink,
+    "webhook": WebhookSink,
+}
+
+# Add a sink kind; `factory(target)` returns an object with send(alerts)
+def register_sink(kind, factory):
+    SINK_TYPES[kind] = factory
+
+def parse_sinks(spec=None):
+    spec = ALERT_SINKS if spec is None else spec
+    sinks = []
+    for entry in spec.split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        kind, _, target = entry.partition(":")
+        if kind not in SINK_TYPES or not target:
+            raise SinkError(f"Unknown alert sink: {entry}")
+        sinks.append(SINK_TYPES[kind](target))
+    return sinks
@@ -0,0 +1,71 @@
+from flask import request
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+LIST_FORMATS = ("json", "columnar")
+
+class PaginationError(ValueError):
+    pass
+
+# Read ?limit= and clamp it to MAX_PAGE_SIZE
+def parse_limit(default=DEFAULT_PAGE_SIZE):
+    raw = request.args.get("limit")
+    if raw is None:
+        return default
+    try:
+        limit = int(raw)
+    except ValueError:
+        raise PaginationError("limit must be an integer")
+    if limit < 1:
+        raise PaginationError("limit must be at least 1")
+    return min(limit, MAX_PAGE_SIZE)
+
+# Read ?cursor=, the last key of the previous page
+def parse_cursor():
+    raw = request.args.get("cursor")
+    if raw in (None, ""):
+        return None
+    try:
+        return int(raw)
+    except ValueError:
+        raise PaginationError("cursor must be an integer")
+
+# Read ?fields=a,b,c and check every name against the table's columns
+def parse_fields(columns):
+    raw = request.args.get("fields")
+    if not raw:
+        return list(columns)
+    fields = []
+    for name in raw.split(","):
+        name = name.strip()
+        if not name:
+            continue
+        if name not in columns:
+            raise PaginationError(f"Unknown field: {name}")
+        if name not in fields:
+            fields.append(name)
+    if not fields:
+        raise PaginationError("fields must name at least one column")
+    return fields
+
+# Read ?format=: "json" (rows as objects, the default) or "columnar" (column
+# names once, then rows as arrays; about half the bytes of a large page)
+def parse_format():
+    value = request.args.get("format") or "json"
+    if value not in LIST_FORMATS:
+        raise PaginationError(f"format must be one of: {', '.join(LIST_FORMATS)}")
+    return value
+
+# Return one keyset page of a repository's table as {collection: [...], "next_cursor": ...},
+# or {"columns": [...], "rows": [[...]], "next_cursor": ...} with ?format=columnar.
+# Rows are read in key order starting after ?cursor=, so each page is an index
+# range scan on the integer key no matter how deep into the table it is.
+def list_page(repository, collection):
+    limit = parse_limit()
+    cursor = parse_cursor()
+    fields = parse_fields(repository.columns())
+    if parse_format() == "columnar":
+        rows, next_cursor = repository.list_rows(limit, cursor, fields)
+        return {"columns": fields, "rows": rows, "next_cursor": next_cursor}
+    items, next_cursor = repository.list_page(limit, cursor, fields)
+    return {collection: items, "next_cursor": next_cursor}
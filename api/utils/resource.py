@@ -0,0 +1,240 @@
+from flask import Blueprint, Response, jsonify, request
+from api.db.backends import get_backend
+from api.db.database import get_db
+from api.db.repository import RepositoryError, ConstraintError, PreconditionFailed, ROW_VERSION
+from api.utils.auth import protect_blueprint
+from api.utils.bulk import bulk_insert, BulkImportError
+from api.utils.cache import cached_response, get_table_versions
+from api.utils.encoding import encode_response
+from api.utils.pagination import list_page, PaginationError
+
+# Repositories behind resource blueprints, prepared at startup
+RESOURCES = []
+
+# Largest ids list one batch update or delete accepts
+MAX_BATCH_IDS = 10000
+# Rows shown by a dry run
+BATCH_PREVIEW_ROWS = 100
+
+SCALARS = (str, int, float, bool)
+
+# Read every resource table's columns and build its statements before the
+# first request. Tables that are missing (DB_AUTO_MIGRATE=false on an old
+# database) are read on first use instead.
+def prepare_resources():
+    backend = get_backend()
+    db = backend.acquire()
+    try:
+        for repository in RESOURCES:
+            repository.prepare(db)
+    except backend.database_errors:
+        pass
+    finally:
+        backend.release(db)
+
+# (ids, filters, dry_run) from a batch body: {"ids": [...], "filter":
+# {column: value}, "dry_run": true}. ?dry_run=true works too.
+def batch_request(body):
+    if not isinstance(body, dict):
+        raise RepositoryError("Request body must be a JSON object")
+    ids = body.get("ids")
+    if ids is not None:
+        if not isinstance(ids, list) or not ids:
+            raise RepositoryError("ids must be a non-empty list of IDs")
+        if len(ids) > MAX_BATCH_IDS:
+            raise RepositoryError(f"ids can hold at most {MAX_BATCH_IDS} IDs")
+        if not all(isinstance(value, int) and not isinstance(value, bool) for value in ids):
+            raise RepositoryError("ids must only contain integer IDs")
+        ids = sorted(set(ids))
+    filters = body.get("filter")
+    if filters is not None:
+        if not isinstance(filters, dict):
+            raise RepositoryError("filter must be an object of column: value")
+        for name, value in filters.items():
+            values = value if isinstance(value, list) else [value]
+            if not all(item is None or isinstance(item, SCALARS) for item in values):
+                raise RepositoryError(f"Filter on {name} must be a value or a list of values")
+    dry_run = body.get("dry_run")
+    if dry_run is None:
+        dry_run = request.args.get("dry_run", "").lower() in ("1", "true")
+    elif not isinstance(dry_run, bool):
+        raise RepositoryError("dry_run must be true or false")
+    return ids, filters, dry_run
+
+# ETag of one row: "<table>-<key>-<row_version>", then the table's write
+# version so a row changed by a cascade (an assignee set to NULL when the
+# employee is deleted) is never answered with a 304
+def row_etag(table, key, row, db):
+    return f"{table}-{key}-{row.get(ROW_VERSION, 0)}.{get_table_versions(db, (table,))[0]}"
+
+# The row_version an If-Match header asks for: None without the header or
+# for "*" (the row only has to exist). A tag naming another row can never
+# match and fails the write with 412.
+def if_match_version(table, key):
+    if_match = request.if_match
+    if not if_match or if_match.star_tag:
+        return None
+    tags = if_match.as_set(include_weak=True)
+    if len(tags) != 1:
+        raise RepositoryError("If-Match must name one ETag")
+    row_tag, _, _ = tags.pop().partition(".")
+    prefix = f"{table}-{key}-"
+    version = row_tag[len(prefix):]
+    if not row_tag.startswith(prefix) or not version.isdigit():
+        raise PreconditionFailed("If-Match does not name a version of this row")
+    return int(version)
+
+# 412 with the version the row is at, so the client can re-read it
+def precondition_failed(e, title):
+    return jsonify({
+        "error": f"{title} has changed since it was read: {str(e)}",
+        ROW_VERSION: e.current_version,
+    }), 412
+
+def batch_result(keys, changed, preview, ids, dry_run, verb):
+    result = {"matched": len(keys), verb: changed, "dry_run": dry_run}
+    if ids is not None:
+        found = set(keys)
+        result["missing"] = [value for value in ids if value not in found]
+    if dry_run:
+        result["preview"] = preview
+    return result
+
+# Blueprint with the standard handlers for one table:
+#   GET    /            keyset page of rows as {collection: [...], next_cursor}
+#                       (?format=columnar: {columns, rows: [[...]], next_cursor})
+#   GET    /<key>       one row as {item: {...}}, with its ETag
+#   POST   /            insert, returns {id}
+#   POST   /bulk        bulk import (JSON array, NDJSON or CSV)
+#   PUT    /<key>       update the given fields (PATCH too)
+#   DELETE /<key>       delete
+#   PATCH  /            set fields on every row matched by ids and/or a filter
+#   DELETE /            delete every row matched by ids and/or a filter
+# Batches run as one statement in one transaction; "dry_run" reports what
+# would change without writing. PUT, PATCH and DELETE of one row honour
+# If-Match with the row's ETag: the write fails with 412 if the row has been
+# written since it was read.
+# `noun` and `plural` name the resource in messages ("Failed to fetch
+# <plural>"), `title` starts a sentence ("<title> not found").
+def resource_blueprint(name, repository, url_prefix, item, noun, plural=None, title=None):
+    plural = plural or noun
+    title = title or noun[0].upper() + noun[1:]
+    collection = repository.table
+    bp = Blueprint(name, __name__, url_prefix=url_prefix)
+    protect_blueprint(bp)
+    RESOURCES.append(repository)
+
+    @bp.route("/", methods=["GET"], endpoint="list")
+    @cached_response(repository.table)
+    def list_rows():
+        try:
+            return encode_response(list_page(repository, collection))
+        except PaginationError as e:
+            return jsonify({"error": str(e)}), 400
+        except Exception as e:
+            return jsonify({"error": f"Failed to fetch {plural}: {str(e)}"}), 500
+
+    @bp.route("/<int:key>", methods=["GET"], endpoint="get")
+    def get_row(key):
+        try:
+            row = repository.get(key)
+            if row is None:
+                return jsonify({"error": f"{title} not found"}), 404
+            etag = row_etag(repository.table, key, row, get_db())
+            if request.if_none_match.contains_weak(etag):
+                response = Response(status=304)
+            else:
+                response = encode_response({item: row})
+                response.headers["Cache-Control"] = "no-cache"
+            response.set_etag(etag, weak=True)
+            return response
+        except Exception as e:
+            return jsonify({"error": f"Failed to fetch {noun}: {str(e)}"}), 500
+
+    @bp.route("/", methods=["POST"], endpoint="create")
+    def create_row():
+        try:
+            new_id = repository.insert(request.get_json(silent=True))
+            return jsonify({"id": new_id, "message": f"{title} created successfully"}), 201
+        except ConstraintError as e:
+            return jsonify({"error": f"Failed to create {noun}: {str(e)}"}), 409
+        except RepositoryError as e:
+            return jsonify({"error": str(e)}), 400
+        except Exception as e:
+            return jsonify({"error": f"Failed to create {noun}: {str(e)}"}), 500
+
+    @bp.route("/bulk", methods=["POST"], endpoint="bulk_create")
+    def bulk_create_rows():
+        try:
+            result, status = bulk_insert(repository.table)
+            return jsonify(result), status
+        except BulkImportError as e:
+            return jsonify({"error": str(e)}), 400
+        except Exception as e:
+            return jsonify({"error": f"Failed to import {plural}: {str(e)}"}), 500
+
+    @bp.route("/<int:key>", methods=["PUT", "PATCH"], endpoint="update")
+    def update_row(key):
+        try:
+            row_version = repository.update(
+                key, request.get_json(silent=True), if_match_version(repository.table, key)
+            )
+            if row_version is None:
+                return jsonify({"error": f"{title} not found"}), 404
+            response = jsonify({"message": f"{title} updated successfully", ROW_VERSION: row_version})
+            response.set_etag(row_etag(repository.table, key, {ROW_VERSION: row_version}, get_db()), weak=True)
+            return response, 200
+        except PreconditionFailed as e:
+            return precondition_failed(e, title)
+        except ConstraintError as e:
+            return jsonify({"error": f"Failed to update {noun}: {str(e)}"}), 409
+        except RepositoryError as e:
+            return jsonify({"error": str(e)}), 400
+        except Exception as e:
+            return jsonify({"error": f"Failed to update {noun}: {str(e)}"}), 500
+
+    @bp.route("/<int:key>", methods=["DELETE"], endpoint="delete")
+    def delete_row(key):
+        try:
+            if repository.delete(key, if_match_version(repository.table, key)) == 0:
+                return jsonify({"error": f"{title} not found"}), 404
+            return jsonify({"message": f"{title} deleted successfully"}), 200
+        except PreconditionFailed as e:
+            return precondition_failed(e, title)
+        except ConstraintError as e:
+            return jsonify({"error": f"Failed to delete {noun}: {str(e)}"}), 409
+        except RepositoryError as e:
+            return jsonify({"error": str(e)}), 400
+        except Exception as e:
+            return jsonify({"error": f"Failed to delete {noun}: {str(e)}"}), 500
+
+    @bp.route("/", methods=["PATCH"], endpoint="batch_update")
+    def batch_update_rows():
+        try:
+            body = request.get_json(silent=True)
+            ids, filters, dry_run = batch_request(body)
+            keys, updated, preview = repository.update_batch(
+                body.get("set"), ids, filters, dry_run, BATCH_PREVIEW_ROWS
+            )
+            return jsonify(batch_result(keys, updated, preview, ids, dry_run, "updated")), 200
+        except ConstraintError as e:
+            return jsonify({"error": f"Failed to update {plural}: {str(e)}"}), 409
+        except RepositoryError as e:
+            return jsonify({"error": str(e)}), 400
+        except Exception as e:
+            return jsonify({"error": f"Failed to update {plural}: {str(e)}"}), 500
+
+    @bp.route("/", methods=["DELETE"], endpoint="batch_delete")
+    def batch_delete_rows():
+        try:
+            ids, filters, dry_run = batch_request(request.get_json(silent=True))
+            keys, deleted, preview = repository.delete_batch(ids, filters, dry_run, BATCH_PREVIEW_ROWS)
+            return jsonify(batch_result(keys, deleted, preview, ids, dry_run, "deleted")), 200
+        except ConstraintError as e:
+            return jsonify({"error": f"Failed to delete {plural}: {str(e)}"}), 409
+        except RepositoryError as e:
+            return jsonify({"error": str(e)}), 400
+        except Exception as e:
+            return jsonify({"error": f"Failed to delete {plural}: {str(e)}"}), 500
+
+    return bp
@@ -1,7 +1,72 @@
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
 from werkzeug.security import generate_password_hash, check_password_hash
+import multiprocessing
+import os
+import threading
+
+# Hashing parameters for new hashes. Stored hashes made with anything else
+# are re-hashed with these the next time their owner logs in.
+PASSWORD_METHOD = os.getenv("PASSWORD_METHOD", "scrypt:32768:8:1")
+
+# scrypt runs in worker processes so it never holds a request thread's GIL.
+# At most HASH_QUEUE_LIMIT hashes may be running or queued at once; beyond
+# that callers get HashQueueFull immediately instead of waiting, and a hash
+# not done within HASH_TIMEOUT seconds raises HashTimeout.
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", os.cpu_count() or 2))
+HASH_QUEUE_LIMIT = int(os.getenv("HASH_QUEUE_LIMIT", HASH_WORKERS * 4))
+HASH_TIMEOUT = float(os.getenv("HASH_TIMEOUT", 10))
+
+# The hash pool cannot take the work now; worth retrying shortly
+class HashingUnavailable(RuntimeError):
+    pass
+
+class HashQueueFull(HashingUnavailable):
+    pass
+
+class HashTimeout(HashingUnavailable):
+    pass
+
+_executor = None
+_executor_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(HASH_QUEUE_LIMIT)
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                methods = multiprocessing.get_all_start_methods()
+                context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+                _executor = ProcessPoolExecutor(max_workers=HASH_WORKERS, mp_context=context)
+    return _executor
+
+def _run(fn, *args):
+    if not _slots.acquire(blocking=False):
+        raise HashQueueFull("Too many password hashes in progress")
+    try:
+        future = _get_executor().submit(fn, *args)
+    except Exception:
+        _slots.release()
+        raise
+    future.add_done_callback(lambda _: _slots.release())
+    try:
+        return future.result(timeout=HASH_TIMEOUT)
+    except FutureTimeout:
+        # The hash keeps its slot until it finishes
+        raise HashTimeout(f"Password hash not done after {HASH_TIMEOUT}s")
+
+def shutdown_hashing():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
 
 def hash_password(password: str) -> str:
-    return generate_password_hash(password)
+    return _run(generate_password_hash, password, PASSWORD_METHOD)
 
 def verify_password(hashed_password: str, password: str) -> bool:
-    return check_password_hash(hashed_password, password)
\ No newline at end of file
+    return _run(check_password_hash, hashed_password, password)
+
+def needs_rehash(hashed_password: str) -> bool:
+    return not hashed_password.startswith(PASSWORD_METHOD + "$")
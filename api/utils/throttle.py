@@ -0,0 +1,56 @@
+from collections import OrderedDict, deque
+import os
+import threading
+import time
+
+# Failed logins allowed per username, and failed logins plus registrations
+# allowed per client IP, within LOGIN_WINDOW seconds
+LOGIN_WINDOW = float(os.getenv("LOGIN_WINDOW", 60))
+LOGIN_MAX_PER_USERNAME = int(os.getenv("LOGIN_MAX_PER_USERNAME", 5))
+LOGIN_MAX_PER_IP = int(os.getenv("LOGIN_MAX_PER_IP", 30))
+# Keys tracked at once; the least recently seen are forgotten first
+THROTTLE_MAX_KEYS = int(os.getenv("THROTTLE_MAX_KEYS", 100000))
+
+# Sliding-window attempt counter per key (a username or an IP address)
+class AttemptThrottle:
+    def __init__(self, limit, window=LOGIN_WINDOW, max_keys=THROTTLE_MAX_KEYS):
+        self.limit = limit
+        self.window = window
+        self.max_keys = max_keys
+        self._attempts = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _prune(self, key, now):
+        attempts = self._attempts.get(key)
+        if attempts is None:
+            return None
+        while attempts and attempts[0] <= now - self.window:
+            attempts.popleft()
+        return attempts
+
+    # Seconds until `key` may try again, or 0 if it is under the limit
+    def retry_after(self, key):
+        now = time.monotonic()
+        with self._lock:
+            attempts = self._prune(key, now)
+            if not attempts or len(attempts) < self.limit:
+                return 0
+            return attempts[0] + self.window - now
+
+    def record(self, key):
+        now = time.monotonic()
+        with self._lock:
+            attempts = self._prune(key, now)
+            if attempts is None:
+                attempts = self._attempts[key] = deque()
+            attempts.append(now)
+            self._attempts.move_to_end(key)
+            while len(self._attempts) > self.max_keys:
+                self._attempts.popitem(last=False)
+
+    def reset(self, key):
+        with self._lock:
+            self._attempts.pop(key, None)
+
+username_throttle = AttemptThrottle(LOGIN_MAX_PER_USERNAME)
+ip_throttle = AttemptThrottle(LOGIN_MAX_PER_IP)
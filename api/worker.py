@@ -0,0 +1,31 @@
+# Background jobs in a process of their own, beside the web app:
+#
+#   python -m api.worker          run the alert scheduler until interrupted
+#   python -m api.worker --once   one alert run, then exit (for cron)
+#
+# The web processes never scan on their own (POST /api/alerts/run aside), so
+# run one of these, or the --once form from cron. Running several is safe,
+# just redundant: each run takes the write lock and alerts are claimed
+# before they are sent.
+from api.db.alerts import AlertScheduler
+from api.db.backends import get_backend
+import os
+import signal
+import sys
+
+if __name__ == "__main__":
+    if os.getenv("DB_AUTO_MIGRATE", "true").lower() == "true":
+        get_backend().upgrade()
+    scheduler = AlertScheduler()
+    if "--once" in sys.argv[1:]:
+        result, sent = scheduler.tick()
+        if scheduler.last_error:
+            print(f"Alert run failed: {scheduler.last_error}")
+            sys.exit(1)
+        print(f"Raised {result['raised']} alerts, sent {sent}" if result else f"No alert scan due, sent {sent}")
+    else:
+        signal.signal(signal.SIGTERM, lambda signum, frame: scheduler.stop())
+        try:
+            scheduler.run_forever()
+        except KeyboardInterrupt:
+            pass
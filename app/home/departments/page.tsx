@@ -1,8 +1,6 @@
 "use client";
 import { useEffect, useState } from "react";
-
-const API_BASE =
-  process.env.NEXT_PUBLIC_API_BASE || "http://localhost:5328/api";
+import { fetchAll } from "@/lib/api/pages";
 
 type Department = {
   id: number;
@@ -17,19 +15,9 @@ export default function DepartmentsPage() {
 
   useEffect(() => {
     setLoading(true);
-    fetch(`${API_BASE}/departments`)
-      .then((res) => {
-        if (!res.ok) throw new Error("Failed to fetch departments");
-        return res.json();
-      })
-      .then((data) => {
-        if (Array.isArray(data.departments)) {
-          setDepartments(data.departments);
-        } else if (Array.isArray(data)) {
-          setDepartments(data);
-        } else {
-          setDepartments([]);
-        }
+    fetchAll<Department>("departments/", "departments", "Failed to fetch departments")
+      .then((rows) => {
+        setDepartments(rows);
         setLoading(false);
       })
       .catch((err) => {
@@ -3,8 +3,7 @@
 import React from 'react';
 import { useEffect, useState } from 'react';
 import { useRouter } from 'next/navigation';
-
-const API_BASE = process.env.NEXT_PUBLIC_API_BASE || 'http://localhost:5328/api';
+import { fetchAll } from '@/lib/api/pages';
 
 interface Employee {
   id: number;
@@ -19,19 +18,9 @@ export default function EmployeesPage() {
 
   useEffect(() => {
     setLoading(true);
-    fetch(`${API_BASE}/employees`)
-      .then((res) => {
-        if (!res.ok) throw new Error('Failed to fetch employees');
-        return res.json();
-      })
-      .then((data) => {
-        if (Array.isArray(data.employees)) {
-          setEmployees(data.employees);
-        } else if (Array.isArray(data)) {
-          setEmployees(data);
-        } else {
-          setEmployees([]);
-        }
+    fetchAll<Employee>('employees/', 'employees', 'Failed to fetch employees')
+      .then((rows) => {
+        setEmployees(rows);
         setLoading(false);
       })
       .catch((err) => {
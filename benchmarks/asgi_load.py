@@ -0,0 +1,141 @@
+# WSGI vs ASGI throughput benchmark.
+#
+# Serves a throwaway copy of the database (padded with extra hardware rows)
+# first from the threaded WSGI server the API runs on today, then from
+# api.asgi under uvicorn, each in its own process. Both get the same load:
+# `--concurrency` clients each looping over paged inventory reads, with an
+# occasional full hardware export mixed in. Reports requests per second and
+# latency percentiles for each server.
+#
+#   pip install uvicorn a2wsgi
+#   python -m benchmarks.asgi_load --concurrency 500 --duration 20
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+from benchmarks.common import free_port, start_server, stop_server, summarize
+
+BENCH_USER = ("bench_load", "load-password")
+
+def pad_database(database, rows):
+    conn = sqlite3.connect(database)
+    conn.executemany(
+        "INSERT INTO hardware (device_name, device_type, serial_number, purchase_date, status, note) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        ((f"Bench device {i}", "laptop", f"BENCH-{i:08d}", "2024-01-01", "active", "load test") for i in range(rows)),
+    )
+    conn.commit()
+    conn.close()
+
+# Minimal HTTP/1.1 client: one connection per request, so neither server
+# gets an advantage from keep-alive handling
+async def http(port, method, path, body=None, cookie=None):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        headers = [f"{method} {path} HTTP/1.1", "Host: 127.0.0.1", "Connection: close"]
+        payload = b""
+        if body is not None:
+            payload = json.dumps(body).encode()
+            headers += ["Content-Type: application/json", f"Content-Length: {len(payload)}"]
+        if cookie:
+            headers.append(f"Cookie: {cookie}")
+        writer.write(("\r\n".join(headers) + "\r\n\r\n").encode() + payload)
+        await writer.drain()
+        status_line = await reader.readline()
+        status = int(status_line.split()[1])
+        set_cookie = None
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            if name.lower() == "set-cookie":
+                set_cookie = value.strip().split(";", 1)[0]
+        received = 0
+        while True:
+            chunk = await reader.read(65536)
+            if not chunk:
+                break
+            received += len(chunk)
+        return status, set_cookie, received
+    finally:
+        writer.close()
+
+async def client(port, cookie, stop_at, max_key, export_ratio, results):
+    rng = random.Random()
+    while time.monotonic() < stop_at:
+        if rng.random() < export_ratio:
+            path = "/api/export/hardware"
+        else:
+            path = f"/api/hardware/?limit=50&cursor={rng.randrange(max_key)}"
+        started = time.perf_counter()
+        try:
+            status, _, _ = await http(port, "GET", path, cookie=cookie)
+        except (OSError, ValueError, IndexError, asyncio.IncompleteReadError):
+            status = "error"
+        results.append((status, time.perf_counter() - started))
+
+async def drive(port, concurrency, duration, max_key, export_ratio):
+    await http(port, "POST", "/api/register", {"username": BENCH_USER[0], "password": BENCH_USER[1]})
+    _, cookie, _ = await http(port, "POST", "/api/login", {"username": BENCH_USER[0], "password": BENCH_USER[1]})
+    results = []
+    started = time.monotonic()
+    stop_at = started + duration
+    await asyncio.gather(*(
+        client(port, cookie, stop_at, max_key, export_ratio, results) for _ in range(concurrency)
+    ))
+    elapsed = time.monotonic() - started
+    statuses = {}
+    for status, _ in results:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    ok = [latency for status, latency in results if status == 200]
+    return {
+        "requests": len(results),
+        "requests_per_second": round(len(ok) / elapsed, 1),
+        "status_counts": statuses,
+        "latency": summarize(ok),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, default=500)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--rows", type=int, default=20000, help="Extra hardware rows to add")
+    parser.add_argument("--export-ratio", type=float, default=0.01)
+    parser.add_argument("--servers", default="wsgi,asgi")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp()
+    report = {"concurrency": args.concurrency, "duration_seconds": args.duration, "extra_rows": args.rows}
+    try:
+        for kind in args.servers.split(","):
+            # A fresh copy per server so neither inherits the other's writes
+            database = os.path.join(workdir, f"{kind}.db")
+            shutil.copy("api/db/inventory.db", database)
+            pad_database(database, args.rows)
+            env = dict(os.environ, DATABASE_PATH=database)
+            port = free_port()
+            process = start_server(kind, port, env)
+            try:
+                report[kind] = asyncio.run(drive(port, args.concurrency, args.duration, args.rows, args.export_ratio))
+            finally:
+                stop_server(process)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    print(text)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+# Helpers shared by the benchmark scripts
+import os
+import resource
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+WSGI_SERVER = """
+import logging, sys
+from werkzeug.serving import make_server
+from api.index import app
+logging.getLogger("werkzeug").setLevel(logging.ERROR)
+make_server("127.0.0.1", int(sys.argv[1]), app, threaded=True).serve_forever()
+"""
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return round(ordered[index] * 1000, 2)
+
+def summarize(latencies):
+    return {
+        "count": len(latencies),
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+        "max_ms": round(max(latencies) * 1000, 2) if latencies else None,
+        "mean_ms": round(statistics.mean(latencies) * 1000, 2) if latencies else None,
+    }
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+# Serve the API from a separate process: the threaded werkzeug server the
+# API runs on today ("wsgi") or api.asgi under uvicorn ("asgi")
+def start_server(kind, port, env):
+    if kind == "wsgi":
+        command = [sys.executable, "-c", WSGI_SERVER, str(port)]
+    else:
+        command = [sys.executable, "-m", "uvicorn", "api.asgi:application",
+                   "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning",
+                   "--backlog", "4096", "--no-access-log"]
+    # Own process group, so stop_server() also reaches the hashing pool's workers
+    process = subprocess.Popen(command, env=env, start_new_session=True)
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{kind} server exited with status {process.returncode}")
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return process
+        except OSError:
+            time.sleep(0.2)
+    stop_server(process)
+    raise RuntimeError(f"{kind} server did not start")
+
+def stop_server(process):
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait(timeout=60)
+    except subprocess.TimeoutExpired:
+        os.killpg(process.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+# Peak resident set size of a process, in MiB. On Linux the peak can be reset
+# between endpoints via clear_refs; elsewhere it is the lifetime peak.
+def reset_peak_rss(pid="self"):
+    try:
+        with open(f"/proc/{pid}/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+def peak_rss_mb(pid="self"):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    if pid == "self":
+        usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # kilobytes on Linux, bytes on macOS
+        return round(usage / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+    return None
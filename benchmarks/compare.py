@@ -0,0 +1,65 @@
+# Compare two benchmarks.run reports endpoint by endpoint.
+#
+#   python -m benchmarks.compare before.json after.json [--threshold 10]
+#
+# Exits with status 1 when any endpoint's p99 latency got worse by more than
+# --threshold percent, so it can gate a change in CI.
+import argparse
+import json
+import sys
+
+def change(old, new):
+    if old in (None, 0) or new is None:
+        return None
+    return round((new - old) / old * 100, 1)
+
+def format_change(value):
+    return "n/a" if value is None else f"{value:+.1f}%"
+
+def compare(before, after):
+    rows = []
+    for driver, endpoints in after["drivers"].items():
+        previous = before["drivers"].get(driver, {})
+        for name, result in endpoints.items():
+            old = previous.get(name)
+            if old is None:
+                continue
+            rows.append({
+                "driver": driver,
+                "endpoint": name,
+                "rps": (old["throughput_rps"], result["throughput_rps"], change(old["throughput_rps"], result["throughput_rps"])),
+                "p99_ms": (old["latency"]["p99_ms"], result["latency"]["p99_ms"], change(old["latency"]["p99_ms"], result["latency"]["p99_ms"])),
+                "peak_rss_mb": (old["peak_rss_mb"], result["peak_rss_mb"], change(old["peak_rss_mb"], result["peak_rss_mb"])),
+            })
+    return rows
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare two benchmark reports")
+    parser.add_argument("before")
+    parser.add_argument("after")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Allowed p99 regression, in percent")
+    args = parser.parse_args(argv)
+    with open(args.before) as f:
+        before = json.load(f)
+    with open(args.after) as f:
+        after = json.load(f)
+
+    print(f"before: {before['meta'].get('commit')}  after: {after['meta'].get('commit')}")
+    if before["meta"].get("scale") != after["meta"].get("scale"):
+        print("warning: the reports were run at different scales")
+    print(f"{'driver':<8} {'endpoint':<24} {'req/s before':>12} {'after':>9} {'change':>8} "
+          f"{'p99 before':>11} {'after':>9} {'change':>8} {'rss change':>10}")
+    regressions = []
+    for row in compare(before, after):
+        rps, p99, rss = row["rps"], row["p99_ms"], row["peak_rss_mb"]
+        print(f"{row['driver']:<8} {row['endpoint']:<24} {rps[0]!s:>12} {rps[1]!s:>9} {format_change(rps[2]):>8} "
+              f"{p99[0]!s:>11} {p99[1]!s:>9} {format_change(p99[2]):>8} {format_change(rss[2]):>10}")
+        if p99[2] is not None and p99[2] > args.threshold:
+            regressions.append(f"{row['driver']}/{row['endpoint']}")
+    if regressions:
+        print(f"p99 regressed by more than {args.threshold}%: {', '.join(regressions)}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,232 @@
+# Deterministic synthetic fleet.
+#
+# Builds a database from api/db/schema.sql plus every migration and fills each
+# table in proportion to the number of hardware assets. The same scale and
+# seed always produce the same rows, so results from different commits are
+# measured against identical data.
+#
+#   python -m benchmarks.fleet --scale 100k --output /tmp/fleet-100k.db
+import argparse
+import datetime
+import os
+import random
+import sqlite3
+import sys
+
+from werkzeug.security import generate_password_hash
+
+from api.db.history import backfill_snapshots
+from api.db.migrate import migrate
+
+SCHEMA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "api", "db", "schema.sql")
+
+SCALES = {"1k": 1_000, "10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+
+# Rows per asset for the other tables
+EMPLOYEES_PER_ASSET = 0.25
+SOFTWARE_PER_ASSET = 0.5
+DATA_PER_ASSET = 0.05
+ASSIGNMENTS_PER_ASSET = 1.5
+ASSETS_PER_DEPARTMENT = 2000
+
+# Accounts the benchmark drivers log in as, one per role that matters. The
+# cheap hash keeps fleet builds fast; the API re-hashes it with
+# PASSWORD_METHOD on the first login.
+BENCH_USERS = {
+    "admin": ("bench_admin", "bench-admin-password", 3),
+    "intern": ("bench_intern", "bench-intern-password", 2),
+}
+BENCH_HASH_METHOD = "pbkdf2:sha256:1000"
+
+# device_type -> subtype table the asset also gets a row in
+DEVICE_TYPES = {
+    "laptop": "computers",
+    "desktop": "computers",
+    "server": "computers",
+    "printer": "printers",
+    "projector": "audio_video",
+    "display": "audio_video",
+    "phone": "devices",
+    "tablet": "devices",
+}
+HARDWARE_STATUSES = ("active", "active", "active", "inactive", "maintenance", "decommissioned")
+SOFTWARE_STATUSES = ("active", "active", "inactive", "decommissioned")
+DATA_STATUSES = ("active", "inactive", "archived")
+ACCESS_LEVELS = ("public", "internal", "confidential", "restricted")
+BRANDS = ("Dell", "HP", "Lenovo", "Apple", "Epson", "Brother", "Samsung", "Cisco")
+SOFTWARE = (("Microsoft", "Office"), ("Adobe", "Acrobat"), ("JetBrains", "PyCharm"), ("Slack", "Slack"), ("Zoom", "Zoom"))
+FIRST_NAMES = ("Ada", "Ben", "Chloe", "Dev", "Eli", "Fatima", "Gus", "Hana", "Ivan", "Jo", "Kai", "Lena")
+LAST_NAMES = ("Ng", "Okafor", "Patel", "Quinn", "Rossi", "Silva", "Tanaka", "Umar", "Vega", "Weber")
+
+BASE_DATE = datetime.date(2020, 1, 1)
+BATCH_SIZE = 10_000
+
+def day(offset):
+    return (BASE_DATE + datetime.timedelta(days=offset)).isoformat()
+
+def insert_batches(conn, sql, rows):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            conn.executemany(sql, batch)
+            batch = []
+    if batch:
+        conn.executemany(sql, batch)
+
+def row_counts(assets):
+    return {
+        "hardware": assets,
+        "employees": max(10, int(assets * EMPLOYEES_PER_ASSET)),
+        "departments": max(5, assets // ASSETS_PER_DEPARTMENT),
+        "software": int(assets * SOFTWARE_PER_ASSET),
+        "data": max(5, int(assets * DATA_PER_ASSET)),
+        "inventory_assignments": int(assets * ASSIGNMENTS_PER_ASSET),
+    }
+
+# Append the synthetic rows after schema.sql's sample data. Ids are assigned
+# in insert order, so they are as deterministic as the values.
+def fill(conn, assets, seed):
+    rng = random.Random(seed)
+    counts = row_counts(assets)
+    first_employee = conn.execute("SELECT COALESCE(MAX(employee_id), 0) + 1 FROM employees").fetchone()[0]
+    first_device = conn.execute("SELECT COALESCE(MAX(device_id), 0) + 1 FROM hardware").fetchone()[0]
+    employee_ids = range(first_employee, first_employee + counts["employees"])
+
+    insert_batches(conn, "INSERT INTO departments (department_name, department_type, department_note) VALUES (?, ?, ?)", (
+        (f"Department {i:05d}", rng.choice(("Technology", "Operations", "Finance", "Sales")), "Synthetic")
+        for i in range(counts["departments"])
+    ))
+    insert_batches(conn, "INSERT INTO employees (first_name, last_name, email, phone, note) VALUES (?, ?, ?, ?, ?)", (
+        (rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES), f"employee{i:07d}@fleet.example",
+         f"555-{i % 10000:04d}", f"Department {rng.randrange(counts['departments']):05d}")
+        for i in range(counts["employees"])
+    ))
+
+    hardware, subtypes = [], {"computers": [], "printers": [], "devices": [], "audio_video": []}
+    for i in range(assets):
+        device_id = first_device + i
+        device_type = rng.choice(tuple(DEVICE_TYPES))
+        brand = rng.choice(BRANDS)
+        serial = f"FLEET-{i:08d}"
+        purchased = rng.randrange(0, 1800)
+        warranty = day(purchased + rng.choice((365, 730, 1095))) if rng.random() < 0.9 else None
+        status = rng.choice(HARDWARE_STATUSES)
+        assignee = rng.choice(employee_ids) if status == "active" and rng.random() < 0.8 else None
+        hardware.append((serial, f"{brand} {device_type} {i}", device_type, day(purchased), warranty, status, assignee, f"Asset tag {i}"))
+        table = DEVICE_TYPES[device_type]
+        if table == "computers":
+            subtypes[table].append((device_id, serial, device_type, f"Model {rng.randrange(100)}", brand,
+                                    rng.choice(("i5", "i7", "M2", "Ryzen 7")), rng.choice(("8GB", "16GB", "32GB")),
+                                    rng.choice(("Windows 11", "macOS", "Ubuntu"))))
+        elif table == "printers":
+            subtypes[table].append((device_id, serial, f"02:00:{i >> 24 & 255:02x}:{i >> 16 & 255:02x}:{i >> 8 & 255:02x}:{i & 255:02x}",
+                                    f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}", f"Model {rng.randrange(50)}", brand))
+        else:
+            subtypes[table].append((device_id, serial, device_type, brand, f"Model {rng.randrange(50)}"))
+    insert_batches(conn, "INSERT INTO hardware (serial_number, device_name, device_type, purchase_date,"
+                         " warranty_expiration, status, assignee, note) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", hardware)
+    insert_batches(conn, "INSERT INTO computers (device_id, serial_number, device_type, computer_model, computer_brand,"
+                         " cpu, ram, operating_system) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", subtypes["computers"])
+    insert_batches(conn, "INSERT INTO printers (device_id, serial_number, mac_address, ip_address, printer_model,"
+                         " printer_brand) VALUES (?, ?, ?, ?, ?, ?)", subtypes["printers"])
+    insert_batches(conn, "INSERT INTO devices (device_id, serial_number, device_type, brand, model)"
+                         " VALUES (?, ?, ?, ?, ?)", subtypes["devices"])
+    insert_batches(conn, "INSERT INTO audio_video (device_id, serial_number, equipment_type, brand, model)"
+                         " VALUES (?, ?, ?, ?, ?)", subtypes["audio_video"])
+    del hardware, subtypes
+
+    insert_batches(conn, "INSERT INTO software (software_brand, software_name, version, license_key, purchase_date,"
+                         " expiration_date, status, assignee) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", (
+        (*rng.choice(SOFTWARE), f"{rng.randrange(1, 20)}.{rng.randrange(10)}", f"LIC-{i:09d}",
+         day(purchased), day(purchased + 365), rng.choice(SOFTWARE_STATUSES),
+         rng.choice(employee_ids) if rng.random() < 0.7 else None)
+        for i, purchased in ((i, rng.randrange(0, 2000)) for i in range(counts["software"]))
+    ))
+    insert_batches(conn, "INSERT INTO data (data_name, data_type, storage_location, access_level, members_list,"
+                         " created_date, last_modified_date, status) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", (
+        (f"Dataset {i}", rng.choice(("database", "share", "bucket")), f"/srv/data/{i % 100}/{i}",
+         rng.choice(ACCESS_LEVELS), ",".join(str(e) for e in sorted(rng.sample(employee_ids, rng.randrange(1, 12)))),
+         day(created), day(created + rng.randrange(0, 400)), rng.choice(DATA_STATUSES))
+        for i, created in ((i, rng.randrange(0, 1800)) for i in range(counts["data"]))
+    ))
+    # Assignment history: about two thirds have been returned
+    insert_batches(conn, "INSERT INTO inventory_assignments (device_id, employee_id, assigned_date, return_date)"
+                         " VALUES (?, ?, ?, ?)", (
+        (first_device + rng.randrange(assets), rng.choice(employee_ids), day(assigned),
+         day(assigned + rng.randrange(1, 300)) if rng.random() < 0.66 else None)
+        for assigned in (rng.randrange(0, 2000) for _ in range(counts["inventory_assignments"]))
+    ))
+
+    insert_batches(conn, "INSERT INTO users (username, password, user_role, security_level) VALUES (?, ?, ?, ?)", (
+        (username, generate_password_hash(password, BENCH_HASH_METHOD), role, level)
+        for role, (username, password, level) in BENCH_USERS.items()
+    ))
+    return counts
+
+# Create (or reuse) the fleet database at `path`. Bulk loading happens before
+# the migrations run, so search and stats triggers are built from the final
+# rows once instead of firing per insert.
+def build_fleet(path, assets, seed=0, force=False):
+    if os.path.exists(path) and not force:
+        return path
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode = OFF")
+    conn.execute("PRAGMA synchronous = OFF")
+    with open(SCHEMA, "r") as f:
+        conn.executescript(f.read())
+    conn.execute("BEGIN")
+    fill(conn, assets, seed)
+    conn.commit()
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.close()
+    migrate(path)
+    fill_workflow(path, seed)
+    return path
+
+# Loan due dates, the removal queue and historical asset snapshots only exist
+# once migrations 0005 and 0006 have run, so they are filled in after them
+def fill_workflow(path, seed):
+    rng = random.Random(seed + 1)
+    conn = sqlite3.connect(path)
+    conn.execute("BEGIN")
+    open_loans = conn.execute(
+        "SELECT assignment_id, assigned_date FROM inventory_assignments WHERE return_date IS NULL"
+    ).fetchall()
+    conn.executemany("UPDATE inventory_assignments SET due_date = ? WHERE assignment_id = ?", (
+        ((datetime.date.fromisoformat(assigned) + datetime.timedelta(days=rng.randrange(14, 730))).isoformat(), assignment_id)
+        for assignment_id, assigned in open_loans
+    ))
+    # About 1% of the active devices that are not out on loan
+    idle = conn.execute(
+        "SELECT device_id FROM hardware WHERE status = 'active' AND device_id NOT IN"
+        " (SELECT device_id FROM inventory_assignments WHERE return_date IS NULL)"
+    ).fetchall()
+    conn.executemany("UPDATE hardware SET removal_requested_date = ? WHERE device_id = ?", (
+        (day(rng.randrange(1800, 2000)), device_id) for (device_id,) in idle if rng.random() < 0.01
+    ))
+    backfill_snapshots(conn)
+    conn.commit()
+    conn.close()
+
+def parse_scale(value):
+    if value.lower() in SCALES:
+        return SCALES[value.lower()]
+    return int(value)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build a deterministic synthetic inventory database")
+    parser.add_argument("--scale", default="10k", help=f"Number of hardware assets, or one of {', '.join(SCALES)}")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", required=True)
+    parser.add_argument("--force", action="store_true", help="Rebuild even if the file exists")
+    args = parser.parse_args(argv)
+    assets = parse_scale(args.scale)
+    build_fleet(args.output, assets, args.seed, force=args.force)
+    print(f"{args.output}: {', '.join(f'{table}={count}' for table, count in row_counts(assets).items())}")
+
+if __name__ == "__main__":
+    sys.exit(main())
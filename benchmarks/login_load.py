@@ -0,0 +1,123 @@
+# Login burst benchmark.
+#
+# Starts the API on a threaded local server against a throwaway copy of the
+# database, fires N concurrent logins at it, and meanwhile keeps timing an
+# inventory read to show how much the burst slows everyone else down.
+#
+#   python -m benchmarks.login_load --concurrency 200
+import argparse
+import http.cookiejar
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.common import summarize
+
+BENCH_USER = ("bench_user", "bench-password")
+READER_USER = ("bench_reader", "reader-password")
+
+def request(opener, url, body=None):
+    data = json.dumps(body).encode() if body is not None else None
+    req = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+    started = time.perf_counter()
+    try:
+        with opener.open(req, timeout=120) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    return status, time.perf_counter() - started
+
+def start_server():
+    from werkzeug.serving import make_server
+    from api.index import app
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+def time_reads(opener, url, stop, latencies):
+    while not stop.is_set():
+        latencies.append(request(opener, url)[1])
+
+def run(concurrency, baseline_seconds):
+    server, base = start_server()
+    plain = urllib.request.build_opener()
+    for username, password in (BENCH_USER, READER_USER):
+        request(plain, f"{base}/api/register", {"username": username, "password": password})
+    reader = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+    request(reader, f"{base}/api/login", {"username": READER_USER[0], "password": READER_USER[1]})
+    read_url = f"{base}/api/hardware/?limit=100"
+
+    # Read latency with nothing else going on
+    baseline, stop = [], threading.Event()
+    worker = threading.Thread(target=time_reads, args=(reader, read_url, stop, baseline))
+    worker.start()
+    time.sleep(baseline_seconds)
+    stop.set()
+    worker.join()
+
+    # Read latency while `concurrency` logins arrive at once
+    during, stop = [], threading.Event()
+    worker = threading.Thread(target=time_reads, args=(reader, read_url, stop, during))
+    worker.start()
+    gate = threading.Barrier(concurrency)
+    def login(_):
+        gate.wait()
+        return request(plain, f"{base}/api/login", {"username": BENCH_USER[0], "password": BENCH_USER[1]})
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(login, range(concurrency)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    worker.join()
+    server.shutdown()
+
+    statuses = {}
+    for status, _ in results:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    return {
+        "concurrency": concurrency,
+        "wall_seconds": round(elapsed, 3),
+        "login_status_counts": statuses,
+        "login_latency": summarize([latency for _, latency in results]),
+        "read_latency_idle": summarize(baseline),
+        "read_latency_during_burst": summarize(during),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--baseline-seconds", type=float, default=2.0)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    # The whole burst comes from one IP; lift the per-IP limit so every
+    # attempt reaches the hashing pool
+    os.environ.setdefault("LOGIN_MAX_PER_IP", str(args.concurrency * 10))
+    workdir = tempfile.mkdtemp()
+    database = os.path.join(workdir, "inventory.db")
+    shutil.copy("api/db/inventory.db", database)
+    import api.db.database
+    api.db.database.DATABASE = database
+    try:
+        report = run(args.concurrency, args.baseline_seconds)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    print(text)
+
+if __name__ == "__main__":
+    sys.exit(main())
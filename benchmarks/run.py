@@ -0,0 +1,310 @@
+# Endpoint benchmark suite.
+#
+# Builds (or reuses) a synthetic fleet, then drives every blueprint through
+# Flask's test client in-process and/or a multi-threaded HTTP load generator
+# against a separate server process. Per endpoint it records throughput,
+# latency percentiles and peak RSS, and writes everything as JSON together
+# with the commit it ran on, for comparison with benchmarks.compare.
+#
+#   python -m benchmarks.run --scale 100k --drivers client,http --output before.json
+#   python -m benchmarks.compare before.json after.json
+import argparse
+import datetime
+import http.client
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from benchmarks.common import (free_port, peak_rss_mb, reset_peak_rss, start_server, stop_server,
+                               summarize)
+from benchmarks.fleet import BENCH_USERS, build_fleet, parse_scale, row_counts
+
+SEARCH_TERMS = ("Dell", "Lenovo", "FLEET-0001", "Office", "Ryzen", "Patel", "Dataset 123")
+
+# Largest id in each table, for picking random existing rows
+ID_COLUMNS = {
+    "hardware": "device_id",
+    "software": "software_id",
+    "employees": "employee_id",
+    "departments": "department_id",
+    "data": "data_id",
+    "inventory_assignments": "assignment_id",
+}
+
+class Endpoint:
+    def __init__(self, name, build, method="GET", weight=1.0):
+        self.name = name
+        self.build = build
+        self.method = method
+        # Fraction of --requests this endpoint gets (logins and full exports are slow)
+        self.weight = weight
+
+    # (path, JSON body or None) for request number `n`
+    def request(self, rng, ids, n):
+        return self.build(rng, ids, n)
+
+def pick(rng, ids, table):
+    return rng.randint(1, ids[table])
+
+def new_hardware(rng, ids, n):
+    return "/api/hardware/", {
+        "serial_number": f"BENCH-{os.getpid()}-{threading.get_ident()}-{n}",
+        "device_name": "Benchmark device",
+        "device_type": "laptop",
+        "purchase_date": "2024-01-01",
+        "status": "active",
+    }
+
+ENDPOINTS = [
+    Endpoint("employees.list", lambda rng, ids, n: (f"/api/employees/?limit=100&cursor={pick(rng, ids, 'employees')}", None)),
+    Endpoint("employees.get", lambda rng, ids, n: (f"/api/employees/{pick(rng, ids, 'employees')}", None)),
+    Endpoint("hardware.list", lambda rng, ids, n: (f"/api/hardware/?limit=100&cursor={pick(rng, ids, 'hardware')}", None)),
+    Endpoint("hardware.get", lambda rng, ids, n: (f"/api/hardware/{pick(rng, ids, 'hardware')}", None)),
+    Endpoint("hardware.create", new_hardware, method="POST"),
+    Endpoint("hardware.update", lambda rng, ids, n: (f"/api/hardware/{pick(rng, ids, 'hardware')}", {"note": f"bench {n}"}), method="PATCH"),
+    Endpoint("software.list", lambda rng, ids, n: (f"/api/software/?limit=100&cursor={pick(rng, ids, 'software')}", None)),
+    Endpoint("software.get", lambda rng, ids, n: (f"/api/software/{pick(rng, ids, 'software')}", None)),
+    Endpoint("data.list", lambda rng, ids, n: (f"/api/data/?limit=100&cursor={pick(rng, ids, 'data')}", None)),
+    Endpoint("data.get", lambda rng, ids, n: (f"/api/data/{pick(rng, ids, 'data')}", None)),
+    Endpoint("data.members", lambda rng, ids, n: (f"/api/data/{pick(rng, ids, 'data')}/members", None)),
+    Endpoint("data.access", lambda rng, ids, n: (f"/api/data/access/{pick(rng, ids, 'employees')}", None)),
+    Endpoint("audio_video.list", lambda rng, ids, n: (f"/api/audio_video/?limit=100&cursor={pick(rng, ids, 'hardware')}", None)),
+    Endpoint("departments.list", lambda rng, ids, n: ("/api/departments/?limit=100", None)),
+    Endpoint("departments.get", lambda rng, ids, n: (f"/api/departments/{pick(rng, ids, 'departments')}", None)),
+    Endpoint("inventory.list", lambda rng, ids, n: (f"/api/inventory_assignments/?limit=100&cursor={pick(rng, ids, 'inventory_assignments')}", None)),
+    Endpoint("inventory.get", lambda rng, ids, n: (f"/api/inventory_assignments/{pick(rng, ids, 'inventory_assignments')}", None)),
+    Endpoint("assets.list", lambda rng, ids, n: (f"/api/assets/?limit=100&status=active&cursor={pick(rng, ids, 'hardware')}", None)),
+    Endpoint("loans.list", lambda rng, ids, n: (f"/api/loans/?limit=100&cursor={pick(rng, ids, 'hardware')}", None)),
+    Endpoint("loans.overdue", lambda rng, ids, n: ("/api/loans/overdue?limit=100&as_of=2024-06-30", None)),
+    Endpoint("removals.list", lambda rng, ids, n: ("/api/removals/?limit=100", None)),
+    Endpoint("assets.history", lambda rng, ids, n: (f"/api/assets/{pick(rng, ids, 'hardware')}/history", None)),
+    Endpoint("inventory.as_of", lambda rng, ids, n: (f"/api/inventory/as-of?date=2023-0{rng.randrange(1, 10)}-15&limit=100&cursor={pick(rng, ids, 'hardware')}", None)),
+    Endpoint("changes.list", lambda rng, ids, n: ("/api/changes/?since=0&limit=100", None)),
+    Endpoint("search", lambda rng, ids, n: (f"/api/search/?q={rng.choice(SEARCH_TERMS).replace(' ', '+')}&limit=20", None)),
+    Endpoint("stats", lambda rng, ids, n: ("/api/stats/", None)),
+    Endpoint("export.preview", lambda rng, ids, n: ("/api/export-preview?limit=10", None)),
+    Endpoint("export.hardware.1000", lambda rng, ids, n: ("/api/export/hardware?preview=1000", None)),
+    Endpoint("export.hardware.full", lambda rng, ids, n: ("/api/export/hardware", None), weight=0.02),
+    Endpoint("users.list", lambda rng, ids, n: ("/api/users", None)),
+    # Logs in as the admin the drivers already use, so the test client's
+    # session cookie keeps its role
+    Endpoint("login", lambda rng, ids, n: ("/api/login", {"username": BENCH_USERS["admin"][0], "password": BENCH_USERS["admin"][1]}),
+             method="POST", weight=0.05),
+    Endpoint("metrics", lambda rng, ids, n: ("/api/metrics/", None)),
+]
+
+def max_ids(database):
+    conn = sqlite3.connect(database)
+    try:
+        return {table: conn.execute(f"SELECT MAX({key}) FROM {table}").fetchone()[0] or 1 for table, key in ID_COLUMNS.items()}
+    finally:
+        conn.close()
+
+def endpoint_rng(seed, endpoint, worker=0):
+    return random.Random(f"{seed}:{endpoint.name}:{worker}")
+
+def endpoint_result(latencies, statuses, received, elapsed, rss):
+    ok = [latency for latency, status in zip(latencies, statuses) if isinstance(status, int) and status < 400]
+    counts = {}
+    for status in statuses:
+        counts[str(status)] = counts.get(str(status), 0) + 1
+    return {
+        "requests": len(latencies),
+        "status_counts": counts,
+        "throughput_rps": round(len(ok) / elapsed, 1) if elapsed else None,
+        "latency": summarize(ok),
+        "response_bytes_mean": round(received / len(latencies)) if latencies else 0,
+        "peak_rss_mb": rss,
+    }
+
+# In-process: one request at a time through app.test_client(). Measures the
+# handler, middleware and database with no network or server in the way.
+def run_client(database, ids, endpoints, requests, warmup, seed):
+    os.environ["DATABASE_PATH"] = database
+    import api.db.database
+    api.db.database.DATABASE = database
+    from api.index import app
+    client = app.test_client()
+    username, password, _ = BENCH_USERS["admin"]
+    client.post("/api/login", json={"username": username, "password": password}).close()
+
+    results = {}
+    for endpoint in endpoints:
+        rng = endpoint_rng(seed, endpoint)
+        count = max(1, int(requests * endpoint.weight))
+        for n in range(min(warmup, count)):
+            path, body = endpoint.request(rng, ids, -n - 1)
+            client.open(path, method=endpoint.method, json=body).close()
+        reset_peak_rss()
+        latencies, statuses, received = [], [], 0
+        started = time.perf_counter()
+        for n in range(count):
+            path, body = endpoint.request(rng, ids, n)
+            request_started = time.perf_counter()
+            response = client.open(path, method=endpoint.method, json=body)
+            received += len(response.get_data())
+            response.close()
+            latencies.append(time.perf_counter() - request_started)
+            statuses.append(response.status_code)
+        results[endpoint.name] = endpoint_result(latencies, statuses, received, time.perf_counter() - started, peak_rss_mb())
+    return results
+
+def http_request(port, method, path, body, cookie):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=120)
+    try:
+        headers = {"Cookie": cookie} if cookie else {}
+        payload = None
+        if body is not None:
+            payload = json.dumps(body)
+            headers["Content-Type"] = "application/json"
+        conn.request(method, path, body=payload, headers=headers)
+        response = conn.getresponse()
+        data = response.read()
+        return response.status, len(data), response.getheader("Set-Cookie")
+    finally:
+        conn.close()
+
+# Separate server process, `threads` clients each sending one request at a
+# time until `requests` have been sent. Peak RSS is the server's.
+def run_http(database, ids, endpoints, requests, warmup, seed, threads, server):
+    env = dict(os.environ, DATABASE_PATH=database)
+    port = free_port()
+    process = start_server(server, port, env)
+    try:
+        username, password, _ = BENCH_USERS["admin"]
+        _, _, set_cookie = http_request(port, "POST", "/api/login", {"username": username, "password": password}, None)
+        cookie = set_cookie.split(";", 1)[0] if set_cookie else None
+
+        results = {}
+        for endpoint in endpoints:
+            count = max(1, int(requests * endpoint.weight))
+            rng = endpoint_rng(seed, endpoint)
+            for n in range(min(warmup, count)):
+                path, body = endpoint.request(rng, ids, -n - 1)
+                http_request(port, endpoint.method, path, body, cookie)
+            reset_peak_rss(process.pid)
+
+            latencies, statuses, received = [], [], [0]
+            remaining = [count]
+            lock = threading.Lock()
+
+            def worker(index):
+                worker_rng = endpoint_rng(seed, endpoint, index + 1)
+                while True:
+                    with lock:
+                        if remaining[0] == 0:
+                            return
+                        remaining[0] -= 1
+                        n = remaining[0]
+                    path, body = endpoint.request(worker_rng, ids, n)
+                    request_started = time.perf_counter()
+                    try:
+                        status, size, _ = http_request(port, endpoint.method, path, body, cookie)
+                    except OSError:
+                        status, size = "error", 0
+                    latency = time.perf_counter() - request_started
+                    with lock:
+                        latencies.append(latency)
+                        statuses.append(status)
+                        received[0] += size
+
+            started = time.perf_counter()
+            workers = [threading.Thread(target=worker, args=(i,)) for i in range(min(threads, count))]
+            for thread in workers:
+                thread.start()
+            for thread in workers:
+                thread.join()
+            elapsed = time.perf_counter() - started
+            results[endpoint.name] = endpoint_result(latencies, statuses, received[0], elapsed, peak_rss_mb(process.pid))
+        return results
+    finally:
+        stop_server(process)
+
+def git_commit():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                                    capture_output=True, text=True, check=True).stdout.strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark every API endpoint against a synthetic fleet")
+    parser.add_argument("--scale", default="10k", help="Hardware assets in the fleet: 10k, 100k, 1m or a number")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--drivers", default="client,http", help="client, http or both")
+    parser.add_argument("--server", default="wsgi", choices=("wsgi", "asgi"), help="Server for the http driver")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per endpoint (scaled down for slow ones)")
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--threads", type=int, default=16, help="Concurrent clients for the http driver")
+    parser.add_argument("--endpoints", help="Comma-separated endpoint names (default: all)")
+    parser.add_argument("--fleet-dir", default=os.path.join(tempfile.gettempdir(), "inventory-bench"),
+                        help="Where generated fleets are kept between runs")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    endpoints = ENDPOINTS
+    if args.endpoints:
+        wanted = set(args.endpoints.split(","))
+        unknown = wanted - {endpoint.name for endpoint in ENDPOINTS}
+        if unknown:
+            parser.error(f"Unknown endpoints: {', '.join(sorted(unknown))}")
+        endpoints = [endpoint for endpoint in ENDPOINTS if endpoint.name in wanted]
+
+    assets = parse_scale(args.scale)
+    os.makedirs(args.fleet_dir, exist_ok=True)
+    fleet = build_fleet(os.path.join(args.fleet_dir, f"fleet-{assets}-{args.seed}.db"), assets, args.seed)
+    ids = max_ids(fleet)
+    commit, dirty = git_commit()
+    report = {
+        "meta": {
+            "commit": commit,
+            "dirty": dirty,
+            "started_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "scale": assets,
+            "seed": args.seed,
+            "rows": row_counts(assets),
+            "requests": args.requests,
+            "threads": args.threads,
+            "server": args.server,
+        },
+        "drivers": {},
+    }
+
+    # Every driver works on its own copy; the write endpoints change the data
+    workdir = tempfile.mkdtemp()
+    try:
+        for driver in args.drivers.split(","):
+            database = os.path.join(workdir, f"{driver}.db")
+            shutil.copy(fleet, database)
+            if driver == "client":
+                report["drivers"]["client"] = run_client(database, ids, endpoints, args.requests, args.warmup, args.seed)
+            elif driver == "http":
+                report["drivers"]["http"] = run_http(database, ids, endpoints, args.requests, args.warmup,
+                                                     args.seed, args.threads, args.server)
+            else:
+                parser.error(f"Unknown driver: {driver}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    print(text)
+
+if __name__ == "__main__":
+    sys.exit(main())
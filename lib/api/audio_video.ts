@@ -1,9 +1,9 @@
+import { fetchAll } from "./pages";
+
 const API_BASE = process.env.NEXT_PUBLIC_API_BASE || "http://localhost:5328/api";
 
 export async function getAudioVideo() {
-  const res = await fetch(`${API_BASE}/audio_video`);
-  if (!res.ok) throw new Error("Failed to fetch audio/video");
-  return res.json();
+  return fetchAll("audio_video/", "audio_video", "Failed to fetch audio/video");
 }
 
 export async function addAudioVideo(data: { name: string; type: string }) {
@@ -1,9 +1,9 @@
+import { fetchAll } from "./pages";
+
 const API_BASE = process.env.NEXT_PUBLIC_API_BASE || "http://localhost:5328/api";
 
 export async function getData() {
-  const res = await fetch(`${API_BASE}/data`);
-  if (!res.ok) throw new Error("Failed to fetch data");
-  return res.json();
+  return fetchAll("data/", "data", "Failed to fetch data");
 }
 
 export async function addData(data: { name: string; value: string }) {
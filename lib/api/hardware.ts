@@ -1,9 +1,9 @@
+import { fetchAll } from "./pages";
+
 const API_BASE = process.env.NEXT_PUBLIC_API_BASE || "http://localhost:5328/api";
 
 export async function getHardware() {
-  const res = await fetch(`${API_BASE}/hardware`);
-  if (!res.ok) throw new Error("Failed to fetch hardware");
-  return res.json();
+  return fetchAll("hardware/", "hardware", "Failed to fetch hardware");
 }
 
 export async function addHardware(data: { name: string; model: string }) {
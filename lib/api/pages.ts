@@ -0,0 +1,22 @@
+const API_BASE = process.env.NEXT_PUBLIC_API_BASE || "http://localhost:5328/api";
+
+// Largest page the list endpoints serve
+const PAGE_LIMIT = 1000;
+
+// List endpoints return one keyset page at a time as
+// { [collection]: [...], next_cursor }; follow next_cursor until it runs out
+// and return every row.
+export async function fetchAll<T = any>(path: string, collection: string, errorMessage: string): Promise<T[]> {
+  const rows: T[] = [];
+  let cursor: string | number | null = null;
+  do {
+    const params = new URLSearchParams({ limit: String(PAGE_LIMIT) });
+    if (cursor !== null) params.set("cursor", String(cursor));
+    const res = await fetch(`${API_BASE}/${path}?${params}`);
+    if (!res.ok) throw new Error(errorMessage);
+    const page = await res.json();
+    rows.push(...(page[collection] ?? []));
+    cursor = page.next_cursor ?? null;
+  } while (cursor !== null);
+  return rows;
+}
@@ -1,3 +1,5 @@
+import { fetchAll } from "./pages";
+
 const API_BASE = process.env.NEXT_PUBLIC_API_BASE || "http://localhost:5328/api";
 
 // Define the full interface for a Software item
@@ -17,9 +19,7 @@ export interface SoftwareItem {
 export type SoftwareFormData = Omit<SoftwareItem, 'id'>;
 
 export async function getSoftware(): Promise<SoftwareItem[]> {
-  const res = await fetch(`${API_BASE}/software`);
-  if (!res.ok) throw new Error("Failed to fetch software");
-  return res.json();
+  return fetchAll<SoftwareItem>("software/", "software", "Failed to fetch software");
 }
 
 export async function addSoftware(data: SoftwareFormData): Promise<SoftwareItem> {
@@ -0,0 +1,92 @@
+# Every test runs once per storage backend: SQLite on a temporary file, and
+# PostgreSQL on TEST_DATABASE_URL or, when that is unset, a throwaway local
+# server started with pgserver (see requirements-dev.txt). The PostgreSQL
+# runs are skipped when neither is available. Each test starts from a freshly
+# initialized, seeded database; TEST_DATABASE_URL is wiped the same way.
+import os
+import tempfile
+import pytest
+
+TEST_DIR = tempfile.mkdtemp(prefix="inventory-tests-")
+os.environ["DATABASE_PATH"] = os.path.join(TEST_DIR, "inventory.db")
+os.environ.pop("DATABASE_URL", None)
+
+from api.db.backends import get_backend, set_backend
+from api.db.database import initialize_db
+
+# The app migrates and prepares its statements against the SQLite database
+# on import, so it has to exist first
+initialize_db()
+
+from api.index import app
+from api.utils.auth import role_cache
+from api.utils.cache import response_cache
+from api.utils.compression import compressed_cache
+
+BACKENDS = ("sqlite", "postgres")
+
+_postgres_server = None
+
+def postgres_url():
+    global _postgres_server
+    url = os.getenv("TEST_DATABASE_URL")
+    if url:
+        return url
+    pgserver = pytest.importorskip("pgserver", reason="set TEST_DATABASE_URL or install pgserver")
+    if _postgres_server is None:
+        _postgres_server = pgserver.get_server(os.path.join(TEST_DIR, "postgres"), cleanup_mode="stop")
+    return _postgres_server.get_uri()
+
+@pytest.fixture(scope="session", params=BACKENDS)
+def backend(request):
+    if request.param == "sqlite":
+        from api.db.backends.sqlite import SQLiteBackend
+        set_backend(SQLiteBackend(os.environ["DATABASE_PATH"]))
+    else:
+        pytest.importorskip("psycopg_pool", reason="psycopg and psycopg_pool are not installed")
+        from api.db.backends.postgres import PostgresBackend
+        set_backend(PostgresBackend(postgres_url()))
+    return get_backend()
+
+# Run `sql` on a connection of its own and return every row it produced
+@pytest.fixture
+def query(backend):
+    def run(sql, params=()):
+        conn = backend.acquire()
+        try:
+            cursor = conn.execute(sql, params)
+            rows = cursor.fetchall() if cursor.description else []
+            conn.commit()
+            return [tuple(row) for row in rows]
+        finally:
+            backend.release(conn)
+    return run
+
+# A test client signed in as the seeded admin user, on a fresh database
+@pytest.fixture
+def client(backend, query):
+    initialize_db()
+    response_cache.clear()
+    compressed_cache.clear()
+    role_cache.clear()
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session["user_id"] = query("SELECT user_id FROM users WHERE username = 'admin'")[0][0]
+    return client
+
+@pytest.fixture
+def anon(client):
+    return app.test_client()
+
+# A second client, signed in as an intern: reads and writes, no deletes
+@pytest.fixture
+def intern(client, query):
+    query(
+        "INSERT INTO users (username, password, user_role, security_level) VALUES ('intern1', 'x', 'intern', 2)"
+    )
+    user_id = query("SELECT user_id FROM users WHERE username = 'intern1'")[0][0]
+    intern = app.test_client()
+    with intern.session_transaction() as session:
+        session["user_id"] = user_id
+    intern.user_id = user_id
+    return intern
@@ -0,0 +1,102 @@
+from datetime import date, timedelta
+import pytest
+from api.db.alerts import run_once
+
+TODAY = date.today()
+
+def day(offset):
+    return (TODAY + timedelta(days=offset)).isoformat()
+
+class ListSink:
+    def __init__(self):
+        self.sent = []
+        self.fail = False
+
+    def send(self, alerts):
+        if self.fail:
+            raise RuntimeError("sink down")
+        self.sent += alerts
+
+@pytest.fixture
+def sink(client):
+    # Clear the alerts for the seeded rows out of the way first
+    sink = ListSink()
+    run_once([sink], TODAY)
+    sink.sent = []
+    return sink
+
+def add_device(client, serial_number, warranty_expiration):
+    response = client.post("/api/hardware/", json={
+        "serial_number": serial_number, "device_name": f"Device {serial_number}", "device_type": "laptop",
+        "purchase_date": "2024-01-15", "status": "active", "warranty_expiration": warranty_expiration,
+    })
+    assert response.status_code == 201
+    return response.get_json()["id"]
+
+def open_alerts(query, device_id):
+    return query(
+        "SELECT state, expires_on FROM alerts WHERE kind = 'warranty' AND item_id = ? AND resolved_at IS NULL",
+        (device_id,),
+    )
+
+def sent_for(sink, device_id):
+    return [(alert["state"], alert["expires_on"]) for alert in sink.sent if alert["item_id"] == device_id]
+
+def test_scan_raises_each_alert_once(client, query, sink):
+    device_id = add_device(client, "A-1", day(10))
+    result, sent = run_once([sink], TODAY)
+    assert result["raised"] == 1 and sent == 1
+    assert open_alerts(query, device_id) == [("expiring", day(10))]
+
+    # Nothing written, same day: no run is due
+    assert run_once([sink], TODAY) == (None, 0)
+    # Later days scan again, but the open alert is not raised twice
+    for offset in range(1, 10):
+        run_once([sink], TODAY + timedelta(days=offset))
+    assert open_alerts(query, device_id) == [("expiring", day(10))]
+    assert sent_for(sink, device_id) == [("expiring", day(10))]
+
+    # Once it has passed, the expiring alert gives way to an expired one
+    result, _ = run_once([sink], TODAY + timedelta(days=11))
+    assert result["resolved"] == 1
+    assert open_alerts(query, device_id) == [("expired", day(10))]
+    assert sent_for(sink, device_id) == [("expiring", day(10)), ("expired", day(10))]
+
+def test_renewal_and_decommissioning_resolve_alerts(client, query, sink):
+    renewed = add_device(client, "A-1", day(5))
+    retired = add_device(client, "A-2", day(5))
+    run_once([sink], TODAY)
+    assert open_alerts(query, renewed) and open_alerts(query, retired)
+
+    client.put(f"/api/hardware/{renewed}", json={"warranty_expiration": day(400)})
+    client.put(f"/api/hardware/{retired}", json={"status": "decommissioned"})
+    assert open_alerts(query, renewed) == []
+    assert open_alerts(query, retired) == []
+
+    # A renewal back into the window is picked up from the recheck queue
+    client.put(f"/api/hardware/{renewed}", json={"warranty_expiration": day(3)})
+    run_once([sink], TODAY)
+    assert open_alerts(query, renewed) == [("expiring", day(3))]
+    assert open_alerts(query, retired) == []
+
+def test_failed_sends_are_retried(client, query, sink):
+    device_id = add_device(client, "A-1", day(10))
+    sink.fail = True
+    with pytest.raises(RuntimeError):
+        run_once([sink], TODAY)
+    assert open_alerts(query, device_id) == [("expiring", day(10))]
+
+    sink.fail = False
+    assert run_once([sink], TODAY) == (None, 1)
+    assert sent_for(sink, device_id) == [("expiring", day(10))]
+
+def test_alert_queue_endpoints(client, intern, sink):
+    device_id = add_device(client, "A-1", day(10))
+    assert intern.post("/api/alerts/run").status_code == 403
+    response = client.post("/api/alerts/run")
+    assert response.status_code == 200
+    assert response.get_json()["raised"] == 1
+
+    alerts = intern.get("/api/alerts/?kind=warranty&state=expiring&limit=1000").get_json()["alerts"]
+    assert [alert["item_id"] for alert in alerts if alert["item_id"] == device_id] == [device_id]
+    assert client.get("/api/alerts/?state=late").status_code == 400
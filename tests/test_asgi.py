@@ -0,0 +1,92 @@
+import asyncio
+import json
+import threading
+import time
+import pytest
+
+pytest.importorskip("a2wsgi", reason="a2wsgi is not installed")
+
+from api.asgi import Application, application
+from api.routes.changes import CLIENT_GONE
+
+def scope(path, method="GET"):
+    return {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": method,
+        "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "", "query_string": b"",
+        "headers": [(b"host", b"testserver")], "client": ("127.0.0.1", 5000), "server": ("testserver", 80),
+    }
+
+# Send one request through `app`; the client disconnects after `disconnect_after`
+# seconds if given. Returns (status, headers, body).
+async def call(app, path, disconnect_after=None):
+    messages = []
+    sent_request = False
+
+    async def receive():
+        nonlocal sent_request
+        if not sent_request:
+            sent_request = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        if disconnect_after is None:
+            await asyncio.Event().wait()
+        await asyncio.sleep(disconnect_after)
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        messages.append(message)
+
+    await app(scope(path), receive, send)
+    start = next(message for message in messages if message["type"] == "http.response.start")
+    body = b"".join(message.get("body", b"") for message in messages if message["type"] == "http.response.body")
+    return start["status"], dict(start["headers"]), body
+
+def test_flask_app_is_served(client):
+    status, headers, body = asyncio.run(call(application, "/api/departments/"))
+    assert status == 401
+    assert json.loads(body)["error"]
+
+    status, _, body = asyncio.run(call(application, "/api/health"))
+    assert status == 200
+    assert json.loads(body)["streams"]["threads"] > 0
+
+def test_streams_have_their_own_limit():
+    release = threading.Event()
+
+    def slow(environ, start_response):
+        start_response("200 OK", [("Content-Type", "text/plain")])
+        release.wait(5)
+        return [environ["PATH_INFO"].encode()]
+
+    async def scenario():
+        app = Application(slow, threads=1, max_pending=0, stream_threads=1, stream_max_pending=0)
+        export = asyncio.create_task(call(app, "/api/export/hardware"))
+        await asyncio.sleep(0.1)
+        # The stream lane is full; the request lane is not
+        second_export = await call(app, "/api/export/software")
+        page = asyncio.create_task(call(app, "/api/hardware/"))
+        await asyncio.sleep(0.1)
+        release.set()
+        return second_export, await export, await page
+
+    second_export, export, page = asyncio.run(scenario())
+    assert second_export[0] == 503 and second_export[1][b"retry-after"] == b"1"
+    assert export[0] == 200 and export[2] == b"/api/export/hardware"
+    assert page[0] == 200
+
+def test_disconnect_ends_the_stream():
+    stopped = threading.Event()
+
+    def endless(environ, start_response):
+        start_response("200 OK", [("Content-Type", "text/event-stream")])
+
+        def body():
+            while not environ[CLIENT_GONE].is_set():
+                yield b": keepalive\n\n"
+                time.sleep(0.01)
+            stopped.set()
+        return body()
+
+    app = Application(endless, stream_threads=1)
+    status, _, body = asyncio.run(call(app, "/api/changes/stream", disconnect_after=0.1))
+    assert status == 200 and body.startswith(b": keepalive")
+    assert stopped.wait(1)
@@ -0,0 +1,51 @@
+def add_asset(client, query, serial_number, **values):
+    response = client.post("/api/hardware/", json={
+        "serial_number": serial_number,
+        "device_name": f"Device {serial_number}",
+        "device_type": "laptop",
+        "purchase_date": "2024-01-15",
+        "status": "active",
+        **values,
+    })
+    assert response.status_code == 201, response.get_json()
+    return response.get_json()["id"]
+
+def test_asset_nests_subtype_and_assignee(client, query):
+    response = client.post("/api/employees/", json={"first_name": "Ada", "last_name": "Lovelace", "email": "ada@example.com"})
+    employee_id = response.get_json()["id"]
+    device_id = add_asset(client, query, "A-1", assignee=employee_id)
+    query(
+        "INSERT INTO computers (device_id, serial_number, device_type, computer_model, computer_brand, cpu, ram,"
+        " operating_system) VALUES (?, 'A-1', 'laptop', 'X1', 'Lenovo', 'i7', '16GB', 'Ubuntu')",
+        (device_id,),
+    )
+
+    response = client.get(f"/api/assets/{device_id}")
+    assert response.status_code == 200
+    asset = response.get_json()["asset"]
+    assert asset["serial_number"] == "A-1"
+    assert asset["computer"]["cpu"] == "i7"
+    assert "serial_number" not in asset["computer"]
+    assert asset["printer"] is None and asset["device"] is None and asset["audio_video"] is None
+    assert asset["assigned_to"] == {
+        "employee_id": employee_id, "first_name": "Ada", "last_name": "Lovelace", "email": "ada@example.com",
+    }
+
+def test_filters_and_paging(client, query):
+    ids = [add_asset(client, query, f"A-{n}", warranty_expiration=f"2030-01-0{n + 1}") for n in range(3)]
+    add_asset(client, query, "A-9", status="maintenance", warranty_expiration="2030-01-02")
+
+    seen, cursor = [], None
+    while True:
+        url = "/api/assets/?status=active&warranty_from=2030-01-01&warranty_to=2030-01-03&limit=2"
+        page = client.get(url + (f"&cursor={cursor}" if cursor is not None else "")).get_json()
+        seen += [asset["device_id"] for asset in page["assets"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == ids
+
+def test_bad_requests(client):
+    assert client.get("/api/assets/?warranty_from=soon").status_code == 400
+    assert client.get("/api/assets/?assignee=me").status_code == 400
+    assert client.get("/api/assets/999999").status_code == 404
@@ -0,0 +1,23 @@
+from api.utils.auth import role_cache
+
+def test_method_roles(client, intern, anon):
+    assert anon.get("/api/departments/").status_code == 401
+    assert intern.get("/api/departments/").status_code == 200
+    department_id = intern.post("/api/departments/", json={"department_name": "Interns"}).get_json()["id"]
+    assert intern.delete(f"/api/departments/{department_id}").status_code == 403
+    assert client.delete(f"/api/departments/{department_id}").status_code == 200
+
+def test_role_is_cached_until_it_expires(intern, query, monkeypatch):
+    assert intern.get("/api/departments/").status_code == 200
+    # Another process demotes the user; this one keeps the cached role
+    query("UPDATE users SET user_role = 'basic' WHERE user_id = ?", (intern.user_id,))
+    assert intern.get("/api/departments/").status_code == 200
+
+    monkeypatch.setattr(role_cache, "ttl", 0)
+    role_cache.set(intern.user_id, "intern")
+    assert intern.get("/api/departments/").status_code == 403
+
+def test_deleting_a_user_drops_their_role_at_once(client, intern):
+    assert intern.get("/api/departments/").status_code == 200
+    assert client.delete(f"/api/users/{intern.user_id}").status_code == 200
+    assert intern.get("/api/departments/").status_code == 403
@@ -0,0 +1,16 @@
+from api.db.backends.postgres import translate
+
+def test_translate_leaves_quoted_text_alone():
+    sql = "SELECT ? FROM t WHERE name LIKE 'a?%' AND \"odd?\" = ? -- what?\n AND body = $$ ? $$"
+    assert translate(sql) == (
+        "SELECT %s FROM t WHERE name LIKE 'a?%%' AND \"odd?\" = %s -- what?\n AND body = $$ ? $$"
+    )
+    assert translate("SELECT 'it''s ?', ?") == "SELECT 'it''s ?', %s"
+
+def test_question_marks_and_percents_in_literals(client, query):
+    query("INSERT INTO departments (department_name) VALUES ('Why? 100%')")
+    rows = query(
+        "SELECT department_name, ? FROM departments WHERE department_name LIKE 'Why?%' AND department_name <> ?",
+        ("marker", "Other?"),
+    )
+    assert rows == [("Why? 100%", "marker")]
@@ -0,0 +1,51 @@
+import random
+import sqlite3
+import pytest
+from benchmarks.common import percentile, summarize
+from benchmarks.fleet import BENCH_USERS, build_fleet, parse_scale, row_counts
+from benchmarks.run import ENDPOINTS, max_ids
+
+ASSETS = 200
+
+def dump(path, table, columns="*"):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute(f"SELECT {columns} FROM {table} ORDER BY 1").fetchall()
+    finally:
+        conn.close()
+
+@pytest.fixture(scope="module")
+def fleet(tmp_path_factory):
+    return build_fleet(str(tmp_path_factory.mktemp("fleet") / "fleet.db"), ASSETS)
+
+def test_fleet_is_filled_in_proportion(fleet):
+    counts = row_counts(ASSETS)
+    # On top of schema.sql's sample rows
+    assert len(dump(fleet, "hardware")) >= counts["hardware"]
+    serials = dump(fleet, "hardware", "serial_number")
+    assert len([row for row in serials if row[0].startswith("FLEET-")]) == counts["hardware"]
+    assert len(dump(fleet, "software")) >= counts["software"]
+    usernames = {row[0] for row in dump(fleet, "users", "username")}
+    assert {username for username, _, _ in BENCH_USERS.values()} <= usernames
+
+def test_same_seed_builds_the_same_fleet(fleet, tmp_path):
+    again = build_fleet(str(tmp_path / "again.db"), ASSETS)
+    other = build_fleet(str(tmp_path / "other.db"), ASSETS, seed=1)
+    for table in ("hardware", "computers", "software", "inventory_assignments"):
+        assert dump(again, table) == dump(fleet, table)
+    assert dump(other, "hardware") != dump(fleet, "hardware")
+
+def test_every_endpoint_builds_a_request(fleet):
+    ids = max_ids(fleet)
+    for endpoint in ENDPOINTS:
+        path, body = endpoint.request(random.Random(endpoint.name), ids, 0)
+        assert path.startswith("/api/"), endpoint.name
+        assert body is None or endpoint.method != "GET", endpoint.name
+
+def test_scales_and_percentiles():
+    assert parse_scale("100k") == 100_000
+    assert parse_scale("250") == 250
+    assert percentile([0.001, 0.002, 0.003, 0.004], 50) == 3.0
+    summary = summarize([0.01] * 10)
+    assert summary["count"] == 10 and summary["p99_ms"] == 10.0
+    assert summarize([])["max_ms"] is None
@@ -0,0 +1,61 @@
+import json
+
+CSV_HEADER = "serial_number,device_name,device_type,purchase_date,status\n"
+
+def csv_row(serial_number):
+    return f"{serial_number},Device {serial_number},laptop,2024-01-15,active\n"
+
+def ndjson_row(serial_number):
+    return json.dumps({
+        "serial_number": serial_number,
+        "device_name": f"Device {serial_number}",
+        "device_type": "laptop",
+        "purchase_date": "2024-01-15",
+        "status": "active",
+    }) + "\n"
+
+def serials(query):
+    return [row[0] for row in query("SELECT serial_number FROM hardware WHERE serial_number LIKE 'B-%' ORDER BY serial_number")]
+
+def test_json_array_import(client, query):
+    rows = [json.loads(ndjson_row(f"B-{n}")) for n in range(3)]
+    response = client.post("/api/hardware/bulk", json=rows)
+    assert response.status_code == 201
+    assert response.get_json()["inserted"] == 3
+    assert serials(query) == ["B-0", "B-1", "B-2"]
+
+def test_ndjson_import(client, query):
+    body = "".join(ndjson_row(f"B-{n}") for n in range(3))
+    response = client.post("/api/hardware/bulk", data=body, content_type="application/x-ndjson")
+    assert response.status_code == 201
+    assert serials(query) == ["B-0", "B-1", "B-2"]
+
+def test_csv_import_reports_bad_rows(client, query):
+    body = CSV_HEADER + csv_row("B-0") + csv_row("B-0") + "B-2,x,laptop,2024-01-15,active,extra\n" + csv_row("B-3")
+    response = client.post("/api/hardware/bulk", data=body, content_type="text/csv")
+    assert response.status_code == 207
+    result = response.get_json()
+    assert (result["received"], result["inserted"], result["failed"]) == (4, 2, 2)
+    assert [error["row"] for error in result["errors"]] == [1, 2]
+    assert result["errors"][1]["error"] == "Too many fields in row"
+    assert serials(query) == ["B-0", "B-3"]
+
+def test_import_ignores_row_version(client, query):
+    response = client.post("/api/departments/bulk", json=[{"department_name": "Imported", "row_version": 99}])
+    assert response.status_code == 201
+    assert query("SELECT row_version FROM departments WHERE department_name = 'Imported'") == [(1,)]
+
+def test_ndjson_export_streams_every_row(client, query):
+    client.post("/api/hardware/bulk", json=[json.loads(ndjson_row(f"B-{n}")) for n in range(1200)])
+    response = client.get("/api/export/hardware?fields=device_id,serial_number")
+    assert response.is_streamed
+    rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [row["device_id"] for row in rows] == [row[0] for row in query("SELECT device_id FROM hardware ORDER BY device_id")]
+    assert set(rows[0]) == {"device_id", "serial_number"}
+
+def test_csv_export_preview(client):
+    response = client.get("/api/export/hardware?format=csv&preview=2&fields=serial_number")
+    lines = response.get_data(as_text=True).splitlines()
+    assert response.mimetype == "text/csv"
+    assert lines[0] == "serial_number"
+    assert len(lines) == 3
@@ -0,0 +1,46 @@
+from datetime import date
+from api.utils import cache
+from api.utils.cache import response_cache
+
+def test_etag_revalidation_and_invalidation(client):
+    response = client.get("/api/departments/")
+    etag = response.headers["ETag"]
+    assert client.get("/api/departments/", headers={"If-None-Match": etag}).status_code == 304
+
+    hits = response_cache.stats()["hits"]
+    assert client.get("/api/departments/").get_data() == response.get_data()
+    assert response_cache.stats()["hits"] == hits + 1
+
+    client.post("/api/departments/", json={"department_name": "Cached"})
+    response = client.get("/api/departments/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+def test_defaulted_date_moves_on_at_midnight(client, query, monkeypatch):
+    class Today(date):
+        current = date(2024, 3, 1)
+
+        @classmethod
+        def today(cls):
+            return cls.current
+    monkeypatch.setattr(cache, "date", Today)
+
+    device_id = client.post("/api/hardware/", json={
+        "serial_number": "O-1", "device_name": "Overdue", "device_type": "laptop",
+        "purchase_date": "2024-01-15", "status": "active",
+    }).get_json()["id"]
+    employee_id = query("SELECT employee_id FROM employees ORDER BY employee_id LIMIT 1")[0][0]
+    response = client.post("/api/loans/checkout", json={
+        "device_id": device_id, "employee_id": employee_id, "assigned_date": "2024-02-01", "due_date": "2024-03-01",
+    })
+    assert response.status_code == 201
+
+    response = client.get("/api/loans/overdue")
+    assert response.get_json()["as_of"] == "2024-03-01"
+    assert response.get_json()["loans"] == []
+
+    Today.current = date(2024, 3, 2)
+    response = client.get("/api/loans/overdue", headers={"If-None-Match": response.headers["ETag"]})
+    assert response.status_code == 200
+    assert response.get_json()["as_of"] == "2024-03-02"
+    assert [loan["device_id"] for loan in response.get_json()["loans"]] == [device_id]
@@ -0,0 +1,75 @@
+import pytest
+from api.db.changes import ChangeFeed
+from api.routes import changes as change_routes
+
+def latest(client):
+    return client.get("/api/changes/?limit=1").get_json()["latest_seq"]
+
+def test_writes_show_up_in_the_feed(client, query):
+    since = latest(client)
+    department_id = client.post("/api/departments/", json={"department_name": "Feed"}).get_json()["id"]
+    client.put(f"/api/departments/{department_id}", json={"department_name": "Feed 2"})
+    client.delete(f"/api/departments/{department_id}")
+    query("INSERT INTO data_members (data_id, employee_id) VALUES (2, 1)")
+
+    response = client.get(f"/api/changes/?since={since}")
+    assert response.status_code == 200
+    changes = response.get_json()["changes"]
+    assert [(change["table"], change["op"], change["key"]) for change in changes] == [
+        ("departments", "insert", {"department_id": department_id}),
+        ("departments", "update", {"department_id": department_id}),
+        ("departments", "delete", {"department_id": department_id}),
+        ("data_members", "insert", {"data_id": 2, "employee_id": 1}),
+    ]
+    # Each change carries the row as it is now
+    assert changes[0]["row"] is None
+    assert changes[3]["row"] == {"data_id": 2, "employee_id": 1}
+    assert response.get_json()["next_since"] == changes[-1]["seq"]
+
+    response = client.get(f"/api/changes/?since={since}&tables=data_members")
+    assert [change["table"] for change in response.get_json()["changes"]] == ["data_members"]
+
+def test_bad_requests(client):
+    assert client.get("/api/changes/?since=-1").status_code == 400
+    assert client.get("/api/changes/?tables=users").status_code == 400
+
+def test_pruned_changes_expire_the_client(client, query):
+    since = latest(client)
+    for name in ("One", "Two", "Three"):
+        client.post("/api/departments/", json={"department_name": name})
+    seqs = [row[0] for row in query("SELECT seq FROM change_log WHERE seq > ? ORDER BY seq", (since,))]
+
+    # A gap in the middle (a rolled-back write) is skipped over
+    query("DELETE FROM change_log WHERE seq = ?", (seqs[1],))
+    response = client.get(f"/api/changes/?since={since}")
+    assert [change["seq"] for change in response.get_json()["changes"]] == [seqs[0], seqs[2]]
+
+    # Pruned up to the newest change: the client has to reload
+    query("DELETE FROM change_log WHERE seq < ?", (seqs[2],))
+    assert client.get(f"/api/changes/?since={since}").status_code == 410
+    assert client.get(f"/api/changes/?since={seqs[2]}").status_code == 200
+
+@pytest.fixture
+def feed(client, monkeypatch):
+    feed = ChangeFeed(interval=0.05)
+    feed.start()
+    monkeypatch.setattr(change_routes, "get_change_feed", lambda: feed)
+    monkeypatch.setattr(change_routes, "CHANGE_STREAM_SECONDS", 0.5)
+    monkeypatch.setattr(change_routes, "CHANGE_KEEPALIVE", 0.1)
+    yield feed
+    feed.stop()
+
+def test_stream_sends_changes_as_events(client, feed):
+    since = latest(client)
+    department_id = client.post("/api/departments/", json={"department_name": "Streamed"}).get_json()["id"]
+    response = client.get(f"/api/changes/stream?since={since}", buffered=True)
+    assert response.mimetype == "text/event-stream"
+    body = response.get_data(as_text=True)
+    assert f"event: ready\ndata: {{\"seq\": {since}}}" in body
+    assert f"id: {since + 1}\nevent: change\n" in body
+    assert f'"department_id": {department_id}' in body
+
+    # Resuming after the last event sends only what came later
+    response = client.get("/api/changes/stream", headers={"Last-Event-ID": str(since + 1)}, buffered=True)
+    assert "event: change" not in response.get_data(as_text=True)
+    assert ": keepalive" in response.get_data(as_text=True)
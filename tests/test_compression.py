@@ -0,0 +1,57 @@
+import gzip
+import json
+import pytest
+from api.utils.compression import compressed_cache
+
+GZIP = {"Accept-Encoding": "gzip"}
+
+# Enough devices that a page is over COMPRESS_MIN_BYTES
+@pytest.fixture
+def fleet(client):
+    rows = [
+        {"serial_number": f"Z-{n}", "device_name": f"Device Z-{n}", "device_type": "laptop",
+         "purchase_date": "2024-01-15", "status": "active"}
+        for n in range(100)
+    ]
+    assert client.post("/api/hardware/bulk", json=rows).status_code in (200, 201)
+
+def test_pages_are_gzipped_when_accepted(client, fleet):
+    plain = client.get("/api/hardware/?limit=100")
+    assert "Content-Encoding" not in plain.headers
+    response = client.get("/api/hardware/?limit=100", headers=GZIP)
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert gzip.decompress(response.get_data()) == plain.get_data()
+    assert len(response.get_data()) < len(plain.get_data())
+
+def test_cached_bodies_are_compressed_once(client, fleet):
+    client.get("/api/hardware/?limit=100", headers=GZIP)
+    hits = compressed_cache.stats()["hits"]
+    response = client.get("/api/hardware/?limit=100", headers=GZIP)
+    assert compressed_cache.stats()["hits"] == hits + 1
+    assert json.loads(gzip.decompress(response.get_data()))["hardware"]
+
+def test_small_bodies_are_sent_as_they_are(client):
+    response = client.get("/api/hardware/1?fields=device_id", headers=GZIP)
+    assert response.status_code == 200
+    assert "Content-Encoding" not in response.headers
+
+def test_exports_are_compressed_as_they_stream(client, fleet, query):
+    response = client.get("/api/export/hardware?fields=device_id", headers=GZIP)
+    assert response.is_streamed
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Content-Length" not in response.headers
+    rows = [json.loads(line) for line in gzip.decompress(response.get_data()).splitlines()]
+    assert [row["device_id"] for row in rows] == [row[0] for row in query("SELECT device_id FROM hardware ORDER BY device_id")]
+
+def test_brotli_is_preferred_when_installed(client, fleet):
+    brotli = pytest.importorskip("brotli")
+    response = client.get("/api/hardware/?limit=100", headers={"Accept-Encoding": "gzip, br"})
+    assert response.headers["Content-Encoding"] == "br"
+    assert json.loads(brotli.decompress(response.get_data()))["hardware"]
+
+def test_msgpack_is_negotiated(client):
+    msgpack = pytest.importorskip("msgpack")
+    response = client.get("/api/hardware/?limit=5", headers={"Accept": "application/msgpack"})
+    assert response.mimetype == "application/msgpack"
+    assert len(msgpack.unpackb(response.get_data())["hardware"]) == 5
@@ -0,0 +1,63 @@
+import sqlite3
+from api.db.backends.sqlite import SCHEMA
+from api.db.migrate import migrate
+
+def members(client, data_id):
+    response = client.get(f"/api/data/{data_id}/members")
+    assert response.status_code == 200
+    return [member["employee_id"] for member in response.get_json()["members"]]
+
+def access(client, employee_id):
+    response = client.get(f"/api/data/access/{employee_id}")
+    assert response.status_code == 200
+    return [data["data_id"] for data in response.get_json()["data"]]
+
+def test_grant_list_and_revoke(client, intern):
+    assert members(client, 1) == [1, 2]
+    response = intern.post("/api/data/members/grant", json={"data_ids": [1, 2], "employee_ids": [2, 3]})
+    assert response.status_code == 200
+    # (1, 2) and (2, 3) were already there
+    assert response.get_json()["granted"] == 2
+    assert members(client, 1) == [1, 2, 3]
+    assert access(client, 3) == [1, 2]
+
+    assert intern.post("/api/data/members/revoke", json={"employee_ids": [3]}).status_code == 403
+    response = client.post("/api/data/members/revoke", json={"employee_ids": [3]})
+    assert response.get_json()["revoked"] == 2
+    assert access(client, 3) == []
+    response = client.post("/api/data/members/revoke", json={"data_ids": [1], "employee_ids": [1, 2]})
+    assert response.get_json()["revoked"] == 2
+    assert members(client, 1) == []
+
+def test_deleting_an_employee_drops_their_access(client):
+    assert 3 in members(client, 2)
+    assert client.delete("/api/employees/3").status_code == 200
+    assert 3 not in members(client, 2)
+
+def test_bad_member_requests(client):
+    assert client.post("/api/data/members/grant", json={"data_ids": [1]}).status_code == 400
+    assert client.post("/api/data/members/grant", json={"data_ids": ["1"], "employee_ids": [1]}).status_code == 400
+    assert client.post("/api/data/members/grant", json={"data_ids": [999], "employee_ids": [1]}).status_code == 404
+    assert client.post("/api/data/members/revoke", json={}).status_code == 400
+    assert client.get("/api/data/999/members").status_code == 404
+    assert client.get("/api/data/access/999").status_code == 404
+
+def test_migration_splits_members_list(tmp_path):
+    database = str(tmp_path / "members.db")
+    conn = sqlite3.connect(database)
+    with open(SCHEMA) as f:
+        conn.executescript(f.read())
+    conn.execute("UPDATE data SET members_list = ' 2, x,,999, 2 ,1' WHERE data_id = 1")
+    conn.execute("UPDATE data SET members_list = '' WHERE data_id = 2")
+    conn.commit()
+    conn.close()
+
+    migrate(database)
+    conn = sqlite3.connect(database)
+    try:
+        rows = conn.execute("SELECT data_id, employee_id FROM data_members WHERE data_id IN (1, 2)").fetchall()
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(data)")]
+    finally:
+        conn.close()
+    assert rows == [(1, 1), (1, 2)]
+    assert "members_list" not in columns
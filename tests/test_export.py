@@ -0,0 +1,35 @@
+def test_preview_covers_every_table(client, query):
+    response = client.get("/api/export-preview")
+    assert response.status_code == 200
+    preview = response.get_json()
+    assert preview["limit"] == 10
+    assert set(preview["tables"]) == {
+        "hardware", "computers", "printers", "devices", "audio_video", "software", "data", "inventory_assignments",
+    }
+    hardware = preview["tables"]["hardware"]
+    assert "serial_number" in hardware["columns"]
+    expected = [row[0] for row in query("SELECT device_id FROM hardware ORDER BY device_id LIMIT 10")]
+    assert [row["device_id"] for row in hardware["rows"]] == expected
+
+def test_preview_of_chosen_tables(client):
+    preview = client.get("/api/export-preview?tables=hardware,software&limit=1").get_json()
+    assert preview["limit"] == 1
+    assert set(preview["tables"]) == {"hardware", "software"}
+    assert all(len(table["rows"]) <= 1 for table in preview["tables"].values())
+
+def test_preview_limit_is_capped(client):
+    assert client.get("/api/export-preview?tables=hardware&limit=5000").get_json()["limit"] == 100
+
+def test_preview_rejects_bad_requests(client):
+    assert client.get("/api/export-preview?tables=hardware,users").status_code == 404
+    assert client.get("/api/export-preview?limit=0").status_code == 400
+    assert client.get("/api/export-preview?limit=ten").status_code == 400
+
+def test_export_rejects_bad_requests(client):
+    assert client.get("/api/export/users").status_code == 404
+    assert client.get("/api/export/hardware?format=xml").status_code == 400
+    assert client.get("/api/export/hardware?fields=password").status_code == 400
+
+def test_export_needs_a_session(anon):
+    assert anon.get("/api/export-preview").status_code == 401
+    assert anon.get("/api/export/hardware").status_code == 401
@@ -0,0 +1,40 @@
+HARDWARE = {
+    "serial_number": "I-1", "device_name": "Retried", "device_type": "laptop",
+    "purchase_date": "2024-01-15", "status": "active",
+}
+
+def test_retry_replays_the_first_response(client, query):
+    first = client.post("/api/hardware/", json=HARDWARE, headers={"Idempotency-Key": "create-1"})
+    retry = client.post("/api/hardware/", json=HARDWARE, headers={"Idempotency-Key": "create-1"})
+    assert first.status_code == retry.status_code == 201
+    assert retry.get_json() == first.get_json()
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert query("SELECT COUNT(*) FROM hardware WHERE serial_number = 'I-1'") == [(1,)]
+
+def test_reused_key_with_another_body_is_rejected(client):
+    client.post("/api/hardware/", json=HARDWARE, headers={"Idempotency-Key": "create-1"})
+    response = client.post("/api/hardware/", json={**HARDWARE, "serial_number": "I-2"},
+                           headers={"Idempotency-Key": "create-1"})
+    assert response.status_code == 422
+
+def test_reused_key_with_another_streamed_import_is_rejected(client, query):
+    header = "serial_number,device_name,device_type,purchase_date,status\n"
+    first = header + "I-1,a,laptop,2024-01-15,active\n"
+    other = header + "I-2,a,laptop,2024-01-15,active\n"
+    assert client.post("/api/hardware/bulk", data=first, content_type="text/csv",
+                       headers={"Idempotency-Key": "import-1"}).status_code == 201
+    replay = client.post("/api/hardware/bulk", data=first, content_type="text/csv",
+                         headers={"Idempotency-Key": "import-1"})
+    assert replay.headers["Idempotent-Replayed"] == "true"
+    assert client.post("/api/hardware/bulk", data=other, content_type="text/csv",
+                       headers={"Idempotency-Key": "import-1"}).status_code == 422
+    assert query("SELECT serial_number FROM hardware WHERE serial_number LIKE 'I-%'") == [("I-1",)]
+
+def test_keys_are_per_user(client, anon, query):
+    client.post("/api/hardware/", json=HARDWARE, headers={"Idempotency-Key": "create-1"})
+    user_id = query("SELECT user_id FROM users WHERE username = 'user1'")[0][0]
+    with anon.session_transaction() as session:
+        session["user_id"] = user_id
+    response = anon.post("/api/hardware/", json=HARDWARE, headers={"Idempotency-Key": "create-1"})
+    assert response.status_code == 409
+    assert "Idempotent-Replayed" not in response.headers
@@ -0,0 +1,17 @@
+def test_checkout_returns_the_new_assignment_id(client, query):
+    device_id = client.post("/api/hardware/", json={
+        "serial_number": "L-1", "device_name": "Loaner", "device_type": "laptop",
+        "purchase_date": "2024-01-15", "status": "active",
+    }).get_json()["id"]
+    employee_id = query("SELECT employee_id FROM employees ORDER BY employee_id LIMIT 1")[0][0]
+
+    response = client.post("/api/loans/checkout", json={"device_id": device_id, "employee_id": employee_id})
+    assert response.status_code == 201
+    assignment_id = response.get_json()["id"]
+    assert query("SELECT device_id, employee_id FROM inventory_assignments WHERE assignment_id = ?",
+                 (assignment_id,)) == [(device_id, employee_id)]
+    assert query("SELECT assignee, row_version FROM hardware WHERE device_id = ?", (device_id,)) == [(employee_id, 2)]
+
+    response = client.post(f"/api/loans/{assignment_id}/return", json={})
+    assert response.status_code == 200
+    assert query("SELECT assignee FROM hardware WHERE device_id = ?", (device_id,)) == [(None,)]
@@ -0,0 +1,66 @@
+import time
+import pytest
+from werkzeug.security import generate_password_hash
+from api.routes import user as user_routes
+from api.utils import security
+from api.utils.security import HashTimeout
+from api.utils.throttle import AttemptThrottle
+
+@pytest.fixture(autouse=True)
+def throttles(monkeypatch):
+    monkeypatch.setattr(user_routes, "ip_throttle", AttemptThrottle(3))
+    monkeypatch.setattr(user_routes, "username_throttle", AttemptThrottle(2))
+
+@pytest.fixture
+def account(query):
+    query(
+        "INSERT INTO users (username, password, user_role, security_level) VALUES ('tester', ?, 'admin', 3)",
+        (generate_password_hash("secret", security.PASSWORD_METHOD),),
+    )
+
+def login(anon, username, password):
+    return anon.post("/api/login", json={"username": username, "password": password})
+
+def test_login_signs_the_session_in(anon, account):
+    response = login(anon, "tester", "secret")
+    assert response.status_code == 200
+    assert response.get_json()["role"] == "admin"
+    assert anon.get("/api/departments/").status_code == 200
+
+def test_successful_logins_do_not_use_up_the_address(anon, account):
+    for _ in range(5):
+        assert login(anon, "tester", "secret").status_code == 200
+    for name in ("nobody1", "nobody2", "nobody3"):
+        assert login(anon, name, "wrong").status_code == 401
+    response = login(anon, "tester", "secret")
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) > 0
+
+def test_failures_lock_the_username(anon, account):
+    assert login(anon, "tester", "wrong").status_code == 401
+    assert login(anon, "tester", "wrong").status_code == 401
+    assert login(anon, "tester", "secret").status_code == 429
+
+def test_old_hashes_are_upgraded_on_login(anon, query):
+    old_hash = generate_password_hash("secret", "pbkdf2:sha256:1000")
+    query(
+        "INSERT INTO users (username, password, user_role, security_level) VALUES ('legacy', ?, 'intern', 2)",
+        (old_hash,),
+    )
+    assert login(anon, "legacy", "secret").status_code == 200
+    new_hash = query("SELECT password FROM users WHERE username = 'legacy'")[0][0]
+    assert new_hash.startswith(security.PASSWORD_METHOD + "$")
+    assert login(anon, "legacy", "secret").status_code == 200
+
+def test_slow_hash_times_out(monkeypatch):
+    monkeypatch.setattr(security, "HASH_TIMEOUT", 0.01)
+    with pytest.raises(HashTimeout):
+        security._run(time.sleep, 1)
+
+def test_busy_hash_pool_is_a_503(anon, account, monkeypatch):
+    def timeout(*args):
+        raise HashTimeout("Password hash not done")
+    monkeypatch.setattr(user_routes, "verify_password", timeout)
+    response = login(anon, "tester", "secret")
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
@@ -0,0 +1,60 @@
+import pytest
+from api.index import app
+from api.routes import metrics as metrics_routes
+from api.utils.metrics import Histogram, RequestMetrics
+
+# Counts from this test alone, not every request the suite has made
+@pytest.fixture
+def recorded(monkeypatch):
+    metrics = RequestMetrics()
+    monkeypatch.setattr(app.wsgi_app, "metrics", metrics)
+    monkeypatch.setattr(metrics_routes, "request_metrics", metrics)
+    return metrics
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram(buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.7, 3.0):
+        histogram.observe(value)
+    assert list(histogram.cumulative()) == [("0.1", 1), ("1.0", 3), ("+Inf", 4)]
+    assert histogram.sum == 4.25
+
+def test_render_labels_routes_and_gauges():
+    metrics = RequestMetrics()
+    metrics.record("GET", '/api/a"b', "200", 0.002, None, 120)
+    text = metrics.render({'inventory_info{mode="x"}': 1})
+    assert 'inventory_http_requests_total{method="GET",route="/api/a\\"b",status="200"} 1' in text
+    assert 'inventory_response_bytes_total{method="GET",route="/api/a\\"b"} 120' in text
+    assert "# TYPE inventory_info gauge" in text
+    assert 'inventory_info{mode="x"} 1' in text
+
+# A request is recorded once its response has been closed
+def get_closed(client, url):
+    response = client.get(url)
+    response.close()
+    return response
+
+def test_requests_are_counted_by_route(client, recorded):
+    assert get_closed(client, "/api/hardware/1").status_code == 200
+    assert get_closed(client, "/api/hardware/2").status_code == 200
+    response = client.get("/api/metrics/")
+    assert response.status_code == 200
+    text = response.get_data(as_text=True)
+    assert 'inventory_http_requests_total{method="GET",route="/api/hardware/<int:key>",status="200"} 2' in text
+    assert 'inventory_db_duration_seconds_count{method="GET",route="/api/hardware/<int:key>"} 2' in text
+    assert "inventory_db_pool_checkouts" in text
+
+def test_metrics_need_an_admin_or_the_token(anon, intern, monkeypatch):
+    assert anon.get("/api/metrics/").status_code == 401
+    assert intern.get("/api/metrics/").status_code == 403
+    monkeypatch.setattr(metrics_routes, "METRICS_TOKEN", "scrape")
+    assert anon.get("/api/metrics/", headers={"Authorization": "Bearer wrong"}).status_code == 401
+    assert anon.get("/api/metrics/", headers={"Authorization": "Bearer scrape"}).status_code == 200
+
+def test_admins_can_profile_a_request(client, intern):
+    response = client.get("/api/hardware/?profile=1")
+    assert response.mimetype == "text/plain"
+    assert response.headers["X-Profiled-Status"] == "200"
+    assert "cumulative" in response.get_data(as_text=True)
+    response = intern.get("/api/hardware/?profile=1")
+    assert response.mimetype == "application/json"
+    assert "X-Profiled-Status" not in response.headers
@@ -0,0 +1,42 @@
+import sqlite3
+import pytest
+from api.db import migrate as migrate_module
+from api.db.backends.sqlite import SCHEMA
+from api.db.migrate import MigrationError, check_query_plans, discover_migrations, migrate
+
+@pytest.fixture
+def database(tmp_path):
+    path = str(tmp_path / "migrate.db")
+    conn = sqlite3.connect(path)
+    with open(SCHEMA) as f:
+        conn.executescript(f.read())
+    conn.close()
+    return path
+
+def test_migrates_to_the_latest_version_once(database):
+    latest = discover_migrations()[-1][0]
+    applied = migrate(database)
+    assert len(applied) == len(discover_migrations())
+    assert migrate(database) == []
+    conn = sqlite3.connect(database)
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == latest
+    conn.close()
+
+def test_hot_queries_use_indexes(database):
+    migrate(database)
+    conn = sqlite3.connect(database)
+    assert check_query_plans(conn) == {}
+    conn.close()
+
+def test_failed_migration_is_rolled_back(database, tmp_path, monkeypatch):
+    (tmp_path / "0001_good.sql").write_text("CREATE TABLE kept (id INTEGER);\n")
+    (tmp_path / "0002_bad.sql").write_text("CREATE TABLE dropped (id INTEGER);\nSELECT * FROM missing;\n")
+    monkeypatch.setattr(migrate_module, "discover_migrations", lambda: discover_migrations(str(tmp_path)))
+
+    with pytest.raises(MigrationError, match="0002_bad"):
+        migrate(database)
+    conn = sqlite3.connect(database)
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    assert "kept" in tables and "dropped" not in tables
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == 1
+    conn.close()
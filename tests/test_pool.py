@@ -0,0 +1,50 @@
+import sqlite3
+import pytest
+from api.db.backends.sqlite import ConnectionPool, PoolTimeout
+
+@pytest.fixture
+def pool(tmp_path):
+    database = str(tmp_path / "pool.db")
+    conn = sqlite3.connect(database)
+    conn.execute("CREATE TABLE items (item_id INTEGER PRIMARY KEY, name TEXT)")
+    conn.close()
+    pool = ConnectionPool(database, size=2, timeout=0.1)
+    yield pool
+    pool.close_all()
+
+def test_connections_are_configured_and_reused(pool):
+    conn = pool.acquire()
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert conn.execute("PRAGMA foreign_keys").fetchone()[0] == 1
+    pool.release(conn)
+    assert pool.acquire() is conn
+    assert pool.stats()["open"] == 1
+
+def test_release_rolls_back_uncommitted_writes(pool):
+    conn = pool.acquire()
+    conn.execute("INSERT INTO items (name) VALUES ('left open')")
+    pool.release(conn)
+    conn = pool.acquire()
+    assert conn.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 0
+    pool.release(conn)
+
+def test_acquire_times_out_when_every_connection_is_out(pool):
+    held = [pool.acquire(), pool.acquire()]
+    with pytest.raises(PoolTimeout):
+        pool.acquire()
+    assert pool.stats()["timeouts"] == 1
+    for conn in held:
+        pool.release(conn)
+    pool.release(pool.acquire())
+
+def test_reopen_retires_old_connections(pool, tmp_path):
+    old = pool.acquire()
+    other = str(tmp_path / "other.db")
+    sqlite3.connect(other).close()
+    pool.reopen(other)
+    pool.release(old)
+    conn = pool.acquire()
+    assert conn is not old
+    assert conn.execute("PRAGMA database_list").fetchone()[2] == other
+    pool.release(conn)
+    assert pool.stats()["open"] == 1
@@ -0,0 +1,102 @@
+import sqlite3
+import time
+import pytest
+from api.db.backends.sqlite import SQLiteBackend
+
+@pytest.fixture
+def database(tmp_path):
+    database = str(tmp_path / "routing.db")
+    conn = sqlite3.connect(database)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("CREATE TABLE items (item_id INTEGER PRIMARY KEY, name TEXT)")
+    conn.close()
+    return database
+
+@pytest.fixture
+def make_backend(database, tmp_path, monkeypatch):
+    backends = []
+    def make(read_routing):
+        backend = SQLiteBackend(database, read_routing=read_routing)
+        if backend.replica is not None:
+            monkeypatch.setattr(backend.replica, "directory", str(tmp_path))
+            monkeypatch.setattr(backend.replica, "interval", 3600)
+        backends.append(backend)
+        return backend
+    yield make
+    for backend in backends:
+        backend.close()
+
+def write(backend, name):
+    conn = backend.acquire()
+    conn.execute("INSERT INTO items (name) VALUES (?)", (name,))
+    conn.commit()
+    backend.release(conn)
+
+def read(backend):
+    conn = backend.acquire_reader()
+    try:
+        return [row[0] for row in conn.execute("SELECT name FROM items ORDER BY item_id")]
+    finally:
+        backend.release_reader(conn)
+
+def test_unknown_routing_is_refused(database):
+    with pytest.raises(ValueError):
+        SQLiteBackend(database, read_routing="replica")
+
+def test_read_only_readers_see_every_commit(make_backend):
+    backend = make_backend("ro")
+    write(backend, "first")
+    assert read(backend) == ["first"]
+    conn = backend.acquire_reader()
+    with pytest.raises(sqlite3.OperationalError):
+        conn.execute("INSERT INTO items (name) VALUES ('nope')")
+    backend.release_reader(conn)
+    assert backend.readers_current_as_of() is None
+    assert backend.stats()["readers"]["routing"] == "ro"
+
+def test_off_reads_from_the_primary_pool(make_backend):
+    backend = make_backend("off")
+    write(backend, "first")
+    assert read(backend) == ["first"]
+    assert "readers" not in backend.stats()
+    assert backend.stats()["checkouts"] == 2
+
+def test_snapshot_readers_lag_until_refreshed(make_backend):
+    backend = make_backend("snapshot")
+    write(backend, "first")
+    assert read(backend) == ["first"]
+    taken_at = backend.readers_current_as_of()
+    assert taken_at is not None
+    write(backend, "second")
+    assert read(backend) == ["first"]
+    assert backend.replica.refresh()
+    assert read(backend) == ["first", "second"]
+    assert backend.readers_current_as_of() >= taken_at
+    # Nothing committed since, so no new copy
+    assert not backend.replica.refresh()
+    assert backend.stats()["readers"]["snapshot"]["refreshes"] == 2
+
+def test_snapshot_copies_are_removed(make_backend, tmp_path):
+    backend = make_backend("snapshot")
+    read(backend)
+    first = backend.replica.path
+    write(backend, "first")
+    backend.replica.refresh()
+    assert not (tmp_path / first).exists()
+    backend.close()
+    assert not [path for path in tmp_path.iterdir() if ".read-" in path.name]
+
+def test_writers_read_their_writes_from_the_primary(client, backend, monkeypatch):
+    if backend.name != "sqlite":
+        pytest.skip("read routing is configured per SQLite backend")
+    # Readers hold every commit made before now, and none after
+    as_of = time.time()
+    monkeypatch.setattr(backend, "readers_current_as_of", lambda: as_of)
+    readers = backend.stats()["readers"]["checkouts"]
+    assert client.get("/api/departments/").status_code == 200
+    assert backend.stats()["readers"]["checkouts"] == readers + 1
+    assert client.post("/api/departments/", json={"department_name": "Routing"}).status_code == 201
+    assert client.get("/api/departments/").status_code == 200
+    assert backend.stats()["readers"]["checkouts"] == readers + 1
+    assert client.get("/api/departments/", headers={"X-Read-Consistency": "primary"}).status_code == 200
+    assert backend.stats()["readers"]["checkouts"] == readers + 1
@@ -0,0 +1,36 @@
+def add_device(client, serial_number):
+    response = client.post("/api/hardware/", json={
+        "serial_number": serial_number, "device_name": "Old laptop", "device_type": "laptop",
+        "purchase_date": "2020-01-15", "status": "active",
+    })
+    assert response.status_code == 201
+    return response.get_json()["id"]
+
+def queue(client):
+    return [device["device_id"] for device in client.get("/api/removals/").get_json()["removals"]]
+
+def test_interns_request_and_admins_approve(client, intern, query):
+    device_id = add_device(client, "R-1")
+    assert intern.post("/api/removals/", json={"device_id": device_id}).status_code == 201
+    assert device_id in queue(client)
+
+    assert intern.post(f"/api/removals/{device_id}/approve").status_code == 403
+    assert query("SELECT status FROM hardware WHERE device_id = ?", (device_id,)) == [("active",)]
+
+    assert client.post(f"/api/removals/{device_id}/approve").status_code == 200
+    assert query("SELECT status FROM hardware WHERE device_id = ?", (device_id,)) == [("decommissioned",)]
+    assert device_id not in queue(client)
+    assert client.post(f"/api/removals/{device_id}/approve").status_code == 404
+
+def test_cancel_and_conflicts(client, query):
+    device_id = add_device(client, "R-1")
+    employee_id = query("SELECT employee_id FROM employees ORDER BY employee_id LIMIT 1")[0][0]
+    assignment_id = client.post("/api/loans/checkout", json={"device_id": device_id, "employee_id": employee_id}).get_json()["id"]
+    assert client.post("/api/removals/", json={"device_id": device_id}).status_code == 409
+
+    client.post(f"/api/loans/{assignment_id}/return", json={})
+    assert client.post("/api/removals/", json={"device_id": device_id}).status_code == 201
+    assert client.post("/api/removals/", json={"device_id": device_id}).status_code == 409
+    assert client.delete(f"/api/removals/{device_id}").status_code == 200
+    assert device_id not in queue(client)
+    assert client.delete(f"/api/removals/{device_id}").status_code == 404
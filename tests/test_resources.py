@@ -0,0 +1,105 @@
+import pytest
+
+def hardware(serial_number, **values):
+    return {
+        "serial_number": serial_number,
+        "device_name": f"Device {serial_number}",
+        "device_type": "laptop",
+        "purchase_date": "2024-01-15",
+        "status": "active",
+        **values,
+    }
+
+def create(client, url, body):
+    response = client.post(url, json=body)
+    assert response.status_code == 201, response.get_json()
+    return response.get_json()["id"]
+
+def test_crud_round_trip(client):
+    device_id = create(client, "/api/hardware/", hardware("T-1", note="first"))
+
+    response = client.get(f"/api/hardware/{device_id}")
+    assert response.status_code == 200
+    row = response.get_json()["hardware"]
+    assert row["serial_number"] == "T-1"
+    assert row["purchase_date"] == "2024-01-15"
+    assert row["row_version"] == 1
+
+    response = client.put(f"/api/hardware/{device_id}", json={"note": "second"})
+    assert response.status_code == 200
+    assert response.get_json()["row_version"] == 2
+    assert client.get(f"/api/hardware/{device_id}").get_json()["hardware"]["note"] == "second"
+
+    assert client.delete(f"/api/hardware/{device_id}").status_code == 200
+    assert client.get(f"/api/hardware/{device_id}").status_code == 404
+    assert client.delete(f"/api/hardware/{device_id}").status_code == 404
+
+def test_unknown_field_is_rejected(client):
+    response = client.post("/api/hardware/", json=hardware("T-1", colour="red"))
+    assert response.status_code == 400
+    assert "colour" in response.get_json()["error"]
+
+def test_duplicate_serial_number_is_a_conflict(client):
+    create(client, "/api/hardware/", hardware("T-1"))
+    assert client.post("/api/hardware/", json=hardware("T-1")).status_code == 409
+
+def test_requests_need_a_session(anon):
+    assert anon.get("/api/hardware/").status_code == 401
+
+def test_keyset_pages_cover_the_table_once(client, query):
+    for n in range(7):
+        create(client, "/api/departments/", {"department_name": f"Dept {n}"})
+    expected = [row[0] for row in query("SELECT department_id FROM departments ORDER BY department_id")]
+
+    seen, cursor = [], None
+    while True:
+        url = "/api/departments/?limit=3" + (f"&cursor={cursor}" if cursor is not None else "")
+        page = client.get(url).get_json()
+        assert len(page["departments"]) <= 3
+        seen += [row["department_id"] for row in page["departments"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == expected
+
+def test_columnar_page_with_fields(client):
+    page = client.get("/api/hardware/?format=columnar&fields=device_id,serial_number&limit=2").get_json()
+    assert page["columns"] == ["device_id", "serial_number"]
+    assert len(page["rows"]) == 2
+    assert all(len(row) == 2 for row in page["rows"])
+
+def test_bad_cursor_is_a_client_error(client):
+    assert client.get("/api/hardware/?cursor=abc").status_code == 400
+
+def test_list_is_revalidated_after_a_write(client):
+    first = client.get("/api/hardware/")
+    etag = first.headers["ETag"]
+    assert client.get("/api/hardware/", headers={"If-None-Match": etag}).status_code == 304
+    create(client, "/api/hardware/", hardware("T-1"))
+    assert client.get("/api/hardware/", headers={"If-None-Match": etag}).status_code == 200
+
+def test_batch_update_and_delete(client, query):
+    ids = [create(client, "/api/hardware/", hardware(f"T-{n}")) for n in range(3)]
+    response = client.patch("/api/hardware/", json={"ids": ids + [999999], "set": {"status": "inactive"}})
+    assert response.get_json() == {"matched": 3, "updated": 3, "dry_run": False, "missing": [999999]}
+    assert query("SELECT DISTINCT status, row_version FROM hardware WHERE serial_number LIKE 'T-%'") == [("inactive", 2)]
+
+    response = client.delete("/api/hardware/", json={"filter": {"status": "inactive", "serial_number": ["T-0", "T-1"]}})
+    assert response.get_json()["deleted"] == 2
+    assert query("SELECT serial_number FROM hardware WHERE serial_number LIKE 'T-%'") == [("T-2",)]
+
+@pytest.mark.parametrize("method", ["put", "delete"])
+def test_if_match_rejects_a_stale_version(client, method):
+    device_id = create(client, "/api/hardware/", hardware("T-1"))
+    etag = client.get(f"/api/hardware/{device_id}").headers["ETag"]
+    assert client.put(f"/api/hardware/{device_id}", json={"note": "changed"}, headers={"If-Match": etag}).status_code == 200
+
+    response = getattr(client, method)(f"/api/hardware/{device_id}", json={"note": "lost"}, headers={"If-Match": etag})
+    assert response.status_code == 412
+    assert response.get_json()["row_version"] == 2
+
+    current = client.get(f"/api/hardware/{device_id}")
+    assert current.get_json()["hardware"]["note"] == "changed"
+    response = getattr(client, method)(f"/api/hardware/{device_id}", json={"note": "kept"},
+                                      headers={"If-Match": current.headers["ETag"]})
+    assert response.status_code == 200
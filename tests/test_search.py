@@ -0,0 +1,81 @@
+def add_hardware(client, serial_number, device_name, note=None):
+    response = client.post("/api/hardware/", json={
+        "serial_number": serial_number,
+        "device_name": device_name,
+        "device_type": "laptop",
+        "purchase_date": "2024-01-15",
+        "status": "active",
+        "note": note,
+    })
+    assert response.status_code == 201, response.get_json()
+    return response.get_json()["id"]
+
+def add_employee(client, first_name, last_name):
+    response = client.post("/api/employees/", json={
+        "first_name": first_name, "last_name": last_name, "email": f"{first_name.lower()}@example.com",
+    })
+    assert response.status_code == 201, response.get_json()
+    return response.get_json()["id"]
+
+def search(client, url):
+    response = client.get(url)
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()
+
+def test_finds_rows_in_every_table(client):
+    device_id = add_hardware(client, "Q-1", "Quokka Workstation")
+    employee_id = add_employee(client, "Quokka", "Keeper")
+
+    results = search(client, "/api/search/?q=quokka")["results"]
+    assert {(hit["type"], hit["id"]) for hit in results} == {("hardware", device_id), ("employees", employee_id)}
+    hit = next(hit for hit in results if hit["type"] == "hardware")
+    assert hit["fields"]["device_name"] == "Quokka Workstation"
+
+def test_terms_are_anded(client):
+    both = add_hardware(client, "Q-1", "Quokka Workstation")
+    add_hardware(client, "Q-2", "Quokka Printer")
+    results = search(client, "/api/search/?q=quokka+workstation")["results"]
+    assert [(hit["type"], hit["id"]) for hit in results] == [("hardware", both)]
+
+def test_scores_are_scaled_per_table(client):
+    add_hardware(client, "Q-1", "Quokka Quokka Quokka", note="quokka")
+    add_hardware(client, "Q-2", "Quokka Workstation with a long description of its parts")
+    add_employee(client, "Quokka", "Keeper")
+
+    results = search(client, "/api/search/?q=quokka")["results"]
+    scores = [hit["score"] for hit in results]
+    assert scores == sorted(scores, reverse=True)
+    # The best hit of each table scores 1.0, whatever the table's size
+    best = {}
+    for hit in results:
+        best.setdefault(hit["type"], hit["score"])
+    assert best == {"hardware": 1.0, "employees": 1.0}
+    assert all(0 < score <= 1.0 for score in scores)
+
+def test_types_and_paging(client):
+    ids = [add_hardware(client, f"Q-{n}", f"Quokka {n}") for n in range(3)]
+    add_employee(client, "Quokka", "Keeper")
+
+    seen, offset = [], 0
+    while offset is not None:
+        page = search(client, f"/api/search/?q=quokka&types=hardware&limit=2&offset={offset}")
+        assert all(hit["type"] == "hardware" for hit in page["results"])
+        seen += [hit["id"] for hit in page["results"]]
+        offset = page["next_offset"]
+    assert sorted(seen) == ids
+
+def test_follows_writes(client):
+    device_id = add_hardware(client, "Q-1", "Quokka Workstation")
+    assert search(client, "/api/search/?q=wombat")["results"] == []
+    client.put(f"/api/hardware/{device_id}", json={"device_name": "Wombat Workstation"})
+    assert [hit["id"] for hit in search(client, "/api/search/?q=wombat")["results"]] == [device_id]
+    assert search(client, "/api/search/?q=quokka")["results"] == []
+
+def test_query_syntax_is_not_interpreted(client):
+    assert search(client, "/api/search/?q=%22it%27s%22+AND+OR*")["results"] == []
+
+def test_bad_requests(client):
+    assert client.get("/api/search/").status_code == 400
+    assert client.get("/api/search/?q=ab").status_code == 400
+    assert client.get("/api/search/?q=quokka&types=users").status_code == 400
+    assert client.get("/api/search/?q=quokka&offset=-1").status_code == 400
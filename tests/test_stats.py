@@ -0,0 +1,56 @@
+from datetime import date, timedelta
+
+def add_hardware(client, serial_number, **values):
+    response = client.post("/api/hardware/", json={
+        "serial_number": serial_number,
+        "device_name": f"Device {serial_number}",
+        "device_type": "stats-test",
+        "purchase_date": "2024-01-15",
+        "status": "active",
+        **values,
+    })
+    assert response.status_code == 201, response.get_json()
+    return response.get_json()["id"]
+
+def stats(client):
+    response = client.get("/api/stats/")
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()
+
+def test_stats_follow_writes(client, query):
+    before = stats(client)
+    soon = (date.today() + timedelta(days=10)).isoformat()
+    device_id = add_hardware(client, "S-1", warranty_expiration=soon)
+
+    hardware = stats(client)["hardware"]
+    assert hardware["total"] == query("SELECT COUNT(*) FROM hardware")[0][0]
+    assert hardware["total"] == before["hardware"]["total"] + 1
+    assert hardware["by_device_type"]["stats-test"] == 1
+    assert hardware["warranties"]["expiring_30"] == before["hardware"]["warranties"]["expiring_30"] + 1
+
+    client.put(f"/api/hardware/{device_id}", json={"status": "maintenance", "warranty_expiration": None})
+    hardware = stats(client)["hardware"]
+    assert hardware["by_status"].get("maintenance", 0) == before["hardware"]["by_status"].get("maintenance", 0) + 1
+    assert hardware["warranties"] == before["hardware"]["warranties"]
+
+    client.delete(f"/api/hardware/{device_id}")
+    hardware = stats(client)["hardware"]
+    assert hardware["total"] == before["hardware"]["total"]
+    assert "stats-test" not in hardware["by_device_type"]
+
+def test_open_loans_are_counted(client, query):
+    before = stats(client)["loans"]["active"]
+    device_id = add_hardware(client, "S-1")
+    employee_id = query("SELECT employee_id FROM employees ORDER BY employee_id LIMIT 1")[0][0]
+    assignment_id = client.post("/api/loans/checkout", json={"device_id": device_id, "employee_id": employee_id}).get_json()["id"]
+    assert stats(client)["loans"]["active"] == before + 1
+    client.post(f"/api/loans/{assignment_id}/return", json={})
+    assert stats(client)["loans"]["active"] == before
+
+def test_rebuild_matches_the_maintained_counts(client):
+    add_hardware(client, "S-1", warranty_expiration=date.today().isoformat())
+    add_hardware(client, "S-2", status="inactive")
+    before = stats(client)
+    response = client.post("/api/stats/rebuild")
+    assert response.status_code == 200
+    assert stats(client) == before
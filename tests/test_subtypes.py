@@ -0,0 +1,80 @@
+import json
+import sqlite3
+import pytest
+from api.db.migrate import migrate
+
+def hardware(serial_number):
+    return {
+        "serial_number": serial_number,
+        "device_name": f"Device {serial_number}",
+        "device_type": "speaker",
+        "purchase_date": "2024-01-15",
+        "status": "active",
+    }
+
+def audio_video(device_id, serial_number):
+    return {
+        "device_id": device_id,
+        "serial_number": serial_number,
+        "equipment_type": "speaker",
+        "brand": "Acme",
+        "model": "S1",
+    }
+
+def add_device(client, serial_number):
+    response = client.post("/api/hardware/", json=hardware(serial_number))
+    assert response.status_code == 201, response.get_json()
+    device_id = response.get_json()["id"]
+    response = client.post("/api/audio_video/", json=audio_video(device_id, serial_number))
+    assert response.status_code == 201, response.get_json()
+    return device_id
+
+def test_second_row_for_a_device_conflicts(client, query):
+    device_id = add_device(client, "AV-1")
+    client.post("/api/hardware/", json=hardware("AV-2"))
+
+    response = client.post("/api/audio_video/", json=audio_video(device_id, "AV-2"))
+    assert response.status_code == 409
+    assert query("SELECT serial_number FROM audio_video WHERE device_id = ?", (device_id,)) == [("AV-1",)]
+
+def test_paging_returns_every_row_once(client, query):
+    for n in range(4):
+        add_device(client, f"AV-{n}")
+    expected = [row[0] for row in query("SELECT device_id FROM audio_video ORDER BY device_id")]
+
+    seen, cursor = [], None
+    while True:
+        url = "/api/audio_video/?limit=1" + (f"&cursor={cursor}" if cursor is not None else "")
+        page = client.get(url).get_json()
+        seen += [row["device_id"] for row in page["audio_video"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == expected
+
+def test_migration_moves_duplicates_aside(client, backend, query, caplog):
+    if backend.name != "sqlite":
+        pytest.skip("migrations are SQLite-only")
+    device_id = add_device(client, "AV-1")
+    client.post("/api/hardware/", json=hardware("AV-2"))
+
+    conn = sqlite3.connect(backend.database, isolation_level=None)
+    try:
+        conn.execute("DROP INDEX idx_audio_video_device")
+        # An extra row ahead of the device's own one, under another serial
+        conn.execute("UPDATE audio_video SET rowid = rowid + 1000 WHERE device_id = ?", (device_id,))
+        conn.execute(
+            "INSERT INTO audio_video (device_id, serial_number, equipment_type, brand, model)"
+            " VALUES (?, 'AV-2', 'speaker', 'Acme', 'S1')",
+            (device_id,),
+        )
+        conn.execute("PRAGMA user_version = 10")
+    finally:
+        conn.close()
+
+    assert migrate(backend.database) == ["0011_unique_subtype_devices"]
+    assert query("SELECT serial_number FROM audio_video WHERE device_id = ?", (device_id,)) == [("AV-1",)]
+    [(table_name, moved_device_id, row_data)] = query("SELECT table_name, device_id, row_data FROM subtype_duplicates")
+    assert (table_name, moved_device_id) == ("audio_video", device_id)
+    assert json.loads(row_data)["serial_number"] == "AV-2"
+    assert f"Moved 1 duplicate audio_video rows to subtype_duplicates (device_id {device_id})" in caplog.text